@@ -0,0 +1,52 @@
+# ASCII vs Binary DXF Benchmark
+# Compare conversion time, intermediate size & ezdxf.readfile time for each intermediate format
+import os, sys, ezdxf
+from time import perf_counter
+sys.path.append("src")
+from process_dwg import list_inputs
+from converters import OdaConverter, detect_format
+
+def make_intermediate(input_file:str, binary:bool) -> tuple[str, float]:
+    """
+    Create an ASCII or binary DXF intermediate & time the conversion
+
+    - DWG inputs are converted with ODA
+    - DXF inputs are re-saved with ezdxf, so the benchmark also runs without ODA
+    """
+    start_time = perf_counter()
+
+    if detect_format(input_file) == "dwg":
+        dxf_file = OdaConverter(binary=binary).convert(input_file)
+    else:
+        dxf_file = f"{os.path.splitext(input_file)[0]}.bench.dxf"
+        ezdxf.readfile(input_file).saveas(dxf_file, fmt="bin" if binary else "asc")
+
+    return dxf_file, perf_counter() - start_time
+
+def bench_file(input_file:str) -> list:
+    rows = []
+    for binary in (False, True):
+        dxf_file, convert_time = make_intermediate(input_file, binary)
+        size = os.path.getsize(dxf_file)
+
+        start_time = perf_counter()
+        ezdxf.readfile(dxf_file)
+        read_time = perf_counter() - start_time
+
+        rows.append((os.path.basename(input_file), "binary" if binary else "ascii", convert_time, size, read_time))
+        os.remove(dxf_file)
+
+    return rows
+
+def main(target_dir:str):
+    print(f"{'file':<40} {'format':<7} {'convert s':>10} {'size MB':>10} {'readfile s':>11}")
+    for input_file in list_inputs(target_dir):
+        for name, fmt, convert_time, size, read_time in bench_file(input_file):
+            print(f"{name[:40]:<40} {fmt:<7} {convert_time:>10.2f} {size / 2**20:>10.1f} {read_time:>11.2f}")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_dxf_format <dir of large drawings>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
@@ -0,0 +1,55 @@
+# Inkscape DXF Import Benchmark
+# Compare the line by line & bulk ASCII tokenizers, the binary reader & time the full dxf_input import of each DXF file, serial & chunked on all cores
+import io, os, sys
+from time import perf_counter
+sys.path.append("src")
+sys.path.append("src/modules/Inkscape/share/inkscape/extensions")
+import dxf_input
+from process_dwg import list_files
+from converters import detect_format
+
+def read_lines(dxf_file:str) -> int:
+    """Group count of a readline per line reader, as dxf_input read ASCII DXF before the bulk tokenizer"""
+    count = 0
+    with open(dxf_file, "rb") as fp:
+        while True:
+            code = fp.readline().strip().decode("latin_1")
+            value = fp.readline()
+            if not code:
+                return count
+            value = value.rstrip(b"\r\n") if code in dxf_input.TEXT_CODES else value.strip()
+            value.decode("latin_1")
+            count += 1
+
+def tokenize(dxf_file:str) -> int:
+    with open(dxf_file, "rb") as fp:
+        if detect_format(dxf_file) == "binary_dxf":
+            return sum(1 for _ in dxf_input.iter_binary_groups(fp))
+        return sum(1 for _ in dxf_input.iter_ascii_groups(fp))
+
+def import_dxf(dxf_file:str, *args:str) -> int:
+    output = io.BytesIO()
+    dxf_input.DxfInput().run([*args, dxf_file], output=output)
+    return len(output.getvalue())
+
+def timed(func, *args) -> float:
+    start_time = perf_counter()
+    func(*args)
+    return perf_counter() - start_time
+
+def main(target_dir:str):
+    print(f"{'file':<40} {'MB':>7} {'lines s':>8} {'bulk s':>8} {'import s':>9} {'jobs s':>8}")
+    for dxf_file in list_files(target_dir, ".dxf"):
+        size = os.path.getsize(dxf_file) / 2**20
+        lines = float("nan") if detect_format(dxf_file) == "binary_dxf" else timed(read_lines, dxf_file)
+        bulk = timed(tokenize, dxf_file)
+        serial = timed(import_dxf, dxf_file)
+        chunked = timed(import_dxf, dxf_file, "--jobs=0")
+        print(f"{os.path.basename(dxf_file)[:40]:<40} {size:>7.1f} {lines:>8.2f} {bulk:>8.2f} {serial:>9.2f} {chunked:>8.2f}")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_dxf_input <dir of DXF drawings>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
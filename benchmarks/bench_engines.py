@@ -0,0 +1,34 @@
+# DXF to SVG Engine Benchmark
+# Time each engine on a folder of DXF files, show the engine selected for each & save the fitted costs to ~/.cache/py-dwg-to-img
+import os, sys
+sys.path.append("src")
+from process_dwg import RenderOptions, list_files
+from engines import ENGINES, entity_counts, select_engine, time_engines, fit_costs, save_costs
+
+def main(target_dir:str):
+    options = RenderOptions()
+    samples = {}
+    print(f"{'file':<40} {'entities':>9} {'ezdxf s':>8} {'dxf_input s':>12} {'selected':>10}  unsupported by dxf_input")
+    for dxf_file in list_files(target_dir, ".dxf"):
+        counts = entity_counts(dxf_file)
+        total = sum(counts.values())
+        times = time_engines(dxf_file, options)
+        for name, seconds in times.items():
+            samples.setdefault(name, []).append((total, seconds))
+
+        unsupported = ", ".join(sorted(set(counts) - ENGINES["dxf_input"].SUPPORTED))
+        ezdxf_time, dxf_input_time = (times.get(name, float("nan")) for name in ("ezdxf", "dxf_input"))
+        selected = select_engine(dxf_file).name
+        print(f"{os.path.basename(dxf_file)[:40]:<40} {total:>9} {ezdxf_time:>8.2f} {dxf_input_time:>12.2f} {selected:>10}  {unsupported}")
+
+    costs = fit_costs(samples)
+    save_costs(costs)
+    for name, (per_file, per_entity) in costs.items():
+        print(f"{name} : {per_file:.3f} s per file + {per_entity * 1e3:.4f} ms per entity")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_engines <dir of DXF drawings>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
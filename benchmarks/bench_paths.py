@@ -0,0 +1,41 @@
+# Inkscape Path Benchmark
+# Time parsing, transforming, bounding & reversing the path data of each SVG file with inkex Path & the array backed CompactPath
+import os, sys
+from time import perf_counter
+import xml.etree.ElementTree as etree
+sys.path.append("src")
+sys.path.append("src/modules/Inkscape/share/inkscape/extensions")
+from inkex import Path, CompactPath, Transform
+from process_dwg import list_files
+
+TRANSFORM = "rotate(30) scale(2)"
+
+def path_data(svg_file:str) -> list:
+    return [elem.get("d") for elem in etree.parse(svg_file).iter("{http://www.w3.org/2000/svg}path") if elem.get("d")]
+
+def timed(func, items:list) -> tuple:
+    start_time = perf_counter()
+    result = [func(item) for item in items]
+    return result, perf_counter() - start_time
+
+def main(target_dir:str):
+    print(f"{'file':<40} {'paths':>7} {'op':>10} {'Path s':>8} {'Compact s':>10}")
+    for svg_file in list_files(target_dir, ".svg"):
+        data = path_data(svg_file)
+        paths, path_parse = timed(Path, data)
+        compacts, compact_parse = timed(CompactPath.parse, data)
+        rows = [
+            ("parse", path_parse, compact_parse),
+            ("transform", timed(lambda path: path.transform(Transform(TRANSFORM)), paths)[1], timed(lambda path: path.transform(TRANSFORM), compacts)[1]),
+            ("bbox", timed(lambda path: path.to_non_shorthand().bounding_box(), paths)[1], timed(CompactPath.bounding_box, compacts)[1]),
+            ("reverse", timed(Path.reverse, paths)[1], timed(CompactPath.reverse, compacts)[1]),
+        ]
+        for name, path_time, compact_time in rows:
+            print(f"{os.path.basename(svg_file)[:40]:<40} {len(data):>7} {name:>10} {path_time:>8.2f} {compact_time:>10.2f}")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_paths <dir of SVG drawings>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
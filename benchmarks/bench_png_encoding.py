@@ -0,0 +1,46 @@
+# PNG Encoding Benchmark
+# Compare size & encode time of the PNG modes, filters & zlib settings against the Inkscape RGBA PNG
+import os, sys
+from time import perf_counter
+sys.path.append("src")
+from process_dwg import list_files
+from png_encoder import PngOptions, TRIALS, encode_png, load_rgb
+
+CASES = {
+    "rgba level 6": PngOptions(mode="rgba"),
+    "auto level 6": PngOptions(),
+    "auto level 9 rle": PngOptions(level=9, strategy="rle"),
+    "gray level 6": PngOptions(mode="gray"),
+    "palette level 6": PngOptions(mode="palette"),
+    "bilevel level 6": PngOptions(mode="bilevel"),
+    "bilevel level 1 none": PngOptions(mode="bilevel", level=1, filter="none"),
+    "bilevel optimized": PngOptions(mode="bilevel", level=9, optimize=True),
+}
+
+def bench_file(png_file:str) -> list:
+    pixels = load_rgb(png_file)
+    rows = [(os.path.basename(png_file), "inkscape", os.path.getsize(png_file), 0.0)]
+    for name, options in CASES.items():
+        start_time = perf_counter()
+        try:
+            if options.optimize:
+                data = min((encode_png(pixels, options, f, s) for f, s in TRIALS), key=len)
+            else:
+                data = encode_png(pixels, options)
+        except ValueError:
+            continue  # e.g. too many colors for a palette
+        rows.append((os.path.basename(png_file), name, len(data), perf_counter() - start_time))
+    return rows
+
+def main(target_dir:str):
+    print(f"{'file':<40} {'encoding':<22} {'size KB':>9} {'encode s':>9}")
+    for png_file in list_files(target_dir, ".png"):
+        for name, encoding, size, encode_time in bench_file(png_file):
+            print(f"{name[:40]:<40} {encoding:<22} {size / 2**10:>9.1f} {encode_time:>9.2f}")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_png_encoding <dir of PNG renders>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
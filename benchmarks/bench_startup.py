@@ -0,0 +1,55 @@
+# Cold vs Warm Start Benchmark
+# Compare CLI import time & first render latency of a fresh worker with & without the warm up initializer
+import os, sys, subprocess, multiprocessing
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append("src")
+from process_dwg import list_inputs, render_svg
+from warm import warm_pool
+
+IMPORTS = {
+    "process_dwg (lazy)": "import process_dwg",
+    "ezdxf + svg backend (eager)": "import process_dwg, ezdxf.addons.drawing.svg",
+}
+
+def time_import(statement:str) -> float:
+    """Wall time of a fresh interpreter running one import statement"""
+    start_time = perf_counter()
+    subprocess.run([sys.executable, "-c", f"import sys; sys.path.append('src'); {statement}"], check=True)
+    return perf_counter() - start_time
+
+def time_first_render(dxf_file:str, warm:bool) -> float:
+    """
+    Latency of the first render in a new single worker pool
+
+    - the worker is started (& warmed) before the clock starts, so only the task is timed
+    """
+    if warm:
+        pool = warm_pool(1, backends=("svg",), glyph_cache=True)
+    else:
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+    with pool:
+        pool.submit(os.getpid).result()
+        start_time = perf_counter()
+        pool.submit(render_svg, dxf_file).result()
+        return perf_counter() - start_time
+
+def main(target_dir:str):
+    print(f"{'import':<40} {'seconds':>8}")
+    for name, statement in IMPORTS.items():
+        print(f"{name:<40} {time_import(statement):>8.2f}")
+
+    print(f"\n{'file':<40} {'cold s':>8} {'warm s':>8}")
+    for input_file in list_inputs(target_dir):
+        if not input_file.endswith(".dxf"):
+            continue
+        cold, warm = time_first_render(input_file, False), time_first_render(input_file, True)
+        print(f"{os.path.basename(input_file)[:40]:<40} {cold:>8.2f} {warm:>8.2f}")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_startup <dir of DXF drawings>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
@@ -0,0 +1,44 @@
+# SVG Serialisation Benchmark
+# Compare SVG size & etree.parse time of the default, compact & compact SVGZ outputs
+import io, os, sys, gzip
+import xml.etree.ElementTree as etree
+from time import perf_counter
+sys.path.append("src")
+from process_dwg import RenderOptions, list_inputs, render_svg
+
+MODES = {
+    "default": RenderOptions(),
+    "compact": RenderOptions(compact=True),
+    "compact svgz": RenderOptions(compact=True, svgz=True),
+}
+
+def bench_file(dxf_file:str) -> list:
+    rows = []
+    for mode, options in MODES.items():
+        start_time = perf_counter()
+        data = render_svg(dxf_file, options=options).encode()
+        if options.svgz:
+            data = gzip.compress(data, compresslevel=6)
+        render_time = perf_counter() - start_time
+
+        start_time = perf_counter()
+        etree.parse(gzip.GzipFile(fileobj=io.BytesIO(data)) if options.svgz else io.BytesIO(data))
+        parse_time = perf_counter() - start_time
+
+        rows.append((os.path.basename(dxf_file), mode, len(data), render_time, parse_time))
+    return rows
+
+def main(target_dir:str):
+    print(f"{'file':<40} {'mode':<13} {'size MB':>8} {'render s':>9} {'parse s':>8}")
+    for input_file in list_inputs(target_dir):
+        if not input_file.endswith(".dxf"):
+            continue
+        for name, mode, size, render_time, parse_time in bench_file(input_file):
+            print(f"{name[:40]:<40} {mode:<13} {size / 2**20:>8.2f} {render_time:>9.2f} {parse_time:>8.3f}")
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_svg_size <dir of DXF drawings>
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    else:
+        print("Please provide the source path as the only CLI argument...")
@@ -0,0 +1,88 @@
+# Compact SVG
+# Smaller SVG output : coordinates quantised to the PNG resolution & runs of same style strokes merged into one path
+import math
+from xml.etree import ElementTree as ET
+from ezdxf.addons.drawing import svg, layout
+from ezdxf.addons.drawing.properties import BackendProperties
+from instancing import InstancingSVGBackend
+
+# Inkscape exports the page at 96 dpi
+EXPORT_DPI = 96
+
+def coordinate_space(max_width_mm:float, steps_per_px:int=8) -> int:
+    """
+    Output coordinate space for layout.Settings, in integer steps along the longer page side
+
+    - ezdxf defaults to 1,000,000 steps, far finer than the exported PNG
+    - steps_per_px steps per PNG pixel of the widest page keeps sub-pixel accuracy for anti-aliasing
+    """
+    return math.ceil(max_width_mm / 25.4 * EXPORT_DPI) * steps_per_px
+
+class CompactRenderBackend(svg.SVGRenderBackend):
+    """
+    SVG render backend which merges strokes of one style class into a single path element
+
+    - strokes are independent subpaths, so a merged path of opaque strokes draws the same pixels
+    - translucent strokes are not merged, overlaps within one path would be painted once instead of blending
+    - when every style has one opaque color (ColorPolicy.MONOCHROME) paint order cannot change the
+      result, so all strokes of a class are merged, else only consecutive runs are
+    - fillings are not merged, overlapping areas would cancel out with the evenodd fill rule
+    """
+    def __init__(self, page:layout.Page, settings:layout.Settings):
+        super().__init__(page, settings)
+        self.items = []
+        self.colors = set()
+
+    def add_strokes(self, d:str, properties:BackendProperties):
+        if not d:
+            return
+        stroke_color, stroke_opacity = self.resolve_color(properties.color)
+        cls = self.styles.get_class(
+            stroke=stroke_color,
+            stroke_width=self.resolve_stroke_width(properties.lineweight),
+            stroke_opacity=stroke_opacity,
+        )
+        self.colors.add((stroke_color, stroke_opacity))
+        self.items.append((True, cls, d, stroke_opacity))
+
+    def add_filling(self, d:str, properties:BackendProperties):
+        if not d:
+            return
+        fill_color, fill_opacity = self.resolve_color(properties.color)
+        cls = self.styles.get_class(fill=fill_color, fill_opacity=fill_opacity)
+        self.colors.add((fill_color, fill_opacity))
+        self.items.append((False, cls, d, fill_opacity))
+
+    def finalize(self) -> None:
+        """Write the buffered paths, called at the end of each replay"""
+        order_free = len(self.colors) == 1 and next(iter(self.colors))[1] == 1.0
+        strokes = {}
+        for is_stroke, cls, d, opacity in self.items:
+            merge = is_stroke and opacity == 1.0
+            if merge and (order_free or cls in strokes or not strokes):
+                strokes.setdefault(cls, []).append(d)
+                continue
+            if not order_free:
+                # a filling, a translucent stroke or another stroke class closes the run, keeping paint order
+                self.write_strokes(strokes)
+                strokes = {}
+            if merge:
+                strokes[cls] = [d]
+            else:
+                ET.SubElement(self.entities, "path", {"d": d, "class": cls})
+        self.write_strokes(strokes)
+        self.items = []
+        self.colors = set()
+
+    def write_strokes(self, strokes:dict) -> None:
+        for cls, paths in strokes.items():
+            ET.SubElement(self.entities, "path", {"d": " ".join(paths), "class": cls})
+
+class CompactSVGBackend(svg.SVGBackend):
+    """SVG backend writing through CompactRenderBackend"""
+
+    def make_backend(self, page:layout.Page, settings:layout.Settings) -> svg.SVGRenderBackend:
+        return CompactRenderBackend(page, settings)
+
+class CompactInstancingSVGBackend(InstancingSVGBackend, CompactSVGBackend):
+    """Block instancing, see instancing.py, with the compact render backend"""
@@ -0,0 +1,110 @@
+# DWG to DXF Converters
+# Input format detection & pluggable converters for the DWG -> DXF stage
+import os, shutil
+from typing import Protocol
+from deadlines import Deadline, Deadlines, StageTimeout, run_with_deadline
+
+# Binary paths
+ODA_EXE_PATH = r"src/modules/ODAFileConverter-v25.12.0/ODAFileConverter.exe"
+
+BINARY_DXF_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+
+def detect_format(input_file:str) -> str | None:
+    """
+    Detect the CAD format of a file from its header
+
+    - returns "dwg", "dxf" (ASCII) or "binary_dxf"
+    - returns None for anything else
+    """
+    with open(input_file, "rb") as fp:
+        head = fp.read(len(BINARY_DXF_SENTINEL))
+
+    if head.startswith(b"AC1"):
+        return "dwg"
+    if head.startswith(BINARY_DXF_SENTINEL):
+        return "binary_dxf"
+
+    # ASCII DXF opens with a group code line, e.g. "  0" or "999"
+    head = head.removeprefix(b"\xef\xbb\xbf").lstrip()
+    if head[:1].isdigit():
+        return "dxf"
+
+    return None
+
+class DxfConverter(Protocol):
+    """Converts a DWG file into a DXF file ezdxf can load"""
+
+    def convert(self, input_file:str) -> str | None:
+        """Returns the DXF path, or None if the conversion failed"""
+        ...
+
+class OdaConverter:
+    """
+    DWG to DXF conversion with the ODA File Converter binary
+
+    - the DXF is stored beside the DWG
+    - binary writes binary DXF (DXB), smaller & faster for ezdxf to load than ASCII
+    - a hung binary is killed at the deadline & StageTimeout raised
+    """
+    def __init__(
+        self, exe_path:str=ODA_EXE_PATH, output_version:str="ACAD2018", audit:bool=True, binary:bool=False, 
+        deadline:Deadline|None=Deadlines().convert,
+    ):
+        self.exe_path = exe_path
+        self.output_version = output_version
+        self.audit = audit
+        self.binary = binary
+        self.deadline = deadline
+
+    def convert(self, input_file:str) -> str | None:
+        timeout = self.deadline.seconds(input_file) if self.deadline else None
+
+        # 1. Split source dir & file name for binary config
+        input_file = input_file.replace("\\", "/").split("/")
+        working_dir = "/".join(input_file[:-1])
+        input_file = input_file[-1]
+
+        # 2. Set output formats
+        output_version = self.output_version
+        output_format = "dxb" if self.binary else "dxf"
+
+        # 3. Binary will not run with an ODA exe path containing "/" characters
+        oda_exe_path = self.exe_path.replace("/", "\\")
+
+        # 4. Binary subprocess requires int's as str
+        recursive = "1"
+        audit = "1" if self.audit else "0"
+
+        # 5. Run conversion process
+        try:
+            run_with_deadline(
+                args=[oda_exe_path, working_dir, working_dir, output_version, output_format, recursive, audit, input_file],
+                stage="convert", timeout=timeout, shell=True,
+            )
+        except StageTimeout:
+            raise
+        except Exception as e:
+            print(f"DWG to DXF error : {e}")
+            return None
+
+        return f"{working_dir}/{os.path.splitext(input_file)[0]}.dxf"
+
+class FixtureConverter:
+    """
+    Stand-in converter which copies a pre-converted DXF from a fixture directory
+
+    - <fixture_dir>/<name>.dxf is copied beside <name>.dwg
+    - lets tests & benchmarks run the pipeline without the ODA binary
+    """
+    def __init__(self, fixture_dir:str):
+        self.fixture_dir = fixture_dir
+
+    def convert(self, input_file:str) -> str | None:
+        stem = os.path.splitext(input_file)[0]
+        source = f"{self.fixture_dir}/{os.path.basename(stem)}.dxf"
+        if not os.path.exists(source):
+            print(f"DWG to DXF error : no fixture {source}")
+            return None
+
+        shutil.copyfile(source, f"{stem}.dxf")
+        return f"{stem}.dxf"
@@ -0,0 +1,105 @@
+# Stage Deadlines
+# Per-stage deadlines which kill the whole child process tree of a hung stage
+import os, signal, subprocess, multiprocessing
+from typing import NamedTuple
+
+class StageTimeout(Exception):
+    """A pipeline stage passed its deadline & was killed"""
+
+    def __init__(self, stage:str, seconds:float):
+        super().__init__(f"{stage} stage passed its {round(seconds, 1)}s deadline")
+        self.stage = stage
+        self.seconds = seconds
+
+class Deadline(NamedTuple):
+    """Stage time limit in seconds : base + per_mb x size of the stage input in MB"""
+    base: float
+    per_mb: float = 0.0
+
+    def seconds(self, input_file:str) -> float:
+        return self.base + self.per_mb * os.path.getsize(input_file) / 2**20
+
+class Deadlines(NamedTuple):
+    """
+    Deadlines for each pipeline stage, None disables a deadline
+
+    - convert : DWG to DXF subprocess
+    - render : DXF to SVG, run in a child process when set
+    - export : SVG to PNG subprocess
+    """
+    convert: Deadline | None = Deadline(300, 30)
+    render: Deadline | None = None
+    export: Deadline | None = Deadline(300, 5)
+
+NO_DEADLINES = Deadlines(None, None, None)
+
+def kill_tree(pid:int) -> None:
+    """Kill a process & all of its children"""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True)
+    else:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+def run_with_deadline(args:list, stage:str, timeout:float=None, shell:bool=False) -> int:
+    """
+    Run a subprocess in its own process group & return its exit code
+
+    - raises StageTimeout after killing the process tree if the deadline passes
+    """
+    if os.name == "nt":
+        proc = subprocess.Popen(args, shell=shell, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+    else:
+        proc = subprocess.Popen(args, shell=shell, start_new_session=True)
+
+    try:
+        return proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_tree(proc.pid)
+        proc.wait()
+        raise StageTimeout(stage, timeout)
+
+def _call_child(func, args:tuple, conn) -> None:
+    # own process group, so the whole tree can be killed
+    if hasattr(os, "setsid"):
+        os.setsid()
+    try:
+        conn.send((True, func(*args)))
+    except Exception as e:
+        conn.send((False, e))
+    finally:
+        conn.close()
+
+def call_with_deadline(func, args:tuple, stage:str, timeout:float=None):
+    """
+    Call func(*args) in a child process & return its result
+
+    - exceptions raised by func are re-raised here
+    - raises StageTimeout after killing the child tree if the deadline passes
+    - without a timeout func is called in this process
+    """
+    if timeout is None:
+        return func(*args)
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(target=_call_child, args=(func, args, sender))
+    proc.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(timeout):
+            kill_tree(proc.pid)
+            proc.kill()
+            raise StageTimeout(stage, timeout)
+        ok, value = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"{stage} stage process exited with code {proc.exitcode}")
+    finally:
+        proc.join()
+        receiver.close()
+
+    if not ok:
+        raise value
+    return value
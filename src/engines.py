@@ -0,0 +1,320 @@
+# DXF to SVG Engines
+# Pluggable DXF -> SVG renderers & an automatic selector from the entity types of each file & calibrated costs
+import os, re, sys, json, mmap, gzip, tempfile
+from collections import Counter
+from time import perf_counter
+from typing import Protocol
+from converters import detect_format
+
+# The vendored Inkscape DXF importer, see src/modules/Inkscape/share/inkscape/extensions/dxf_input.py
+DXF_INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules", "Inkscape", "share", "inkscape", "extensions")
+
+ENGINE_COSTS_PATH = os.path.join(os.path.expanduser("~"), ".cache", "py-dwg-to-img", "engines.json")
+
+# (seconds per file, seconds per entity) until calibrated, measured on a 60k entity line-work drawing
+DEFAULT_COSTS = {"ezdxf": (0.5, 1.2e-3), "dxf_input": (0.05, 0.3e-3)}
+
+# Entity records of the BLOCKS & ENTITIES sections, in ASCII & binary DXF
+# a value line of 0, e.g. layer 0, is followed by a numeric group code, so type names must not be numeric
+SECTION_PATTERNS = {
+    "dxf": (rb"0\r?\nSECTION\r?\n\s*2\r?\n%s\r?\n", rb"\n\s*0\r?\nENDSEC\r?\n", rb"\n[ \t]*0\r?\n(3D[A-Z]+|[A-Z][A-Z0-9_]+)\r?\n"),
+    "binary_dxf": (rb"\x00\x00SECTION\x00\x02\x00%s\x00", rb"\x00\x00ENDSEC\x00", rb"\x00\x00(3D[A-Z]+|[A-Z][A-Z0-9_]+)\x00"),
+}
+
+# Records which open, close or continue an entity rather than draw one
+STRUCTURE_TYPES = {"BLOCK", "ENDBLK", "VERTEX", "SEQEND"}
+
+def entity_counts(dxf_file:str) -> Counter:
+    """
+    Count the entity types of the BLOCKS & ENTITIES sections of a DXF file with a byte search, without parsing it
+
+    - block definitions are counted once, whether or not they are inserted
+    - returns an empty Counter if the file has no ENTITIES section
+    """
+    file_format = detect_format(dxf_file)
+    if file_format not in SECTION_PATTERNS:
+        return Counter()
+    section, end_section, entity = (re.compile(i % b"BLOCKS" if b"%s" in i else i) for i in SECTION_PATTERNS[file_format])
+    entities_section = re.compile(SECTION_PATTERNS[file_format][0] % b"ENTITIES")
+
+    with open(dxf_file, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        entities = entities_section.search(data)
+        if entities is None:
+            return Counter()
+        blocks = section.search(data, 0, entities.start())
+        end = end_section.search(data, entities.end())
+
+        start = blocks.end() if blocks else entities.end()
+        names = entity.findall(data, start, end.end() if end else len(data))
+
+    return Counter(i.decode("ascii") for i in names if i.decode("ascii") not in STRUCTURE_TYPES | {"SECTION", "ENDSEC"})
+
+class SvgEngine(Protocol):
+    """Renders the modelspace of a DXF file to an SVG file"""
+    name: str
+    recovers: bool
+
+    def available(self) -> bool:
+        """Whether the engine's dependencies import"""
+        ...
+
+    def supports(self, entity_types:set) -> bool:
+        """Whether the engine draws every one of the entity types"""
+        ...
+
+    def write(self, dxf_file:str, output_path:str, recover:bool, options) -> None:
+        """Render the DXF file & write the SVG to the output path, raises on failure"""
+        ...
+
+def save_svg(svg:bytes, output_path:str, svgz:bool=False) -> None:
+    """Write SVG bytes, gzip compressed for svgz"""
+    if svgz:
+        with gzip.open(output_path, "wb", compresslevel=6) as fp:
+            fp.write(svg)
+    else:
+        with open(output_path, "wb") as fp:
+            fp.write(svg)
+
+class EzdxfEngine:
+    """
+    ezdxf's drawing Frontend & SVG backend, see process_dwg.render_svg
+
+    - draws every entity type, text as filled glyph outlines
+    - loads damaged files in recover mode
+    """
+    name = "ezdxf"
+    recovers = True
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, entity_types:set) -> bool:
+        return True
+
+    def write(self, dxf_file:str, output_path:str, recover:bool, options) -> None:
+        from process_dwg import render_svg
+        save_svg(render_svg(dxf_file, recover, options).encode("utf8"), output_path, options.svgz)
+
+        import glyphs
+        glyphs.save()
+
+class DxfInputEngine:
+    """
+    The vendored Inkscape DXF importer, a single pass from DXF groups to SVG elements
+
+    - much lighter than the ezdxf Frontend for line-work, text is left as SVG <text> for Inkscape, so auto picks it for files without text only
+    - the page is fitted to the drawing extents at the scale, margins & max width of process_dwg.page_layout
+    - streaming, parallel, glyph_cache, instancing & compact apply to the ezdxf engine only
+    - needs lxml, tinycss2 & cssselect for inkex, the dxf_input extra : pip install .[dxf_input]
+    - without them --engine dxf_input falls back to ezdxf & auto never picks it
+    """
+    name = "dxf_input"
+    recovers = False
+
+    # Entity types dxf_input exports as ezdxf draws them, VIEWPORT is skipped by both
+    # TEXT & MTEXT are left out : dxf_input writes them as <text> in one font, without SHX / TrueType styles or
+    # most MTEXT formatting, so files with text are only rendered by dxf_input when it is chosen explicitly
+    SUPPORTED = frozenset({
+        "LINE", "LWPOLYLINE", "POLYLINE", "CIRCLE", "ARC", "ELLIPSE", "POINT", "SOLID", "SPLINE", "LEADER",
+        "INSERT", "DIMENSION", "VIEWPORT",
+    })
+
+    def __init__(self, scale:float=4, margin:float=10, max_width:float=1800):
+        self.scale = scale
+        self.margin = margin
+        self.max_width = max_width
+
+    def load(self):
+        if DXF_INPUT_DIR not in sys.path:
+            sys.path.append(DXF_INPUT_DIR)
+        import dxf_input
+        return dxf_input
+
+    def available(self) -> bool:
+        try:
+            self.load()
+        except ImportError:
+            return False
+        return True
+
+    def supports(self, entity_types:set) -> bool:
+        return entity_types <= self.SUPPORTED
+
+    def read_extents(self, dxf_input, dxf_file:str) -> tuple | None:
+        """
+        Drawing extents as (xmin, ymin, xmax, ymax), None for an empty drawing
+
+        - $EXTMIN & $EXTMAX of the DXF header where they are set
+        - else the range of the ENTITIES section's 10 / 20 points, radii & block contents are not included
+        """
+        header, points, section = {}, [[], []], None
+        with open(dxf_file, "rb") as fp:
+            binary = fp.read(len(dxf_input.BINARY_SENTINEL)) == dxf_input.BINARY_SENTINEL
+            fp.seek(0)
+            groups = dxf_input.iter_binary_groups(fp) if binary else dxf_input.iter_ascii_groups(fp)
+            name = None
+            for code, value in groups:
+                if code == "9" or (code == "2" and name == "SECTION"):
+                    name = value
+                    section = value if code == "2" else section
+                elif code == "0":
+                    name = value
+                    if value == "ENDSEC" and section == "HEADER" and self.valid_extents(header):
+                        break
+                    if value == "ENDSEC" and section == "ENTITIES":
+                        break
+                elif section == "HEADER" and name in ("$EXTMIN", "$EXTMAX") and code in ("10", "20"):
+                    header[name, code] = value
+                elif section == "ENTITIES" and code in ("10", "20"):
+                    points[code == "20"].append(value)
+
+        if self.valid_extents(header):
+            return (header["$EXTMIN", "10"], header["$EXTMIN", "20"], header["$EXTMAX", "10"], header["$EXTMAX", "20"])
+        if not points[0] or not points[1]:
+            return None
+        return (min(points[0]), min(points[1]), max(points[0]), max(points[1]))
+
+    @staticmethod
+    def valid_extents(header:dict) -> bool:
+        """Whether header extents are set, new drawings carry +1e20 / -1e20 until their extents are computed"""
+        if len(header) < 4:
+            return False
+        xmin, ymin, xmax, ymax = (header["$EXTMIN", "10"], header["$EXTMIN", "20"], header["$EXTMAX", "10"], header["$EXTMAX", "20"])
+        return xmin <= xmax and ymin <= ymax and max(map(abs, (xmin, ymin, xmax, ymax))) < 1e19
+
+    def fit_page(self, svg, extents:tuple) -> None:
+        """Set the page to the drawing extents plus margins, as mm, the width clamped to max_width"""
+        xmin, ymin, xmax, ymax = extents
+        px = 96 / 25.4
+        page_height = 297 * px  # dxf_input places the drawing on the bottom edge of an A4 page
+        width, height = (xmax - xmin) * self.scale, (ymax - ymin) * self.scale
+        svg.set("viewBox", " ".join(f"{i:g}" for i in (
+            -self.margin * px, page_height - (height + self.margin) * px, (width + 2 * self.margin) * px, (height + 2 * self.margin) * px,
+        )))
+
+        page_width, page_height = width + 2 * self.margin, height + 2 * self.margin
+        if page_width > self.max_width:
+            page_width, page_height = self.max_width, page_height * self.max_width / page_width
+        svg.set("width", f"{page_width:g}mm")
+        svg.set("height", f"{page_height:g}mm")
+
+    def write(self, dxf_file:str, output_path:str, recover:bool, options) -> None:
+        dxf_input = self.load()
+
+        # 1. Scale drawing units to mm as ezdxf does, with the extents' corner on the page origin
+        extents = self.read_extents(dxf_input, dxf_file)
+        args = [f"--scale={self.scale}"]
+        if extents:
+            args += [f"--xmin={extents[0]}", f"--ymin={extents[1]}"]
+
+        # 2. Convert & fit the page to the drawing
+        svg = dxf_input.import_dxf(dxf_file, *args).getroot()
+        if extents:
+            self.fit_page(svg, extents)
+
+        save_svg(svg.tostring(), output_path, options.svgz)
+
+ENGINES = {engine.name: engine for engine in (EzdxfEngine(), DxfInputEngine())}
+
+def load_costs(path:str=ENGINE_COSTS_PATH) -> dict:
+    """Calibrated engine costs, see calibrate, defaults for engines without a calibration"""
+    costs = dict(DEFAULT_COSTS)
+    try:
+        with open(path, "rt") as fp:
+            costs.update({name: tuple(cost) for name, cost in json.load(fp).items()})
+    except (OSError, ValueError):
+        pass
+    return costs
+
+def save_costs(costs:dict, path:str=ENGINE_COSTS_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wt") as fp:
+        json.dump(costs, fp, indent=2)
+
+def select_engine(dxf_file:str, recover:bool=False, engines:list=None, costs:dict=None) -> SvgEngine:
+    """
+    Pick the fastest engine which draws every entity type of a DXF file
+
+    - engine time is estimated from the file's entity count & the calibrated costs, see calibrate
+    - damaged files, loaded in recover mode, need an engine which recovers
+    - falls back to the ezdxf engine
+    """
+    engines = engines or list(ENGINES.values())
+    costs = costs or load_costs()
+    counts = entity_counts(dxf_file)
+    total = sum(counts.values())
+
+    candidates = [
+        engine for engine in engines
+        if (engine.recovers or not recover) and engine.name in costs and engine.supports(set(counts)) and engine.available()
+    ]
+    if not candidates:
+        return ENGINES["ezdxf"]
+
+    return min(candidates, key=lambda engine: costs[engine.name][0] + costs[engine.name][1] * total)
+
+def get_engine(name:str, dxf_file:str, recover:bool=False) -> SvgEngine:
+    """An engine by name, "auto" selects one per file, see select_engine"""
+    if name == "auto":
+        return select_engine(dxf_file, recover)
+    return ENGINES[name]
+
+def time_engines(dxf_file:str, options, engines:list=None) -> dict:
+    """
+    Render a DXF file with each engine which supports it
+
+    - returns {engine name: seconds}, engines which are unavailable, unsupported or fail are left out
+    """
+    engines = engines or list(ENGINES.values())
+    types = set(entity_counts(dxf_file))
+    times = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for engine in engines:
+            if not engine.available() or not engine.supports(types):
+                continue
+            start_time = perf_counter()
+            try:
+                engine.write(dxf_file, f"{work_dir}/{engine.name}.svg", False, options)
+            except Exception as e:
+                print(f"{engine.name} engine error : {e}")
+                continue
+            times[engine.name] = perf_counter() - start_time
+    return times
+
+def fit_costs(samples:dict, defaults:dict=DEFAULT_COSTS) -> dict:
+    """
+    Least squares (seconds per file, seconds per entity) of each engine
+
+    - samples are {engine name: [(entity count, seconds), ...]}
+    - samples of one entity count scale the engine's default costs to fit, else are all per entity time
+    """
+    import numpy as np
+    costs = {}
+    for name, points in samples.items():
+        counts, seconds = np.array(points, dtype=float).reshape(-1, 2).T
+        if len(set(counts)) > 1:
+            per_entity, per_file = np.polyfit(counts, seconds, 1)
+        elif name in defaults:
+            factor = seconds.mean() / (defaults[name][0] + defaults[name][1] * counts[0])
+            per_file, per_entity = defaults[name][0] * factor, defaults[name][1] * factor
+        else:
+            per_entity, per_file = seconds.sum() / max(counts.sum(), 1), 0.0
+        costs[name] = (max(float(per_file), 0.0), max(float(per_entity), 0.0))
+    return costs
+
+def calibrate(dxf_files:list, options, engines:list=None, path:str=ENGINE_COSTS_PATH) -> dict:
+    """
+    Time each engine on sample DXF files & save the fitted costs used by select_engine
+
+    - use drawings like the ones being converted, costs per entity differ by entity type
+    - returns the costs
+    """
+    samples = {}
+    for dxf_file in dxf_files:
+        total = sum(entity_counts(dxf_file).values())
+        for name, seconds in time_engines(dxf_file, options, engines).items():
+            samples.setdefault(name, []).append((total, seconds))
+
+    costs = fit_costs(samples)
+    save_costs(costs, path)
+    return costs
@@ -0,0 +1,182 @@
+# Glyph Outline Cache
+# Unit size TrueType glyph outlines shared across files & persisted on disk, for TextPolicy.FILLING
+import os, pickle, ezdxf
+from ezdxf.addons.drawing.pipeline import RenderPipeline2d
+from ezdxf.addons.drawing.unified_text_renderer import UnifiedTextRenderer
+from ezdxf.fonts import fonts
+from ezdxf.math import Matrix44
+from ezdxf.npshapes import NumpyPath2d
+
+GLYPH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "py-dwg-to-img", "glyphs.pkl")
+GLYPH_CACHE_ENV = "DWG_GLYPH_CACHE"
+CACHE_VERSION = 2
+
+def cache_path() -> str:
+    """Glyph cache file, from the DWG_GLYPH_CACHE environment variable or ~/.cache/py-dwg-to-img"""
+    return os.environ.get(GLYPH_CACHE_ENV) or GLYPH_CACHE_PATH
+
+class CachedTextRenderer(UnifiedTextRenderer):
+    """
+    Text renderer which looks up glyph outlines, advances & font measurements by font & glyph
+
+    - outlines are stored at cap height 1 & scaled per label, so one entry serves every text size
+    - the SVG backend keeps the Bézier curves, so no size class is needed for accuracy
+    - fonts are keyed by resolved file, size & modification time, so a replaced font file is drawn again
+    - a font whose glyphs are all cached is never loaded
+    - shape & stroke fonts are passed through to the ezdxf renderer
+    """
+    def __init__(self, path:str=None):
+        super().__init__()
+        self.path = path or cache_path()
+        self.fonts = {}
+        self.font_keys = {}
+        self.stroke_fonts = set()
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Read the cache file, entries from another ezdxf or cache version are dropped"""
+        try:
+            with open(self.path, "rb") as fp:
+                data = pickle.load(fp)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return
+
+        if data.get("version") == CACHE_VERSION and data.get("ezdxf") == ezdxf.__version__:
+            self.fonts = data["fonts"]
+
+    def save(self) -> None:
+        """
+        Merge new glyphs into the cache file, replaced atomically so parallel workers can share it
+
+        - entries of an older version of the same font file are dropped
+        """
+        if not self.dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        new_fonts, self.fonts = self.fonts, {}
+        self.load()
+        for key, font in new_fonts.items():
+            for stale in [other for other in self.fonts if other[0] == key[0] and other != key]:
+                del self.fonts[stale]
+            merged = self.fonts.setdefault(key, {"measurements": font["measurements"], "glyphs": {}})
+            merged["glyphs"].update(font["glyphs"])
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as fp:
+            pickle.dump({"version": CACHE_VERSION, "ezdxf": ezdxf.__version__, "fonts": self.fonts}, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def font_key(self, font_face:fonts.FontFace) -> tuple | None:
+        """
+        Resolved font file, size & modification time, None for fonts which are not TrueType files
+
+        - the font file name is resolved as UnifiedTextRenderer.get_font does
+        """
+        if not font_face.filename and font_face.family:
+            found = fonts.find_best_match(
+                family=font_face.family,
+                weight=700 if font_face.is_bold else 400,
+                italic=font_face.is_italic,
+            )
+            if found is not None:
+                font_face = found
+
+        name = font_face.filename.lower()
+        if name not in self.font_keys:
+            self.font_keys[name] = None
+            if os.path.splitext(name)[1] in fonts.SUPPORTED_TTF_TYPES:
+                try:
+                    file_path = os.path.realpath(fonts.font_manager.ttf_font_from_font_face(font_face).reader.file.name)
+                    stat = os.stat(file_path)
+                    self.font_keys[name] = (file_path, stat.st_size, stat.st_mtime_ns)
+                except (fonts.FontNotFoundError, AttributeError, OSError):
+                    pass
+        return self.font_keys[name]
+
+    def cached_font(self, font_face:fonts.FontFace) -> tuple[dict, fonts.FontFace] | None:
+        """Cache entry of a TrueType font, None for stroke fonts & font files which cannot be resolved"""
+        key = self.font_key(font_face)
+        if key is None or key in self.stroke_fonts:
+            return None
+        if key not in self.fonts:
+            abstract_font = self.get_font(font_face)
+            if not isinstance(abstract_font, fonts.TrueTypeFont):
+                self.stroke_fonts.add(key)
+                return None
+            self.fonts[key] = {"measurements": abstract_font.measurements, "glyphs": {}}
+            self.dirty = True
+        return self.fonts[key]
+
+    def glyph(self, font:dict, font_face:fonts.FontFace, char:str) -> tuple:
+        """Unit size (path, advance) of a glyph, drawn by ezdxf on a cache miss"""
+        try:
+            return font["glyphs"][char]
+        except KeyError:
+            pass
+        abstract_font = self.get_font(font_face)
+        paths = abstract_font.text_glyph_paths(char, 1.0)
+        path = paths[0] if paths else NumpyPath2d(None)
+        # text_width_ex measures whitespace as 0, a space advances by the space width
+        advance = abstract_font.text_width_ex(char, 1.0) if char.strip() else abstract_font.space_width()
+        entry = (path, advance)
+        font["glyphs"][char] = entry
+        self.dirty = True
+        return entry
+
+    def is_stroke_font(self, font_face:fonts.FontFace) -> bool:
+        if self.cached_font(font_face) is None:
+            return super().is_stroke_font(font_face)
+        return False
+
+    def get_font_measurements(self, font_face:fonts.FontFace, cap_height:float=1.0):
+        font = self.cached_font(font_face)
+        if font is None:
+            return super().get_font_measurements(font_face, cap_height)
+        return font["measurements"].scale(cap_height)
+
+    def get_text_glyph_paths(self, text:str, font_face:fonts.FontFace, cap_height:float=1.0) -> list[NumpyPath2d]:
+        font = self.cached_font(font_face)
+        if font is None:
+            return super().get_text_glyph_paths(text, font_face, cap_height)
+
+        # Glyph lookup plus a scale & horizontal offset, as TTFontRenderer.get_text_glyph_paths
+        paths = []
+        x_offset = 0.0
+        for char in text:
+            glyph, advance = self.glyph(font, font_face, char)
+            if len(glyph):
+                path = glyph.clone()
+                path.transform_inplace(Matrix44.chain(Matrix44.scale(cap_height, cap_height, 1), Matrix44.translate(x_offset, 0, 0)))
+                paths.append(path)
+            x_offset += advance * cap_height
+        return paths
+
+    def get_text_line_width(self, text:str, font_face:fonts.FontFace, cap_height:float=1.0) -> float:
+        font = self.cached_font(font_face)
+        if font is None:
+            return super().get_text_line_width(text, font_face, cap_height)
+        if not text.strip():
+            return 0.0
+        return sum(self.glyph(font, font_face, char)[1] for char in text) * cap_height
+
+def install(path:str=None) -> CachedTextRenderer:
+    """Use the glyph cache for every ezdxf render pipeline in this process, at the path or cache_path()"""
+    path = path or cache_path()
+    engine = RenderPipeline2d.text_engine
+    if not isinstance(engine, CachedTextRenderer) or engine.path != path:
+        engine = CachedTextRenderer(path)
+        RenderPipeline2d.text_engine = engine
+    return engine
+
+def uninstall() -> None:
+    """Restore the ezdxf text renderer"""
+    if isinstance(RenderPipeline2d.text_engine, CachedTextRenderer):
+        RenderPipeline2d.text_engine = UnifiedTextRenderer()
+
+def save() -> None:
+    """Persist glyphs added in this process, if the cache is installed"""
+    if isinstance(RenderPipeline2d.text_engine, CachedTextRenderer):
+        RenderPipeline2d.text_engine.save()
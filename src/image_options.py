@@ -0,0 +1,29 @@
+# Image Output Options
+# PNG encoding & strip raster settings, apart from the numpy encoders so the CLI imports them without numpy
+from typing import NamedTuple
+
+class PngOptions(NamedTuple):
+    """
+    PNG encoding settings, see png_encoder.py
+
+    - mode : auto (lossless reduction), bilevel (1 bit threshold), gray, palette or rgba
+    - level : zlib level 0 - 9
+    - filter : row filter name or adaptive, see png_encoder.FILTERS
+    - strategy : zlib strategy name, see png_encoder.STRATEGIES
+    - optimize : try the filter & strategy png_encoder.TRIALS at level 9 & keep the smallest
+    """
+    mode: str = "auto"
+    level: int = 6
+    filter: str = "adaptive"
+    strategy: str = "default"
+    optimize: bool = False
+
+class RasterOptions(NamedTuple):
+    """
+    In-process raster output, used in place of Inkscape, see raster.py
+
+    - dpi of the exported page, e.g. 600 for print resolution
+    - strip_height in pixel rows, peak raster memory is strip_height x width x channels
+    """
+    dpi: float = 96
+    strip_height: int = 512
@@ -0,0 +1,129 @@
+# Block Instancing
+# Draw each block definition once as an SVG <symbol> & place its INSERTs with <use>
+import math
+from xml.etree import ElementTree as ET
+from ezdxf import xclip
+from ezdxf.addons.drawing import Frontend, svg, layout
+from ezdxf.addons.drawing.recorder import Recorder
+from ezdxf.entities import Insert
+from ezdxf.math import BoundingBox2d, Matrix44, Vec2, Vec3, Z_AXIS
+
+XLINK = "http://www.w3.org/1999/xlink"
+ET.register_namespace("xlink", XLINK)
+
+def is_instanceable(insert:Insert) -> bool:
+    """
+    INSERTs which can be placed by a 2D translation & rotation of a shared drawing
+
+    - top level, single (not MINSERT), unclipped, in the WCS XY plane & of a local block
+    """
+    if insert.is_virtual or insert.mcount > 1 or not Vec3(insert.dxf.extrusion).isclose(Z_AXIS):
+        return False
+    block = insert.block()
+    if block is None or block.block.is_xref:
+        return False
+    return not xclip.XClip(insert).has_clipping_path
+
+def instance_key(insert:Insert) -> tuple:
+    """Block name, properties inherited by the block entities & the scale, the parts of an INSERT a symbol bakes in"""
+    dxf = insert.dxf
+    return (
+        dxf.name, dxf.layer, dxf.get("color", 256), dxf.get("true_color"), dxf.get("lineweight", -1),
+        dxf.get("linetype", "BYLAYER"), dxf.get("ltscale", 1.0), dxf.xscale, dxf.yscale, dxf.zscale,
+    )
+
+class InstancingSVGBackend(svg.SVGBackend):
+    """
+    SVG backend which writes one <symbol> per instance key & a <use> per INSERT
+
+    - symbols hold the block drawn at its INSERT scale, uses add the rotation & insert point
+    - uses are drawn after the other entities
+    """
+    def __init__(self):
+        super().__init__()
+        self.symbols = {}
+        self.instances = []
+        self.render_backend = None
+
+    def make_backend(self, page:layout.Page, settings:layout.Settings) -> svg.SVGRenderBackend:
+        self.render_backend = super().make_backend(page, settings)
+        return self.render_backend
+
+    def placements(self) -> list[tuple[int, Matrix44]]:
+        """Symbol number (from 1) & symbol to WCS matrix of each instance"""
+        numbers = {key: number for number, key in enumerate(self.symbols, 1)}
+        return [
+            (numbers[key], Matrix44.chain(Matrix44.z_rotate(math.radians(rotation)), Matrix44.translate(insert.x, insert.y, 0)))
+            for key, insert, rotation in self.instances
+        ]
+
+    def get_xml_root_element(
+        self, page:layout.Page, *, settings:layout.Settings=layout.Settings(), render_box:BoundingBox2d|None=None,
+    ) -> ET.Element:
+        # 1. Fit the page to the drawn entities & the placed symbols
+        placements = self.placements()
+        if render_box is None:
+            render_box = BoundingBox2d()
+            boxes = [self.player().bbox()] + [recorder.player().bbox() for recorder in self.symbols.values()]
+            if boxes[0].has_data:
+                render_box.extend(boxes[0].rect_vertices())
+            for number, m in placements:
+                if boxes[number].has_data:
+                    render_box.extend(m.fast_2d_transform(boxes[number].rect_vertices()))
+
+        root = super().get_xml_root_element(page, settings=settings, render_box=render_box)
+        if self.render_backend is None or not self.symbols:
+            return root
+
+        # 2. Draw each symbol once, scaled & flipped into the output space without the page offset
+        backend = self.render_backend
+        scale = Matrix44(self.transformation_matrix)
+        scale[3, 0], scale[3, 1] = 0.0, 0.0
+        entities = backend.entities
+        defs = root.find("defs")
+        for number, recorder in enumerate(self.symbols.values(), 1):
+            player = recorder.player().copy()
+            player.background = self.background
+            player.transform(scale)
+            backend.entities = ET.SubElement(defs, "symbol", id=f"S{number:X}", overflow="visible")
+            player.replay(backend)
+        backend.entities = entities
+
+        # 3. Place the symbols, the y axis is flipped in the output so rotations are clockwise
+        for number, m in placements:
+            origin = self.transformation_matrix.transform(m.transform(Vec3()))
+            angle = -math.degrees(Vec2(m.transform_direction((1, 0, 0))).angle)
+            ET.SubElement(entities, "use", {
+                f"{{{XLINK}}}href": f"#S{number:X}",
+                "transform": f"translate({origin.x:.0f} {origin.y:.0f}) rotate({angle:.6g})",
+            })
+        return root
+
+class InstancingFrontend(Frontend):
+    """Frontend which hands instanceable INSERTs to an InstancingSVGBackend, see is_instanceable"""
+
+    def draw_composite_entity(self, entity, properties) -> None:
+        backend = self.pipeline.backend
+        if not isinstance(entity, Insert) or not is_instanceable(entity):
+            return super().draw_composite_entity(entity, properties)
+
+        key = instance_key(entity)
+        if key not in backend.symbols:
+            backend.symbols[key] = self.draw_symbol(entity)
+        backend.instances.append((key, Vec2(entity.dxf.insert), entity.dxf.rotation))
+
+        # ATTRIBs are located outside of the block reference & are drawn as entities
+        self.ctx.push_state(properties)
+        self.draw_entities(entity.attribs)
+        self.ctx.pop_state()
+
+    def draw_symbol(self, insert:Insert) -> Recorder:
+        """Record the block of an INSERT at its scale, without rotation or insert point"""
+        dxfattribs = insert.dxfattribs(drop={"handle", "owner"})
+        proxy = Insert.new(dxfattribs={**dxfattribs, "insert": (0, 0, 0), "rotation": 0}, doc=insert.doc)
+
+        recorder = Recorder()
+        frontend = Frontend(self.ctx, recorder, self.config)
+        frontend.draw_entities([proxy])
+        frontend.pipeline.finalize()
+        return recorder
@@ -24,6 +24,13 @@
 Input a DXF file >= (AutoCAD Release 13 == AC1012)
 """
 
+import codecs
+import concurrent.futures
+import contextlib
+import functools
+import io
+import itertools
+import mmap
 import os
 import re
 import struct
@@ -31,24 +38,13 @@ import sys
 import math
 
 from collections import defaultdict
-from typing import Tuple
 from urllib.parse import quote
 from lxml import etree
+import numpy as np
 
 import inkex
 from inkex.localization import inkex_gettext as _
 
-global defs
-global block  # 2021.6
-global layer
-global svg
-global scale
-global xmin
-global ymin
-global height
-global style_font3
-global style_direction
-
 COLORS = [
     "PAD",
     "#FF0000",
@@ -330,6 +326,246 @@ def get_rgbcolor(dxfcolor, parent_color="#000000"):
     return rgbcolor
 
 
+TEXT_CODES = ("1", "2", "3", "6", "7", "8")  # string values which keep their spaces
+ASCII_CHUNK = 1 << 22  # bytes tokenized at once
+
+
+def group_code_format(code):
+    """Returns the binary DXF value format of a group code
+
+    "s" zero terminated string, "d" double, "h", "i" & "q" 2, 4 & 8 byte
+    integers, "?" 1 byte boolean, "b" length prefixed binary chunk, None if
+    the code is unknown. Data types inferred from
+    https://help.autodesk.com/view/OARX/2023/ENU/?guid=GUID-2553CF98-44F6-4828-82DD-FE3BC7448113
+    """
+    if (
+        code <= 9
+        or 100 <= code <= 109
+        or 300 <= code <= 309
+        or 320 <= code <= 369
+        or 390 <= code <= 399
+        or 410 <= code <= 419
+        or 430 <= code <= 439
+        or 470 <= code <= 481
+        or 999 <= code <= 1009
+    ):
+        return "s"
+    if (
+        10 <= code <= 59
+        or 110 <= code <= 149
+        or 210 <= code <= 239
+        or 460 <= code <= 469
+        or 1010 <= code <= 1059
+    ):
+        return "d"
+    if (
+        60 <= code <= 79
+        or 170 <= code <= 179
+        or 270 <= code <= 289
+        or 370 <= code <= 389
+        or 400 <= code <= 409
+        or 1060 <= code <= 1070
+    ):
+        return "h"
+    if 80 <= code <= 99 or 420 <= code <= 429 or 440 <= code <= 459 or code == 1071:
+        return "i"
+    if 160 <= code <= 169:
+        return "q"
+    if 290 <= code <= 299:
+        return "?"
+    if 310 <= code <= 319:
+        return "b"
+    return None
+
+
+GROUP_FORMATS = [group_code_format(code) for code in range(1072)]
+VALUE_TYPES = {"s": str, "d": float, "h": int, "i": int, "q": int, "?": bool, "b": bytes}
+
+
+def group_code_type(code):
+    """Returns the value type of a group code: str, float, int, bool, bytes or None"""
+    if 0 <= code < len(GROUP_FORMATS):
+        return VALUE_TYPES.get(GROUP_FORMATS[code])
+    return None
+
+
+def _binary_groups():
+    """Returns the binary reader table: (code, format, unpack_from or None, size) per group code"""
+    table = []
+    for code, fmt in enumerate(GROUP_FORMATS):
+        if fmt in ("d", "h", "i", "q", "?"):
+            unpacker = struct.Struct("<" + fmt)
+            table.append((str(code), fmt, unpacker.unpack_from, unpacker.size))
+        else:
+            table.append((str(code), fmt, None, 0))
+    table.append((None, None, None, 0))  # codes past the table are unknown
+    return table
+
+
+BINARY_GROUPS = _binary_groups()
+BINARY_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+
+
+def _keep_text(value):
+    return value.rstrip("\r")
+
+
+def _ascii_group(raw_code):
+    """Returns the (code, converter) of a raw ASCII group code line"""
+    code = raw_code.strip()
+    try:
+        kind = group_code_type(int(code))
+    except ValueError:
+        return code, str.strip
+    if code in TEXT_CODES:
+        return code, _keep_text
+    if kind is float:
+        return code, float
+    if kind in (int, bool):
+        return code, int
+    return code, str.strip
+
+
+def read_chunks(stream, size=ASCII_CHUNK):
+    """Yield the rest of a stream in large chunks, memory mapped for files"""
+    try:
+        view = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        view = None  # pipes, in memory streams & empty files
+    if view is None:
+        for chunk in iter(lambda: stream.read(size), b""):
+            yield chunk
+        return
+    with view:
+        for start in range(stream.tell(), len(view), size):
+            yield view[start : start + size]
+
+
+def map_stream(stream):
+    """Returns the whole stream as an mmap for files, else as bytes"""
+    try:
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        stream.seek(0)
+        return stream.read()
+
+
+ENTITIES_SECTION = re.compile(rb"\s*0\r?\n\s*SECTION\r?\n\s*2\r?\nENTITIES\r?\n")
+END_SECTION = re.compile(rb"\n\s*0\r?\n\s*ENDSEC\r?\n")
+# a (0, <entity>) group, VERTEX / SEQEND / ATTRIB belong to the entity before them
+ENTITY_START = re.compile(rb"\n[ \t]*0\r?\n(?!VERTEX|SEQEND|ATTRIB)[A-Z]")
+
+
+def split_entities(stream, chunks):
+    """Split the ENTITIES section of an ASCII DXF stream into byte ranges
+
+    Ranges are of about equal size & start on an entity, so POLYLINE & INSERT
+    sub-entities stay with their parent. Returns (start, end) offsets in file
+    order, without the ENDSEC of the section.
+    """
+    data = map_stream(stream)
+    try:
+        start = ENTITIES_SECTION.search(data)
+        end = END_SECTION.search(data, start.end() - 1) if start else None
+        if end is None:
+            return []
+        start, end = start.end(), end.start() + 1
+        bounds = [start]
+        for i in range(1, chunks):
+            match = ENTITY_START.search(
+                data, start + i * (end - start) // chunks - 1, end
+            )
+            if match and match.start() + 1 > bounds[-1]:
+                bounds.append(match.start() + 1)
+        bounds.append(end)
+        return list(zip(bounds[:-1], bounds[1:]))
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def iter_binary_groups(stream, encoding="utf-8"):
+    """Yield the (code, value) pairs of a binary DXF stream
+
+    Values are read in place from the mapped file with precompiled structs,
+    strings are cut at the next zero byte. Codes are returned as strings as
+    for ASCII DXF, binary chunks as upper case hex as written in ASCII DXF.
+    """
+    data = map_stream(stream)
+    size = len(data)
+    pos = len(BINARY_SENTINEL)
+    unpack_key = struct.Struct("<H").unpack_from
+    find = data.find
+    table = BINARY_GROUPS
+    try:
+        while pos + 2 <= size:
+            (key,) = unpack_key(data, pos)
+            pos += 2
+            code, fmt, unpack, width = table[key] if key < len(table) else table[-1]
+            if unpack is not None:
+                (value,) = unpack(data, pos)
+                pos += width
+                if fmt == "?":
+                    value = int(value)
+            elif fmt == "s":
+                end = find(b"\x00", pos)
+                if end < 0:
+                    end = size
+                value = data[pos:end].decode(encoding).replace("\t", "")
+                pos = end + 1
+            elif fmt == "b":
+                length = data[pos]
+                value = data[pos + 1 : pos + 1 + length].hex().upper()
+                pos += 1 + length
+            else:
+                inkex.errormsg(
+                    _(
+                        "Encountered key of unknown format, id={0} while parsing DXF. This is probably a bug."
+                    ).format(key)
+                )
+                return
+            yield code, value
+    except struct.error:
+        return  # truncated file
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def iter_ascii_groups(stream, encoding="latin_1", chunk_size=ASCII_CHUNK):
+    """Yield the (code, value) pairs of an ASCII DXF stream from its current position
+
+    The stream is split into lines a chunk at a time, codes are returned as
+    strings & values converted to the type of their group code. Text values
+    keep their spaces, other strings are stripped.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    groups = {}
+    pending = ""
+    for chunk in itertools.chain(read_chunks(stream, chunk_size), [None]):
+        if chunk is None:
+            text = pending + decoder.decode(b"", final=True)
+            lines = text.split("\n") if text else []
+            if len(lines) % 2:
+                lines.append("")
+        else:
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            # keep the partial last line & an unpaired code line for the next chunk
+            pending = lines.pop()
+            if len(lines) % 2:
+                pending = lines.pop() + "\n" + pending
+        for raw_code, value in zip(lines[0::2], lines[1::2]):
+            entry = groups.get(raw_code)
+            if entry is None:
+                entry = groups[raw_code] = _ascii_group(raw_code)
+            code, convert = entry
+            try:
+                value = convert(value)
+            except ValueError:
+                value = value.strip()
+            yield code, value
+
+
 class ValueConstruct(defaultdict):
     """Store values from the DXF and provide them as named attributes"""
 
@@ -349,13 +585,13 @@ class ValueConstruct(defaultdict):
         "23": ("y3",),
         "24": ("y4",),
         "40": ("scale", "knots", "radius", "width_ratio"),
-        "41": ("ellipse_a1", "insert_scale_x", "mtext_width"),
+        "41": ("ellipse_a1", "insert_scale_x", "mtext_width", "weight"),
         "42": ("ellipse_a2", "bulge", "insert_scale_y"),
         "50": ("angle",),
         "51": ("angle2",),
         "62": ("color",),
         "70": ("fill", "flags"),
-        "71": ("attach_pos",),
+        "71": ("attach_pos", "degree"),
         "72": ("edge_type",),
         "73": ("sweep",),  # ccw
         "92": ("path_type",),
@@ -365,25 +601,35 @@ class ValueConstruct(defaultdict):
     }
     attrs = dict([(name, a) for a, b in values.items() for name in b])
 
+    lookups = dict(
+        [(name, (a, False)) for name, a in attrs.items()]
+        + [(name + "_list", (a, True)) for name, a in attrs.items()]
+    )
+
     def __init__(self):
         super().__init__(list)
+        object.__setattr__(self, "decoded", set())
 
     @classmethod
     def is_valid(cls, key):
         return key in cls.values
 
     def __getattr__(self, attr):
-        is_list = attr.endswith("_list")
-        key = attr[:-5] if is_list else attr
-        if key in self.attrs:
-            ret = self[self.attrs[key]]
-            if not attr.endswith("_list"):
+        if attr in self.lookups:
+            code, is_list = self.lookups[attr]
+            if code in TEXT_CODES and code not in self.decoded:
+                # text is cleaned on first access, codes no exporter reads stay raw
+                self[code] = [clean_text(val) for val in self[code]]
+                self.decoded.add(code)
+            ret = self[code]
+            if not is_list:
                 return ret[0]
             return ret
         if attr.startswith("has_"):
             key = attr[4:]
             if key in self.attrs:
                 return self.attrs[key] in self
+        key = attr[:-5] if attr.endswith("_list") else attr
         raise AttributeError(f"Can't find dxf attribute '{key}' {attr}")
 
     def __setattr__(self, attr, value):
@@ -392,6 +638,7 @@ class ValueConstruct(defaultdict):
         if not isinstance(value, list):
             value = [value]
         self[self.attrs[attr]] = value
+        self.decoded.add(self.attrs[attr])
 
     def adjust_coords(self, xmin, ymin, scale, extrude, height):
         """Adjust the x,y coordinates to fit on the page"""
@@ -403,30 +650,410 @@ class ValueConstruct(defaultdict):
                 self[ygrp][i] = height - scale * (self[ygrp][i] - ymin)
 
 
-export_viewport = False
-export_endsec = False
-
-
 def re_hex2unichar(m):
     # return unichr(int(m.group(1), 16))
     return chr(int(m.group(1), 16))
 
 
+# MTEXT codes the exporters do not handle: \~ (non-breaking space), ^I (tab), {\L (underline) & \U+XXXX
+MTEXT_CODES = re.compile(r"\\~|\^I|{\\L|\\U\+([0-9A-Fa-f]{4})")
+
+
+def mtext_code(m):
+    if m.group(1):
+        return re_hex2unichar(m)
+    return " " if m.group(0) == r"\~" else ""
+
+
+def cut_mtext(val, code):
+    """Remove from the first code to the last ';' after it, as re.sub(code + ".*;", "", val)"""
+    start = val.find(code)
+    end = val.rfind(";", start + 2) if start >= 0 else -1
+    if end < 0:
+        return val
+    return val[:start] + val[end + 1 :]
+
+
+def clean_text(val):
+    """Strip the MTEXT formatting codes from a text group value"""
+    # TODO: if add funs of export_mtext, delete the codes from here
+    if "\\" not in val and "^" not in val:
+        return val
+    val = MTEXT_CODES.sub(mtext_code, val)
+    # stacked fractions & width factors
+    return cut_mtext(cut_mtext(val, r"\S"), r"\W")
+
+
 def formatStyle(style):
     return str(inkex.Style(style))
 
 
-def export_text(vals):
+class PathData:
+    """Build the d string of an SVG path in linear time
+
+    Commands are templates with %f & %d fields, the coordinates are collected
+    in one list & formatted in a single pass when the path is converted to a
+    string, with %f fields written at the requested precision.
+    """
+
+    def __init__(self, precision=6):
+        self.templates = []
+        self.coords = []
+        self.precision = precision
+
+    def add(self, template, *coords):
+        self.templates.append(template)
+        self.coords.extend(coords)
+        return self
+
+    def __str__(self):
+        template = "".join(self.templates)
+        if self.precision != 6:
+            template = template.replace("%f", "%%.%df" % self.precision)
+        return template % tuple(self.coords)
+
+
+def bulge_arcs(x, y, bulge):
+    """SVG arc radius, large-arc & sweep flags of bulged polyline segments
+
+    Segment i runs from vertex i to vertex i + 1 with the bulge of vertex i,
+    the segments of a whole polyline are converted at once. Segments with a
+    zero bulge are straight & their radius is not used.
+    """
+    x, y, bulge = (np.asarray(v, dtype=float) for v in (x, y, bulge))
+    b = np.abs(bulge)
+    chord = np.sqrt((x[1:] - x[:-1]) ** 2 + (y[1:] - y[:-1]) ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = 0.25 * chord * (b + 1.0 / b)
+    return r, (b > 1).astype(int), (bulge < 0).astype(int)
+
+
+def ellipse_points(rm, w, rotation, angles):
+    """Points at parameter angles of ellipses centred on the origin
+
+    rm is the major radius, w the minor to major ratio & rotation the angle of
+    the major axis, angles are in radians & a circle has w 1 & rotation 0.
+    The arguments broadcast, so the end points of a batch of arcs or the
+    samples of one ellipse are computed at once.
+    """
+    xt = rm * np.cos(angles)
+    yt = w * rm * np.sin(angles)
+    if np.all(rotation == 0):
+        return xt, yt
+    cos_a, sin_a = np.cos(rotation), np.sin(rotation)
+    return xt * cos_a - yt * sin_a, xt * sin_a + yt * cos_a
+
+
+def basis_functions(degree, window, u):
+    """Nonzero B-spline basis functions at parameters u, one row per parameter
+
+    Each row of window holds knots[i - degree + 1 : i + degree + 1] of the
+    span i of its parameter, the columns of the result are the functions
+    N[i - degree] .. N[i] (The NURBS Book, A2.2, for all rows at once).
+    """
+    N = np.zeros((len(u), degree + 1))
+    N[:, 0] = 1.0
+    left = np.empty((len(u), degree + 1))
+    right = np.empty((len(u), degree + 1))
+    for j in range(1, degree + 1):
+        left[:, j] = u - window[:, degree - j]
+        right[:, j] = window[:, degree - 1 + j] - u
+        saved = 0.0
+        for r in range(j):
+            temp = N[:, r] / (right[:, r + 1] + left[:, j - r])
+            N[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        N[:, j] = saved
+    return N
+
+
+def spline_points(degree, window, ctrl, u, derivative=False):
+    """Points, or first derivatives, of B-spline spans at parameters u
+
+    ctrl holds the degree + 1 control points of each row's span, with a
+    last column of weights for homogeneous points, see basis_functions for
+    window. The derivative is of the polynomial, not the rational curve.
+    """
+    if not derivative:
+        return np.einsum("qr,qrk->qk", basis_functions(degree, window, u), ctrl)
+    # derivative control points, with the basis one degree lower
+    scale = degree / (window[:, degree:] - window[:, :degree])
+    ctrl = (ctrl[:, 1:] - ctrl[:, :-1]) * scale[:, :, None]
+    basis = basis_functions(degree - 1, window[:, 1:-1], u)
+    return np.einsum("qr,qrk->qk", basis, ctrl)
+
+
+def spline_spans(degree, knots, counts):
+    """Spans of splines of one degree, as indices into their joined knots
+
+    knots are the knot vectors of the splines joined end to end & counts
+    their control point counts. Returns the index of the first knot of each
+    span of nonzero length in the domain [knots[degree], knots[count]] & the
+    spline it belongs to, in order.
+    """
+    lengths = counts + degree + 1
+    spline = np.repeat(np.arange(len(counts)), lengths)
+    local = np.arange(len(knots)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    inside = (local >= degree) & (local < counts[spline])
+    inside[:-1] &= knots[:-1] < knots[1:]
+    spans = np.flatnonzero(inside)
+    return spans, spline[spans]
+
+
+class GeometryBatch:
+    """Circles, arcs, ellipses & bulged polylines waiting for their path data
+
+    The exporters add each path element in document order & queue its
+    geometry. The d attributes of the queued elements are set at once with
+    the geometry kernel when a batch is full, and must be set with flush
+    before the document is written.
+    """
+
+    def __init__(self, precision=6, size=4096, tolerance=0.1):
+        self.precision = precision
+        self.size = size
+        self.tolerance = tolerance  # of flattened splines
+        self.ellipses = []  # (element, xc, yc, xm, ym, w, a1, a2)
+        self.polylines = []  # (element, x, y, segment bulges, closed)
+        self.splines = []  # (element, degree, knots, x, y, weights, closed)
+
+    def add_ellipse(self, element, xc, yc, xm, ym, w, a1, a2):
+        self.ellipses.append((element, xc, yc, xm, ym, w, a1, a2))
+        if len(self.ellipses) >= self.size:
+            self.flush_ellipses()
+
+    def add_polyline(self, element, x, y, bulges, closed):
+        self.polylines.append((element, x, y, bulges, closed))
+        if len(self.polylines) >= self.size:
+            self.flush_polylines()
+
+    def add_spline(self, element, degree, knots, x, y, weights, closed):
+        self.splines.append((element, degree, knots, x, y, weights, closed))
+        if len(self.splines) >= self.size:
+            self.flush_splines()
+
+    def flush(self):
+        self.flush_ellipses()
+        self.flush_polylines()
+        self.flush_splines()
+
+    def flush_ellipses(self):
+        if not self.ellipses:
+            return
+        elements, *params = zip(*self.ellipses)
+        xc, yc, xm, ym, w, a1, a2 = np.array(params, dtype=float)
+        rm = np.sqrt(xm * xm + ym * ym)
+        a = np.arctan2(ym, xm)  # x-axis-rotation
+        diff = (a2 - a1 + 2 * math.pi) % (2 * math.pi)
+        is_open = (np.abs(diff) > 0.0000001) & (np.abs(diff - 2 * math.pi) > 0.0000001)
+        x1, y1 = ellipse_points(rm, w, a, a1)
+        x2, y2 = ellipse_points(rm, w, a, a2)
+        columns = (
+            is_open,
+            diff > math.pi,  # large-arc-flag
+            rm,
+            w * rm,
+            -180.0 * a / math.pi,
+            xc + x1,
+            yc - y1,
+            xc + x2,
+            yc - y2,
+            xc + xm,
+            yc - ym,
+            xc - xm,
+            yc + ym,
+        )
+        for element, (open_arc, large, rx, ry, angle, *points) in zip(
+            elements, zip(*(column.tolist() for column in columns))
+        ):
+            path = PathData(self.precision)
+            if open_arc:
+                path.add(
+                    "M %f,%f A %f,%f %f %d 0 %f,%f",
+                    *points[:2],
+                    rx,
+                    ry,
+                    angle,
+                    large,
+                    *points[2:4],
+                )
+            else:  # closed arc
+                path.add(
+                    "M %f,%f A %f,%f %f 0, 0 %f,%f A %f,%f %f 0, 0 %f,%f z",
+                    *points[4:6],
+                    rx,
+                    ry,
+                    angle,
+                    *points[6:8],
+                    rx,
+                    ry,
+                    angle,
+                    *points[4:6],
+                )
+            element.set("d", str(path))
+        self.ellipses = []
+
+    def flush_polylines(self):
+        if not self.polylines:
+            return
+        # the segments of all polylines in one pass, less those joining two polylines
+        x = list(itertools.chain.from_iterable(p[1] for p in self.polylines))
+        y = list(itertools.chain.from_iterable(p[2] for p in self.polylines))
+        bulges = list(itertools.chain.from_iterable(p[3] + [0] for p in self.polylines))
+        r, large, sweep = (v.tolist() for v in bulge_arcs(x, y, bulges[:-1]))
+        start = 0
+        for element, px, py, pb, closed in self.polylines:
+            path = PathData(self.precision).add("M %f,%f", px[0], py[0])
+            for i in range(1, len(px)):
+                if pb[i - 1]:
+                    j = start + i - 1
+                    path.add(
+                        " A %f,%f 0.0 %d %d %f,%f",
+                        r[j],
+                        r[j],
+                        large[j],
+                        sweep[j],
+                        px[i],
+                        py[i],
+                    )
+                else:
+                    path.add(" L %f,%f", px[i], py[i])
+            if closed:
+                path.add(" z")
+            element.set("d", str(path))
+            start += len(px)
+        self.polylines = []
+
+    def flush_splines(self):
+        """Set the path data of the queued splines, by degree & kind
+
+        Polynomial splines up to cubic are written as exact Bezier segments
+        from the ends & end derivatives of each span. Rational & higher
+        degree splines are flattened to lines within the tolerance, see
+        flatten_spans.
+        """
+        groups = defaultdict(list)
+        for spline in self.splines:
+            degree, weights = spline[1], spline[5]
+            groups[degree, degree > 3 or weights is not None].append(spline)
+        for (degree, flatten), splines in groups.items():
+            elements, _, knots, xs, ys, weights, closed = zip(*splines)
+            counts = np.array([len(x) for x in xs])
+            knot_start = np.cumsum(counts + degree + 1) - (counts + degree + 1)
+            ctrl_start = np.cumsum(counts) - counts
+            knots = np.array(list(itertools.chain.from_iterable(knots)), dtype=float)
+            ctrl = np.ones((counts.sum(), 3))
+            ctrl[:, 0] = list(itertools.chain.from_iterable(xs))
+            ctrl[:, 1] = list(itertools.chain.from_iterable(ys))
+            for i, w in enumerate(weights):
+                if w is not None:  # homogeneous control points
+                    rows = slice(ctrl_start[i], ctrl_start[i] + counts[i])
+                    ctrl[rows] *= np.asarray(w, dtype=float)[:, None]
+
+            # knots & control points of each span
+            spans, spline = spline_spans(degree, knots, counts)
+            first_ctrl = ctrl_start[spline] + spans - knot_start[spline] - degree
+            window = knots[spans[:, None] + np.arange(1 - degree, degree + 1)]
+            span_ctrl = ctrl[first_ctrl[:, None] + np.arange(degree + 1)]
+            a, b = knots[spans], knots[spans + 1]
+            if flatten:
+                points, segments = self.flatten_spans(degree, window, span_ctrl, a, b)
+            else:
+                points, segments = self.bezier_spans(degree, window, span_ctrl, a, b)
+            # the start of each spline's first span
+            starts = spline_points(degree, window, span_ctrl, a)
+            if flatten:
+                starts = starts[:, :2] / starts[:, 2:]
+            starts = starts[:, :2].tolist()
+
+            per_spline = np.bincount(spline, minlength=len(elements))
+            first_span = np.cumsum(per_spline) - per_spline
+            per_span = np.bincount(spline, weights=segments, minlength=len(elements))
+            first_point = (np.cumsum(per_span) - per_span).astype(int)
+            points = points.ravel().tolist()
+            size = 1 if flatten else degree  # points per command
+            command = (" L" if flatten else " " + "LQC"[degree - 1]) + " %f,%f" * size
+            for i, element in enumerate(elements):
+                if not per_spline[i]:  # no span of nonzero length
+                    element.getparent().remove(element)
+                    continue
+                count = int(per_span[i]) // size
+                path = PathData(self.precision).add("M %f,%f", *starts[first_span[i]])
+                start = first_point[i] * 2
+                path.add(command * count, *points[start : start + count * size * 2])
+                if closed[i]:
+                    path.add(" z")
+                element.set("d", str(path))
+        self.splines = []
+
+    @staticmethod
+    def bezier_spans(degree, window, ctrl, a, b):
+        """Bezier control & end points of polynomial spans, degree points each"""
+        end = spline_points(degree, window, ctrl, b)[:, :2]
+        if degree == 1:
+            return end, np.ones(len(a))
+        start = spline_points(degree, window, ctrl, a)[:, :2]
+        start_tangent = spline_points(degree, window, ctrl, a, True)[:, :2]
+        step = ((b - a) / degree)[:, None]
+        if degree == 2:
+            points = (start + step * start_tangent, end)
+        else:
+            end_tangent = spline_points(degree, window, ctrl, b, True)[:, :2]
+            points = (start + step * start_tangent, end - step * end_tangent, end)
+        return np.stack(points, axis=1), np.full(len(a), degree)
+
+    def flatten_spans(self, degree, window, ctrl, a, b):
+        """Chord end points of flattened spans & their count per span
+
+        The chord count of a span is given by Wang's formula on its control
+        points. That does not bound rational spans, so their counts are
+        doubled while a chord midpoint is further than the tolerance from
+        the curve.
+        """
+        plane = ctrl[:, :, :2] / ctrl[:, :, 2:]
+        second = plane[:, 2:] - 2 * plane[:, 1:-1] + plane[:, :-2]
+        second = np.linalg.norm(second, axis=2)
+        bound = degree * (degree - 1) * second.max(axis=1, initial=0.0)
+        chords = np.clip(np.ceil(np.sqrt(bound / (8 * self.tolerance))), 1, 256)
+        chords = chords.astype(int)
+
+        def evaluate(rows, steps, first):
+            # points at a + k (b - a) / steps of the spans rows, k from first
+            count = steps + 1 - first
+            span = np.repeat(rows, count)
+            k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            k += first
+            u = a[span] + (b - a)[span] * k / np.repeat(steps, count)
+            u[np.cumsum(count) - 1] = b[rows]  # exact span ends
+            points = spline_points(degree, window[span], ctrl[span], u)
+            return points[:, :2] / points[:, 2:], span, k
+
+        rows = np.flatnonzero(np.ptp(ctrl[:, :, 2], axis=1) > 0)
+        for _ in range(4):
+            if not len(rows):
+                break
+            points, span, k = evaluate(rows, 2 * chords[rows], 0)
+            middle = np.flatnonzero(k % 2)
+            chord = (points[middle - 1] + points[middle + 1]) / 2
+            error = np.zeros(len(a))
+            deviation = np.linalg.norm(points[middle] - chord, axis=1)
+            np.maximum.at(error, span[middle], deviation)
+            rows = rows[(error[rows] > self.tolerance) & (chords[rows] < 256)]
+            chords[rows] = np.minimum(2 * chords[rows], 256)
+        return evaluate(np.arange(len(a)), chords, 1)[0], chords
+
+
+def export_text(ctx, vals):
     # mandatory group codes : (11, 12, 72, 73) (fit_x, fit_y, horizon, vertical)
     # TODO: position to display at by (x2,y2) according to 72(horizon),73(vertical)
     # groupcode 72:0(left),1(center),2(right),3(both side),4(middle),5(fit)
     # grouocode 73:0(standard),1(floor),2(center),3(ceiling)
     vals["71"].append(1)  # attach=pos left in mtext
     vals["70"].append(1)  # text: flags=1
-    return export_mtext(vals)
+    return export_mtext(ctx, vals)
 
 
-def export_mtext(vals):
+def export_mtext(ctx, vals):
     # mandatory group codes : (1 or 3, 10, 20) (text, x, y)
     # TODO: text-format: \Font; \W; \Q; \L..\l etc
     if (vals.has_text or vals.has_mtext) and vals.has_x1 and vals.has_y1:
@@ -436,7 +1063,7 @@ def export_mtext(vals):
         # optional group codes : 2: char style is defined at TABLES Section
         size = 12  # default fontsize in px
         if vals.has_scale:
-            size = scale * textscale * vals.scale
+            size = ctx.scale * ctx.textscale * vals.scale
 
         dx = dy = 0
         if not vals.has_flags:  # as mtext, putting in the box
@@ -459,7 +1086,7 @@ def export_mtext(vals):
             "x": "%f" % x,
             "y": "%f" % y,
             "style": "font-size: %.3fpx; fill: %s; font-family: %s; text-anchor: %s"
-            % (size, color, options.font, anchor),
+            % (size, ctx.color, ctx.options.font, anchor),
         }
 
         angle = 0  # default angle in degrees
@@ -472,16 +1099,16 @@ def export_mtext(vals):
             # MTEXT
             # recover original data
             # (x,y)=(scale*(x-xmin), height-scale*(y-ymin)
-            orgx = vals.x2 / scale + xmin
-            orgy = -(vals.y2 - height) / scale + ymin
+            orgx = vals.x2 / ctx.scale + ctx.xmin
+            orgy = -(vals.y2 - ctx.height) / ctx.scale + ctx.ymin
             unit = math.sqrt(orgy * orgy + orgx * orgx)
             if (unit < 1.01) and (unit > 0.99):
                 ang1 = math.atan2(orgy, orgx)
                 angle = 180 * ang1 / math.pi
             # attribs.update({'transform': 'rotate (%f %f %f)' % (-angle, x, y)})
 
-        if vals.has_text_style and vals.text_style in style_direction:
-            if style_direction[vals.text_style] & 4:
+        if vals.has_text_style and vals.text_style in ctx.style_direction:
+            if ctx.style_direction[vals.text_style] & 4:
                 # angle = -90
                 # attribs.update({'transform': 'rotate (%f %f %f)' % (-angle, x, y)})
                 bVertical = True
@@ -491,12 +1118,12 @@ def export_mtext(vals):
                     "x": "%f" % x,
                     "y": "%f" % y,
                     "style": "font-size: %.3fpx; fill: %s; font-family: %s; text-anchor: %s; writing-mode: tb"
-                    % (size, color, options.font, anchor),
+                    % (size, ctx.color, ctx.options.font, anchor),
                 }
         if angle != 0:
             attribs.update({"transform": "rotate (%f %f %f)" % (-angle, x, y)})
 
-        node = layer.add(inkex.TextElement(**attribs))
+        node = ctx.layer.add(inkex.TextElement(**attribs))
         node.set("sodipodi:linespacing", "125%")
         text = ""
         if vals.has_mtext:
@@ -534,7 +1161,7 @@ def export_mtext(vals):
                 tspan.set("dy", "%f" % dy)
             # tspan.text = text[:found]
             text1 = text[:found]
-            mtext_separate(node, tspan, text1)
+            mtext_separate(ctx, node, tspan, text1)
             text = text[(found + 2) :]
             found = text.find(r"\P")
             lines += 1
@@ -553,7 +1180,7 @@ def export_mtext(vals):
             tspan.set("dy", "%f" % dy)
         # tspan.text = text
         text1 = text
-        mtext_separate(node, tspan, text1)
+        mtext_separate(ctx, node, tspan, text1)
 
 
 def mtext_normalize(text):
@@ -581,7 +1208,7 @@ def mtext_normalize(text):
     return text
 
 
-def mtext_separate(node, tspan, text):
+def mtext_separate(ctx, node, tspan, text):
     # sparate aaa{bbb}(ccc) -> aaa,bbb.ccc
     tspanAdd = True
     found = text.find(r"{")
@@ -594,7 +1221,7 @@ def mtext_separate(node, tspan, text):
             text1 = text1[found + 1 :]
             if tspanAdd == False:
                 tspan = node.add(inkex.Tspan())
-            mtext_ctrl(tspan, text1)
+            mtext_ctrl(ctx, tspan, text1)
             # tspan.text = text1 +'+1'
             tspanAdd = False
             text = text[found1 + 1 :]
@@ -603,7 +1230,7 @@ def mtext_separate(node, tspan, text):
             text1 = text[:found]  # tspan
             if tspanAdd == False:
                 tspan = node.add(inkex.Tspan())
-            mtext_ctrl(tspan, text1)
+            mtext_ctrl(ctx, tspan, text1)
             # tspan.text = text1 +'+2'
             tspanAdd = False
             text = text[found:]
@@ -613,12 +1240,12 @@ def mtext_separate(node, tspan, text):
         text1 = text
         if tspanAdd == False:
             tspan = node.add(inkex.Tspan())
-        mtext_ctrl(tspan, text1)
+        mtext_ctrl(ctx, tspan, text1)
         # tspan.text = text1 +'+3'
         tspanAdd = False
 
 
-def mtext_ctrl(tspan, phrase):
+def mtext_ctrl(ctx, tspan, phrase):
     if len(phrase) == 0:
         return
     if phrase[0] != "\\":
@@ -642,7 +1269,7 @@ def mtext_ctrl(tspan, phrase):
                     color = get_rgbcolor(i)
                     tspan.set("style", "stroke: %s" % color)
                 elif phrase[1].upper() == "H":
-                    value *= scale
+                    value *= ctx.scale
                     tspan.set("style", "font-size: %.3fpx;" % value)
                 elif phrase[1].upper() == "T":
                     tspan.set("style", "letter-spacing: %f;" % value)
@@ -668,28 +1295,30 @@ def mtext_ctrl(tspan, phrase):
             tspan.text = phrase
 
 
-def export_point(vals, w):
+def export_point(ctx, vals, w):
     # mandatory group codes : (10, 20) (x, y)
     if vals.has_x1 and vals.has_y1:
         if vals["70"]:
             inkex.errormsg("$PDMODE is ignored. A point is displayed as normal.")
-        if options.gcodetoolspoints:
-            generate_gcodetools_point(vals.x1, vals.y1)
+        if ctx.options.gcodetoolspoints:
+            generate_gcodetools_point(ctx, vals.x1, vals.y1)
         else:
-            generate_ellipse(vals.x1, vals.y1, w / 2, 0.0, 1.0, 0.0, 0.0)
+            generate_ellipse(ctx, vals.x1, vals.y1, w / 2, 0.0, 1.0, 0.0, 0.0)
 
 
-def export_line(vals):
+def export_line(ctx, vals):
     """Draw a straight line from the dxf"""
     # mandatory group codes : (10, 11, 20, 21) (x1, x2, y1, y2)
     if vals.has_x1 and vals.has_x2 and vals.has_y1 and vals.has_y2:
         path = inkex.PathElement()
-        path.style = style
-        path.path = "M %f,%f %f,%f" % (vals.x1, vals.y1, vals.x2, vals.y2)
-        layer.add(path)
+        path.style = ctx.style
+        path.path = str(
+            ctx.path_data().add("M %f,%f %f,%f", vals.x1, vals.y1, vals.x2, vals.y2)
+        )
+        ctx.layer.add(path)
 
 
-def export_solid(vals):
+def export_solid(ctx, vals):
     # arrows of dimension
     # mandatory group codes : (10, 11, 12, 20, 21, 22) (x1, x2, x3, y1, y2, y3)
     # TODO: 4th point
@@ -702,20 +1331,22 @@ def export_solid(vals):
         and vals.has_y3
     ):
         path = inkex.PathElement()
-        path.style = style
-        path.path = "M %f,%f %f,%f %f,%f z" % (
-            vals.x1,
-            vals.y1,
-            vals.x2,
-            vals.y2,
-            vals.x3,
-            vals.y3,
+        path.style = ctx.style
+        path.path = str(
+            ctx.path_data().add(
+                "M %f,%f %f,%f %f,%f z",
+                vals.x1,
+                vals.y1,
+                vals.x2,
+                vals.y2,
+                vals.x3,
+                vals.y3,
+            )
         )
-        layer.add(path)
+        ctx.layer.add(path)
 
 
-def export_spline(vals):
-    # see : http://www.mactech.com/articles/develop/issue_25/schneider.html
+def export_spline(ctx, vals):
     # mandatory group codes : (10, 20, 40, 70) (x[], y[], knots[], flags)
     if (
         vals.has_flags
@@ -723,94 +1354,35 @@ def export_spline(vals):
         and vals.x1_list
         and len(vals.x1_list) == len(vals.y1_list)
     ):
+        # optional group codes : (41, 71) (weights[], degree)
+        # the degree follows from the knot & control point counts
         knots = vals.knots_list
         ctrls = len(vals.x1_list)
-        if ctrls > 3 and len(knots) == ctrls + 4:  # cubic
-            if ctrls > 4:
-                for i in range(len(knots) - 5, 3, -1):
-                    if knots[i] != knots[i - 1] and knots[i] != knots[i + 1]:
-                        a0 = (knots[i] - knots[i - 2]) / (knots[i + 1] - knots[i - 2])
-                        a1 = (knots[i] - knots[i - 1]) / (knots[i + 2] - knots[i - 1])
-                        vals.x1_list.insert(
-                            i - 1,
-                            (1.0 - a1) * vals.x1_list[i - 2] + a1 * vals.x1_list[i - 1],
-                        )
-                        vals.y1_list.insert(
-                            i - 1,
-                            (1.0 - a1) * vals.y1_list[i - 2] + a1 * vals.y1_list[i - 1],
-                        )
-                        vals.x1_list[i - 2] = (1.0 - a0) * vals.x1_list[
-                            i - 3
-                        ] + a0 * vals.x1_list[i - 2]
-                        vals.y1_list[i - 2] = (1.0 - a0) * vals.y1_list[
-                            i - 3
-                        ] + a0 * vals.y1_list[i - 2]
-                        knots.insert(i, knots[i])
-                for i in range(len(knots) - 6, 3, -2):
-                    if (
-                        knots[i] != knots[i + 2]
-                        and knots[i - 1] != knots[i + 1]
-                        and knots[i - 2] != knots[i]
-                    ):
-                        a1 = (knots[i] - knots[i - 1]) / (knots[i + 2] - knots[i - 1])
-                        vals.x1_list.insert(
-                            i - 1,
-                            (1.0 - a1) * vals.x1_list[i - 2] + a1 * vals.x1_list[i - 1],
-                        )
-                        vals.y1_list.insert(
-                            i - 1,
-                            (1.0 - a1) * vals.y1_list[i - 2] + a1 * vals.y1_list[i - 1],
-                        )
-            ctrls = len(vals.x1_list)
-            path = "M %f,%f" % (vals.x1, vals.y1)
-            for i in range(0, (ctrls - 1) // 3):
-                path += " C %f,%f %f,%f %f,%f" % (
-                    vals.x1_list[3 * i + 1],
-                    vals.y1_list[3 * i + 1],
-                    vals.x1_list[3 * i + 2],
-                    vals.y1_list[3 * i + 2],
-                    vals.x1_list[3 * i + 3],
-                    vals.y1_list[3 * i + 3],
-                )
-            if vals.flags & 1:  # closed path
-                path += " z"
-            attribs = {"d": path, "style": style}
-            etree.SubElement(layer, "path", attribs)
-        if ctrls == 3 and len(knots) == 6:  # quadratic
-            path = "M %f,%f Q %f,%f %f,%f" % (
-                vals.x1,
-                vals.y1,
-                vals.x1_list[1],
-                vals.y1_list[1],
-                vals.x1_list[2],
-                vals.y1_list[2],
-            )
-            attribs = {"d": path, "style": style}
-            etree.SubElement(layer, "path", attribs)
-        if ctrls == 5 and len(knots) == 8:  # spliced quadratic
-            path = "M %f,%f Q %f,%f %f,%f Q %f,%f %f,%f" % (
-                vals.x1,
-                vals.y1,
-                vals.x1_list[1],
-                vals.y1_list[1],
-                vals.x1_list[2],
-                vals.y1_list[2],
-                vals.x1_list[3],
-                vals.y1_list[3],
-                vals.x1_list[4],
-                vals.y1_list[4],
-            )
-            attribs = {"d": path, "style": style}
-            etree.SubElement(layer, "path", attribs)
+        degree = len(knots) - ctrls - 1
+        if degree < 1 or ctrls <= degree or knots[degree] >= knots[ctrls]:
+            return
+        if any(k1 > k2 for k1, k2 in zip(knots, knots[1:])):
+            return
+        weights = None
+        if len(vals.weight_list) == ctrls and any(w != 1.0 for w in vals.weight_list):
+            weights = vals.weight_list
+        # the path data is set with the other queued splines, see GeometryBatch
+        attribs = {"d": "", "style": ctx.style}
+        path = etree.SubElement(ctx.layer, "path", attribs)
+        ctx.geometry.add_spline(
+            path, degree, knots, vals.x1_list, vals.y1_list, weights, vals.flags & 1
+        )
 
 
-def export_circle(vals):
+def export_circle(ctx, vals):
     # mandatory group codes : (10, 20, 40) (x, y, radius)
     if vals.has_x1 and vals.has_y1 and vals.has_radius:
-        generate_ellipse(vals.x1, vals.y1, scale * vals.radius, 0.0, 1.0, 0.0, 0.0)
+        generate_ellipse(
+            ctx, vals.x1, vals.y1, ctx.scale * vals.radius, 0.0, 1.0, 0.0, 0.0
+        )
 
 
-def export_arc(vals):
+def export_arc(ctx, vals):
     # mandatory group codes : (10, 20, 40, 50, 51) (x, y, radius, angle1, angle2)
     if (
         vals.has_x1
@@ -820,9 +1392,10 @@ def export_arc(vals):
         and vals.has_angle2
     ):
         generate_ellipse(
+            ctx,
             vals.x1,
             vals.y1,
-            scale * vals.radius,
+            ctx.scale * vals.radius,
             0.0,
             1.0,
             vals.angle * math.pi / 180.0,
@@ -830,7 +1403,7 @@ def export_arc(vals):
         )
 
 
-def export_ellipse(vals):
+def export_ellipse(ctx, vals):
     # mandatory group codes : (10, 11, 20, 21, 40, 41, 42) (xc, xm, yc, ym, width ratio, angle1, angle2)
     if (
         vals.has_x1
@@ -844,83 +1417,69 @@ def export_ellipse(vals):
         # generate_ellipse(vals.x1, vals.y1, scale*vals.x2, scale*vals.y2, vals.width_ratio, vals.ellipse_a1, vals.ellipse_a2)
         # vals are through adjust_coords : recover proper value
         # (x,y)=(scale*x-xmin, height-scale*y-ymin)
-        x2 = vals.x2 + xmin
-        y2 = -vals.y2 + ymin + height
+        x2 = vals.x2 + ctx.xmin
+        y2 = -vals.y2 + ctx.ymin + ctx.height
         generate_ellipse(
-            vals.x1, vals.y1, x2, y2, vals.width_ratio, vals.ellipse_a1, vals.ellipse_a2
+            ctx,
+            vals.x1,
+            vals.y1,
+            x2,
+            y2,
+            vals.width_ratio,
+            vals.ellipse_a1,
+            vals.ellipse_a2,
         )
 
 
-def export_leader(vals):
+def export_leader(ctx, vals):
     # mandatory group codes : (10, 20) (x, y)
     if vals.has_x1 and vals.has_y1:
         if len(vals.x1_list) > 1 and len(vals.y1_list) == len(vals.x1_list):
-            path = "M %f,%f" % (vals.x1, vals.y1)
+            path = ctx.path_data().add("M %f,%f", vals.x1, vals.y1)
             for i in range(1, len(vals.x1_list)):
-                path += " %f,%f" % (vals.x1_list[i], vals.y1_list[i])
-            attribs = {"d": path, "style": style}
-            etree.SubElement(layer, "path", attribs)
+                path.add(" %f,%f", vals.x1_list[i], vals.y1_list[i])
+            attribs = {"d": str(path), "style": ctx.style}
+            etree.SubElement(ctx.layer, "path", attribs)
 
 
-def export_polyline(vals):
-    return export_lwpolyline(vals)
+def export_polyline(ctx, vals):
+    return export_lwpolyline(ctx, vals)
 
 
-def export_lwpolyline(vals):
+def export_lwpolyline(ctx, vals):
     # mandatory group codes : (10, 20, 70) (x, y, flags)
     if vals.has_x1 and vals.has_y1 and vals.has_flags:
         if len(vals.x1_list) > 1 and len(vals.y1_list) == len(vals.x1_list):
-            # optional group codes : (42) (bulge)
-            iseqs = 0
-            ibulge = 0
             if vals.flags & 1:  # closed path
-                seqs.append("20")
+                ctx.seqs.append("20")
                 vals.x1_list.append(vals.x1)
                 vals.y1_list.append(vals.y1)
-            while seqs[iseqs] != "20":
-                iseqs += 1
-            path = "M %f,%f" % (vals.x1, vals.y1)
-            xold = vals.x1
-            yold = vals.y1
-            for i in range(1, len(vals.x1_list)):
-                bulge = 0
-                iseqs += 1
-                while seqs[iseqs] != "20":
-                    if seqs[iseqs] == "42":
-                        bulge = vals.bulge_list[ibulge]
-                        ibulge += 1
-                    iseqs += 1
-                if bulge:
-                    sweep = 0  # sweep CCW
-                    if bulge < 0:
-                        sweep = 1  # sweep CW
-                        bulge = -bulge
-                    large = 0  # large-arc-flag
-                    if bulge > 1:
-                        large = 1
-                    r = math.sqrt(
-                        (vals.x1_list[i] - xold) ** 2 + (vals.y1_list[i] - yold) ** 2
-                    )
-                    r = 0.25 * r * (bulge + 1.0 / bulge)
-                    path += " A %f,%f 0.0 %d %d %f,%f" % (
-                        r,
-                        r,
-                        large,
-                        sweep,
-                        vals.x1_list[i],
-                        vals.y1_list[i],
-                    )
-                else:
-                    path += " L %f,%f" % (vals.x1_list[i], vals.y1_list[i])
-                xold = vals.x1_list[i]
-                yold = vals.y1_list[i]
+            x, y = vals.x1_list, vals.y1_list
+            # optional group codes : (42) (bulge), of the vertex they follow
+            bulges = [0] * (len(x) - 1)
+            vertex = -1
+            ibulge = 0
+            for code in ctx.seqs:
+                if code == "20":
+                    vertex += 1
+                elif code == "42" and 0 <= vertex < len(bulges):
+                    bulges[vertex] = vals.bulge_list[ibulge]
+                    ibulge += 1
+            if any(bulges):
+                # the arcs are set with the other queued polylines, see GeometryBatch
+                attribs = {"d": "", "style": ctx.style}
+                path = etree.SubElement(ctx.layer, "path", attribs)
+                ctx.geometry.add_polyline(path, x, y, bulges, vals.flags & 1)
+                return
+            path = ctx.path_data().add("M %f,%f", vals.x1, vals.y1)
+            path.add(" L %f,%f" * (len(x) - 1), *itertools.chain(*zip(x[1:], y[1:])))
             if vals.flags & 1:  # closed path
-                path += " z"
-            attribs = {"d": path, "style": style}
-            etree.SubElement(layer, "path", attribs)
+                path.add(" z")
+            attribs = {"d": str(path), "style": ctx.style}
+            etree.SubElement(ctx.layer, "path", attribs)
 
 
-def export_hatch(vals):
+def export_hatch(ctx, vals):
     # mandatory group codes : (10, 20, 70, 72, 92, 93) (x, y, fill, Edge Type, Path Type, Number of edges)
     # TODO: Hatching Pattern
     if (
@@ -937,77 +1496,88 @@ def export_hatch(vals):
             i11 = 0  # count line end points
             i40 = 0  # count circles
             i72 = 0  # count edge type flags
-            path = ""
+            # start & end points of the arc edges, relative to their centres
+            n = min(len(vals.radius_list), len(vals.angle_list), len(vals.angle2_list))
+            rm = ctx.scale * np.asarray(vals.radius_list[:n], dtype=float)
+            if n:
+                angles = vals.angle_list[:n] + vals.angle2_list[:n]
+                angles = np.asarray(angles, dtype=float) * math.pi / 180.0
+                x, y = ellipse_points(np.concatenate((rm, rm)), 1.0, 0.0, angles)
+                x, y = x.tolist(), y.tolist()
+                starts, ends = (x[:n], y[:n]), (x[n:], y[n:])
+            rm = rm.tolist()
+            path = ctx.path_data()
             for i in range(0, len(vals.num_edges_list)):
                 xc = vals.x1_list[i10]
                 yc = vals.y1_list[i10]
                 if vals.edge_type_list[i72] == 2:  # arc
-                    rm = scale * vals.radius_list[i40]
                     a1 = vals.angle_list[i40]
-                    path += "M %f,%f " % (
-                        xc + rm * math.cos(a1 * math.pi / 180.0),
-                        yc + rm * math.sin(a1 * math.pi / 180.0),
-                    )
+                    path.add("M %f,%f ", xc + starts[0][i40], yc + starts[1][i40])
                 else:
                     a1 = 0
-                    path += "M %f,%f " % (xc, yc)
+                    path.add("M %f,%f ", xc, yc)
                 for j in range(0, vals.num_edges_list[i]):
                     if vals.path_type_list[i] & 2:  # polyline
                         if j > 0:
-                            path += "L %f,%f " % (vals.x1_list[i10], vals.y1_list[i10])
+                            path.add("L %f,%f ", vals.x1_list[i10], vals.y1_list[i10])
                         if j == vals.path_type_list[i] - 1:
                             i72 += 1
                     elif vals.edge_type_list[i72] == 2:  # arc
                         xc = vals.x1_list[i10]
                         yc = vals.y1_list[i10]
-                        rm = scale * vals.radius_list[i40]
                         a2 = vals.angle2_list[i40]
                         diff = (a2 - a1 + 360) % 360
                         sweep = 1 - vals.sweep_list[i40]  # sweep CCW
                         large = 0  # large-arc-flag
                         if diff:
-                            path += "A %f,%f 0.0 %d %d %f,%f " % (
-                                rm,
-                                rm,
+                            path.add(
+                                "A %f,%f 0.0 %d %d %f,%f ",
+                                rm[i40],
+                                rm[i40],
                                 large,
                                 sweep,
-                                xc + rm * math.cos(a2 * math.pi / 180.0),
-                                yc + rm * math.sin(a2 * math.pi / 180.0),
+                                xc + ends[0][i40],
+                                yc + ends[1][i40],
                             )
-                        else:
-                            path += "A %f,%f 0.0 %d %d %f,%f " % (
-                                rm,
-                                rm,
+                        else:  # full circle, in halves from the boundary start
+                            angles = np.array([a1 + 180.0, a1]) * math.pi / 180.0
+                            x, y = ellipse_points(rm[i40], 1.0, 0.0, angles)
+                            x, y = x.tolist(), y.tolist()
+                            path.add(
+                                "A %f,%f 0.0 %d %d %f,%f ",
+                                rm[i40],
+                                rm[i40],
                                 large,
                                 sweep,
-                                xc + rm * math.cos((a1 + 180.0) * math.pi / 180.0),
-                                yc + rm * math.sin((a1 + 180.0) * math.pi / 180.0),
+                                xc + x[0],
+                                yc + y[0],
                             )
-                            path += "A %f,%f 0.0 %d %d %f,%f " % (
-                                rm,
-                                rm,
+                            path.add(
+                                "A %f,%f 0.0 %d %d %f,%f ",
+                                rm[i40],
+                                rm[i40],
                                 large,
                                 sweep,
-                                xc + rm * math.cos(a1 * math.pi / 180.0),
-                                yc + rm * math.sin(a1 * math.pi / 180.0),
+                                xc + x[1],
+                                yc + y[1],
                             )
                         i40 += 1
                         i72 += 1
                     elif vals.edge_type_list[i72] == 1:  # line
-                        path += "L %f,%f " % (vals.x2_list[i11], vals.y2_list[i11])
+                        path.add("L %f,%f ", vals.x2_list[i11], vals.y2_list[i11])
                         i11 += 1
                         i72 += 1
                     i10 += 1
-                path += "z "
+                path.add("z ")
             if vals.has_fill:
-                style = formatStyle({"fill": "%s" % color})
+                style = formatStyle({"fill": "%s" % ctx.color})
             else:
                 style = formatStyle({"fill": "url(#Hatch)", "fill-opacity": "1.0"})
-            attribs = {"d": path, "style": style}
-            etree.SubElement(layer, "path", attribs)
+            attribs = {"d": str(path), "style": style}
+            etree.SubElement(ctx.layer, "path", attribs)
 
 
-def export_dimension(vals):
+def export_dimension(ctx, vals):
     # mandatory group codes : (10, 11, 13, 14, 20, 21, 23, 24) (x1..4, y1..4)
     # block_name: dimension definition for 10mm
     if vals.has_x1 and vals.has_x2 and vals.has_y1 and vals.has_y2:
@@ -1019,50 +1589,54 @@ def export_dimension(vals):
             # if vals.has_angle :
             #    tform += ' rotate(%f,%f,%f)' % (vals.angle,vals.x4,vals.y4)
             attribs.update({"transform": tform})
-            etree.SubElement(layer, "use", attribs)
+            etree.SubElement(ctx.layer, "use", attribs)
         else:
             # TODO: improve logic when INSERT in BLOCK
             dx = abs(vals.x1 - vals.x3)
             dy = abs(vals.y1 - vals.y3)
             if (vals.x1 == vals.x4) and dx > 0.00001:
-                d = dx / scale
+                d = dx / ctx.scale
                 dy = 0
-                path = "M %f,%f %f,%f" % (vals.x1, vals.y1, vals.x3, vals.y1)
+                path = ctx.path_data().add(
+                    "M %f,%f %f,%f", vals.x1, vals.y1, vals.x3, vals.y1
+                )
             elif (vals.y1 == vals.y4) and dy > 0.00001:
-                d = dy / scale
+                d = dy / ctx.scale
                 dx = 0
-                path = "M %f,%f %f,%f" % (vals.x1, vals.y1, vals.x1, vals.y3)
+                path = ctx.path_data().add(
+                    "M %f,%f %f,%f", vals.x1, vals.y1, vals.x1, vals.y3
+                )
             else:
                 return
             attribs = {
-                "d": path,
-                "style": style
+                "d": str(path),
+                "style": ctx.style
                 + "; marker-start: url(#DistanceX); marker-end: url(#DistanceX); stroke-width: 0.25px",
             }
-            etree.SubElement(layer, "path", attribs)
+            etree.SubElement(ctx.layer, "path", attribs)
             x = vals.x2
             y = vals.y2
             size = 12  # default fontsize in px
             if vals.has_mtext:
-                if vals.mtext in DIMTXT:
-                    size = scale * textscale * DIMTXT[vals.mtext]
+                if vals.mtext in ctx.DIMTXT:
+                    size = ctx.scale * ctx.textscale * ctx.DIMTXT[vals.mtext]
                     if size < 2:
                         size = 2
             attribs = {
                 "x": "%f" % x,
                 "y": "%f" % y,
                 "style": "font-size: %.3fpx; fill: %s; font-family: %s; text-anchor: middle; text-align: center"
-                % (size, color, options.font),
+                % (size, ctx.color, ctx.options.font),
             }
             if dx == 0:
                 attribs.update({"transform": "rotate (%f %f %f)" % (-90, x, y)})
-            node = etree.SubElement(layer, "text", attribs)
+            node = etree.SubElement(ctx.layer, "text", attribs)
             tspan = node.add(inkex.Tspan())
             tspan.set("sodipodi:role", "line")
             tspan.text = str(float("%.2f" % d))
 
 
-def export_insert(vals):
+def export_insert(ctx, vals):
     # mandatory group codes : (2, 10, 20) (block name, x, y)
     # TODO: repeat by row and column
     # (times,interval)= row(70,44), column(71,45)
@@ -1073,12 +1647,11 @@ def export_insert(vals):
         # translate(move x units,move y units)
         # 2021.6  translate..ok  scale..x  rotate X
         # as scale, the line is wider ->same width  -> you should fix
-        global height
-        cx = scale * xmin  # transorm-origin:
-        cy = scale * ymin + height  # center of rotation
+        cx = ctx.scale * ctx.xmin  # transorm-origin:
+        cy = ctx.scale * ctx.ymin + ctx.height  # center of rotation
 
-        x = vals.x1 + scale * xmin
-        y = vals.y1 - scale * ymin - height
+        x = vals.x1 + ctx.scale * ctx.xmin
+        y = vals.y1 - ctx.scale * ctx.ymin - ctx.height
         ixscale = iyscale = 1
         if vals.has_insert_scale_y:
             ixscale = vals.insert_scale_x
@@ -1087,7 +1660,7 @@ def export_insert(vals):
         x += cx * (iyscale - 1)
         y -= cy * (iyscale - 1)
 
-        elem = layer.add(inkex.Use())
+        elem = ctx.layer.add(inkex.Use())
         elem.set(
             inkex.addNS("href", "xlink"),
             "#" + quote(vals.block_name.replace(" ", "_").encode("utf-8")),
@@ -1107,74 +1680,33 @@ def export_insert(vals):
             elem.transform.add_rotate(rotated_angle, -cx, cy)
 
 
-def export_block(vals):
+def export_block(ctx, vals):
     # mandatory group codes : (2) (block name)
     if vals.has_block_name:
-        global block
-        block = etree.SubElement(
-            defs, "symbol", {"id": vals.block_name.replace(" ", "_")}
+        ctx.block = etree.SubElement(
+            ctx.defs, "symbol", {"id": vals.block_name.replace(" ", "_")}
         )
 
 
-def export_endblk(vals):
-    global block
-    block = defs  # initiallize with dummy
+def export_endblk(ctx, vals):
+    ctx.block = ctx.defs  # initiallize with dummy
 
 
-def export_attdef(vals):
+def export_attdef(ctx, vals):
     # mandatory group codes : (1, 2) (default, tag)
     if vals.has_default and vals.has_tag:
         vals.text_list.append(vals.tag)
-        export_mtext(vals)
-
-
-def generate_ellipse(xc, yc, xm, ym, w, a1, a2):
-    rm = math.sqrt(xm * xm + ym * ym)
-    a = math.atan2(ym, xm)  # x-axis-rotation
-    diff = (a2 - a1 + 2 * math.pi) % (2 * math.pi)
-    if abs(diff) > 0.0000001 and abs(diff - 2 * math.pi) > 0.0000001:  # open arc
-        large = 0  # large-arc-flag
-        if diff > math.pi:
-            large = 1
-        xt = rm * math.cos(a1)
-        yt = w * rm * math.sin(a1)
-        x1 = xt * math.cos(a) - yt * math.sin(a)
-        y1 = xt * math.sin(a) + yt * math.cos(a)
-        xt = rm * math.cos(a2)
-        yt = w * rm * math.sin(a2)
-        x2 = xt * math.cos(a) - yt * math.sin(a)
-        y2 = xt * math.sin(a) + yt * math.cos(a)
-        path = "M %f,%f A %f,%f %f %d 0 %f,%f" % (
-            xc + x1,
-            yc - y1,
-            rm,
-            w * rm,
-            -180.0 * a / math.pi,
-            large,
-            xc + x2,
-            yc - y2,
-        )
-    else:  # closed arc
-        path = "M %f,%f A %f,%f %f 0, 0 %f,%f A %f,%f %f 0, 0 %f,%f z" % (
-            xc + xm,
-            yc - ym,
-            rm,
-            w * rm,
-            -180.0 * a / math.pi,
-            xc - xm,
-            yc + ym,
-            rm,
-            w * rm,
-            -180.0 * a / math.pi,
-            xc + xm,
-            yc - ym,
-        )
-    attribs = {"d": path, "style": style}
-    etree.SubElement(layer, "path", attribs)
+        export_mtext(ctx, vals)
+
 
+def generate_ellipse(ctx, xc, yc, xm, ym, w, a1, a2):
+    # the path data is set with the other queued arcs, see GeometryBatch
+    path = etree.SubElement(ctx.layer, "path", {"d": "", "style": ctx.style})
+    ctx.geometry.add_ellipse(path, xc, yc, xm, ym, w, a1, a2)
 
-def generate_gcodetools_point(xc, yc):
-    elem = layer.add(inkex.PathElement())
+
+def generate_gcodetools_point(ctx, xc, yc):
+    elem = ctx.layer.add(inkex.PathElement())
     elem.style = "stroke:none;fill:#ff0000"
     elem.set("inkscape:dxfpoint", "1")
     elem.path = (
@@ -1184,51 +1716,175 @@ def generate_gcodetools_point(xc, yc):
 
 
 #   define DXF Entities and specify which Group Codes to monitor
+EXPORTERS = {
+    "TEXT": export_text,
+    "MTEXT": export_mtext,
+    "POINT": export_point,
+    "LINE": export_line,
+    "SOLID": export_solid,
+    "SPLINE": export_spline,
+    "CIRCLE": export_circle,
+    "ARC": export_arc,
+    "ELLIPSE": export_ellipse,
+    "LEADER": export_leader,
+    "POLYLINE": export_polyline,
+    "LWPOLYLINE": export_lwpolyline,
+    "HATCH": export_hatch,
+    "DIMENSION": export_dimension,
+    "INSERT": export_insert,
+    "BLOCK": export_block,
+    "ENDBLK": export_endblk,
+    "ATTDEF": export_attdef,
+    "VIEWPORT": None,  # ends the previous entity, not drawn
+    "ENDSEC": None,
+}
+
+
+class SvgWriter:
+    """Writes the SVG document incrementally with lxml's xmlfile
+
+    The root & its other children (desc, defs with the BLOCK symbols) are
+    written with the first entity. Entities are then moved to a buffer of their
+    layer, written out as a group of the layer when it holds a batch of
+    elements, and the other buffers at the end in layer order. A layer is one
+    group, in the same order as an in memory import, unless it holds more than
+    a batch: it is then split over several groups & its first groups are drawn
+    below the layers written at the end. Groups are written inside the root, so
+    the namespaces are only declared once.
+    """
 
+    def __init__(self, output, batch=4096, prepare=None):
+        self.output = output
+        self.batch = batch
+        self.prepare = prepare  # called before elements are written
+        self.stack = None
+        self.xf = None
+        self.groups = {}  # entities of each layer, not yet written
+        self.written = set()
+
+    def start(self, svg):
+        if self.prepare:
+            self.prepare()
+        self.stack = contextlib.ExitStack()
+        self.xf = self.stack.enter_context(etree.xmlfile(self.output, encoding="utf-8"))
+        # the default namespace only, so the root is not written as svg:svg
+        nsmap = {k: v for k, v in svg.nsmap.items() if v != svg.nsmap[None] or k is None}
+        self.stack.enter_context(self.xf.element(svg.tag, svg.attrib, nsmap=nsmap))
+        for child in svg:
+            if not isinstance(child, inkex.Layer):
+                self.write_element(child)
+
+    def write_element(self, element):
+        """Write an element within the open root, without declaring its namespaces
+
+        xmlfile.write serializes an element as a standalone tree, which would
+        repeat the namespace declarations on each one.
+        """
+        if not isinstance(element.tag, str):  # comments & processing instructions
+            self.xf.write(element)
+            return
+        with self.xf.element(element.tag, dict(element.attrib)):
+            if element.text:
+                self.xf.write(element.text)
+            for child in element:
+                self.write_element(child)
+        if element.tail:
+            self.xf.write(element.tail)
+
+    def flush(self, layer):
+        group = self.groups.pop(layer, None)
+        if group is not None and len(group):
+            if self.prepare:
+                self.prepare()
+            self.write_element(group)
+            self.written.add(layer)
+
+    def write(self, svg, layer):
+        """Move the exported elements of a layer to its buffer"""
+        if not len(layer):
+            return
+        if self.stack is None:
+            self.start(svg)
+        group = self.groups.get(layer)
+        if group is None:
+            group = self.groups[layer] = etree.Element(layer.tag, layer.attrib)
+        group.extend(list(layer))
+        if len(group) >= self.batch:
+            self.flush(layer)
+
+    def close(self, svg):
+        """Write the buffered & unstreamed layers in document order & end the document"""
+        if self.stack is None:
+            self.start(svg)
+        if self.prepare:
+            self.prepare()
+        for child in svg:
+            if not isinstance(child, inkex.Layer):
+                continue
+            group = self.groups.pop(child, None)
+            if group is not None:
+                group.extend(list(child))
+            elif child not in self.written or len(child):
+                group = child
+            if group is not None:
+                self.write_element(group)
+        for layer in list(self.groups):
+            self.flush(layer)
+        self.stack.close()
+
+
+class DxfImporter:
+    """Converts one DXF stream to an SVG document
+
+    The conversion state lives on the importer & is passed to the export_*
+    functions as their context, so separate importers can convert files
+    concurrently, e.g. from a thread pool.
+    """
 
-class DxfInput(inkex.InputExtension):
-    def add_arguments(self, pars):
-        pars.add_argument("--tab", default="options")
-        pars.add_argument("--scalemethod", default="manual")
-        pars.add_argument("--scale", default="1.0")
-        pars.add_argument("--textscale", default="1.0")
-        pars.add_argument("--xmin", default="0.0")
-        pars.add_argument("--ymin", default="0.0")
-        pars.add_argument("--gcodetoolspoints", default=False, type=inkex.Boolean)
-        pars.add_argument("--encoding", dest="input_encode", default="latin_1")
-        pars.add_argument("--font", default="Arial")
-
-    def load(self, stream):
-        return stream
-
-    def effect(self):
-        global options
-        global defs
-        global entity
-        global seqs
-        global style
-        global layer
-        global scale
-        global textscale
-        global color
-        global extrude
-        global xmin
-        global ymin
-        global height
-        global DIMTXT
-        global block
-        global svg
-        global style_font3
-        global style_direction
-        global be_extrude
-
+    def __init__(self, options):
+        self.options = options
+        self.svg = None
+        self.defs = None
+        self.block = None  # symbol of the BLOCK being read, defs outside blocks
+        self.layer = None
+        self.style = ""
+        self.color = "#000000"
+        self.scale = 1.0
+        self.textscale = 1.0
+        self.extrude = 1.0
+        self.xmin = 0.0
+        self.ymin = 0.0
+        self.height = 297.0 * 96.0 / 25.4
+        self.DIMTXT = {}  # DIMENSION text sizes
+        self.seqs = []  # group codes of the current entity, in order
+        self.style_font3 = {}
+        self.style_direction = {}
+        self.be_extrude = False
+        self.layer_colors = {}
+        self.layer_nodes = {}
+        self.linetypes = {}
+        self.geometry = GeometryBatch(options.precision, tolerance=options.tolerance)
+
+    def path_data(self):
+        """New path data builder at the precision of the import options"""
+        return PathData(self.options.precision)
+
+    def convert(self, stream, output=None):
+        """Returns the SVG document of a DXF stream opened in binary mode
+
+        With an output stream, the document is written to it as the entities
+        are read & None is returned.
+        """
         options = self.options
+        writer = None
+        if output is not None:
+            writer = SvgWriter(output, prepare=self.geometry.flush)
 
-        doc = self.get_template(width=210 * 96 / 25.4, height=297 * 96 / 25.4)
-        svg = doc.getroot()
-        defs = svg.defs
+        doc = DxfInput.get_template(width=210 * 96 / 25.4, height=297 * 96 / 25.4)
+        self.svg = doc.getroot()
+        self.defs = self.svg.defs
         marker = etree.SubElement(
-            defs,
+            self.defs,
             "marker",
             {
                 "id": "DistanceX",
@@ -1247,7 +1903,7 @@ class DxfInput(inkex.InputExtension):
             },
         )
         pattern = etree.SubElement(
-            defs,
+            self.defs,
             "pattern",
             {
                 "id": "Hatch",
@@ -1289,119 +1945,40 @@ class DxfInput(inkex.InputExtension):
             },
         )
 
-        def _get_line(strip=True):
-            line = self.document.readline()
-            if strip:
-                line = line.strip()
-            else:
-                line = line.rstrip(b"\r\n")
-            return line.decode(options.input_encode)
-
-        def get_line():
-            l1 = _get_line()
-            if l1 in ("1", "2", "3", "6", "7", "8"):  # text value
-                # text entity, do not strip
-                return l1, _get_line(False)
-            return l1, _get_line()
-
-        def get_binary_line() -> Tuple[str, str]:
-            stream = self.document
-            # Data types inferred from
-            # https://help.autodesk.com/view/OARX/2023/ENU/?guid=GUID-2553CF98-44F6-4828-82DD-FE3BC7448113
-
-            try:
-                key = struct.unpack("<h", stream.read(2))[0]
-                if (
-                    key <= 9
-                    or 100 <= key <= 109
-                    or 300 <= key <= 309
-                    or 320 <= key <= 369
-                    or 390 <= key <= 399
-                    or 410 <= key <= 419
-                    or 430 <= key <= 439
-                    or 470 <= key <= 481
-                    or 999 <= key <= 1009
-                ):
-                    string_bytes = bytearray()
-                    while True:
-                        byte = stream.read(1)
-                        if byte == b"\x00" or len(byte) == 0:
-                            value = string_bytes.decode().replace("\t", "")
-                            break
-                        string_bytes.extend(byte)
-                elif (
-                    10 <= key <= 59
-                    or 110 <= key <= 149
-                    or 210 <= key <= 239
-                    or 460 <= key <= 469
-                    or 1010 <= key <= 1059
-                ):
-                    value = struct.unpack("d", stream.read(8))[0]
-                elif (
-                    60 <= key <= 79
-                    or 170 <= key <= 179
-                    or 270 <= key <= 289
-                    or 370 <= key <= 389
-                    or 400 <= key <= 409
-                    or 1060 <= key <= 1070
-                ):
-                    value = struct.unpack("<h", stream.read(2))[0]
-                elif (
-                    80 <= key <= 99
-                    or 420 <= key <= 429
-                    or 440 <= key <= 459
-                    or key == 1071
-                ):
-                    value = struct.unpack("<i", stream.read(4))[0]
-                elif 160 <= key <= 169:
-                    value = struct.unpack("<q", stream.read(8))[0]
-                elif 290 <= key <= 299:
-                    value = struct.unpack("?", stream.read(1))[0]
-                elif 310 <= key <= 319:
-                    # binary data
-                    length = struct.unpack("<B", stream.read(1))[0]
-                    value = stream.read(length)
-                else:
-                    inkex.errormsg(
-                        _(
-                            "Encountered key of unknown format, id={0} while parsing DXF. This is probably a bug."
-                        ).format(key)
-                    )
-                return str(key), str(value)
-            except struct.error:
-                return "", ""
-                # EOF
-
         def get_group(group):
             line = get_line()
             if line[0] == group:
                 return float(line[1])
             return 0.0
 
-        xmax = xmin = ymin = 0.0
+        xmax = self.xmin = self.ymin = 0.0
         ltscale = 1.0  # $LTSCALE:global scale of line-style
-        height = 297.0 * 96.0 / 25.4  # default A4 height in pixels
+        self.height = 297.0 * 96.0 / 25.4  # default A4 height in pixels
         measurement = 0  # default inches
         flag = 0  # (0, 1, 2, 3, 4) = (none, LAYER, LTYPE, DIMTXT, STYLE)
-        layer_colors = {}  # store colors by layer
-        layer_nodes = {}  # store nodes by layer
-        linetypes = {}  # store linetypes by name
-        DIMTXT = {}  # store DIMENSION text sizes
+        self.layer_colors = {}  # store colors by layer
+        self.layer_nodes = {}  # store nodes by layer
+        self.linetypes = {}  # store linetypes by name
+        self.DIMTXT = {}  # store DIMENSION text sizes
         # style_name = {}     # style name
-        style_font3 = {}  # style font 1byte
+        self.style_font3 = {}  # style font 1byte
         style_font4 = {}  # style font 2byte
-        style_direction = {}  # style display direction
-        be_extrude = False
-        first_line = _get_line()
+        self.style_direction = {}  # style display direction
+        self.be_extrude = False
+        sentinel = stream.read(len(BINARY_SENTINEL))
+        binary = sentinel.startswith(b"AutoCAD Binary DXF")
 
-        if first_line == "AutoCAD Binary DXF":
-            magic = self.document.read(2)
-            if not magic == b"\x1a\x00":
+        if binary:
+            if not sentinel.endswith(b"\x1a\x00"):
                 inkex.AbortExtension(_("Binary DXF file has unexpected header."))
-            get_line = get_binary_line
-            line = [first_line, ""]
+            groups = iter_binary_groups(stream)
+            get_line = functools.partial(next, groups, ("", ""))
+            line = ["AutoCAD Binary DXF", ""]
         else:
-            line = [first_line, _get_line()]
+            stream.seek(0)
+            groups = iter_ascii_groups(stream, options.input_encode)
+            get_line = functools.partial(next, groups, ("", ""))
+            line = get_line()
 
         inENTITIES = False
         style_name = "*"
@@ -1424,25 +2001,25 @@ class DxfInput(inkex.InputExtension):
                     measurement = get_group("70")
             elif options.scalemethod == "auto":
                 if line[1] == "$EXTMIN":
-                    xmin = get_group("10")
-                    ymin = get_group("20")
+                    self.xmin = get_group("10")
+                    self.ymin = get_group("20")
                 if line[1] == "$EXTMAX":
                     xmax = get_group("10")
             if line[1] == "$LTSCALE":
                 ltscale = get_group("40")
             if flag == 1 and line[0] == "2":
                 layername = line[1]
-                layer_nodes[layername] = svg.add(inkex.Layer.new(layername))
+                self.layer_nodes[layername] = self.svg.add(inkex.Layer.new(layername))
             if flag == 2 and line[0] == "2":
                 linename = line[1]
-                linetypes[linename] = []
+                self.linetypes[linename] = []
             if flag == 3 and line[0] == "2":
                 stylename = line[1]
             if flag == 4 and line[0] == "2":
                 style_name = line[1]
-                style_font3[style_name] = []
+                self.style_font3[style_name] = []
                 style_font4[style_name] = []
-                style_direction[style_name] = []
+                self.style_direction[style_name] = []
             if line[0] == "2" and line[1] == "LAYER":
                 flag = 1
             if line[0] == "2" and line[1] == "LTYPE":
@@ -1455,22 +2032,22 @@ class DxfInput(inkex.InputExtension):
                 if layername is None:
                     errno = 1
                     break
-                layer_colors[layername] = int(line[1])
+                self.layer_colors[layername] = int(line[1])
             if flag == 2 and line[0] == "49":
                 if linename is None:
                     errno = 2
                     break
-                linetypes[linename].append(float(line[1]))
+                self.linetypes[linename].append(float(line[1]))
             if flag == 3 and line[0] == "140":
                 if stylename is None:
                     errno = 3
                     break
-                DIMTXT[stylename] = float(line[1])
+                self.DIMTXT[stylename] = float(line[1])
             if flag == 4 and line[0] == "3":
                 if style_name is None:
                     errno = 4
                     break
-                style_font3[style_name].append(line[1])
+                self.style_font3[style_name].append(line[1])
             if flag == 4 and line[0] == "4":
                 if style_name is None:
                     errno = 4
@@ -1478,7 +2055,7 @@ class DxfInput(inkex.InputExtension):
                 style_font4[style_name].append(line[1])
             if flag == 4 and line[0] == "70":  # not no of STYLE
                 if style_name != "*":
-                    style_direction[style_name] = int(line[1])
+                    self.style_direction[style_name] = int(line[1])
             if line[0] == "0" and line[1] == "ENDTAB":
                 flag = 0
         if errno != 0:
@@ -1495,142 +2072,157 @@ class DxfInput(inkex.InputExtension):
                 + errMsg
                 + ") is missing"
             )
-            self.document = doc
-            return
+            return self.finish(doc, writer)
 
         if options.scalemethod == "file":
-            scale = 25.4  # default inches
+            self.scale = 25.4  # default inches
             if measurement == 1.0:
-                scale = 1.0  # use mm
+                self.scale = 1.0  # use mm
         elif options.scalemethod == "auto":
-            scale = 1.0
-            if xmax > xmin:
-                scale = 210.0 / (xmax - xmin)  # scale to A4 width
+            self.scale = 1.0
+            if xmax > self.xmin:
+                self.scale = 210.0 / (xmax - self.xmin)  # scale to A4 width
         else:
-            scale = float(options.scale)  # manual scale factor
-            xmin = float(options.xmin)
-            ymin = float(options.ymin)
-        svg.desc = "%s - scale = %f, origin = (%f, %f), method = %s" % (
+            self.scale = float(options.scale)  # manual scale factor
+            self.xmin = float(options.xmin)
+            self.ymin = float(options.ymin)
+        self.svg.desc = "%s - scale = %f, origin = (%f, %f), method = %s" % (
             os.path.basename(options.input_file),
-            scale,
-            xmin,
-            ymin,
+            self.scale,
+            self.xmin,
+            self.ymin,
             options.scalemethod,
         )
-        scale *= 96.0 / 25.4  # convert from mm to pixels
-        textscale = float(options.textscale)
+        self.scale *= 96.0 / 25.4  # convert from mm to pixels
+        self.textscale = float(options.textscale)
 
-        if "0" not in layer_nodes:
-            layer_nodes["0"] = svg.add(inkex.Layer.new("0"))
+        if "0" not in self.layer_nodes:
+            self.layer_nodes["0"] = self.svg.add(inkex.Layer.new("0"))
 
-            layer_colors["0"] = 7
+            self.layer_colors["0"] = 7
 
-        for linename in linetypes.keys():  # scale the dashed lines
+        for linename in self.linetypes.keys():  # scale the dashed lines
             linetype = ""
-            for length in linetypes[linename]:
+            for length in self.linetypes[linename]:
                 if length == 0:  # test for dot
                     linetype += " 0.5,"
                 else:
-                    linetype += "%.4f," % math.fabs(length * scale * ltscale)
+                    linetype += "%.4f," % math.fabs(length * self.scale * ltscale)
             if linetype == "":
-                linetypes[linename] = "stroke-linecap: round"
+                self.linetypes[linename] = "stroke-linecap: round"
             else:
-                linetypes[linename] = "stroke-dasharray:" + linetype
+                self.linetypes[linename] = "stroke-dasharray:" + linetype
+
+        chunked = (
+            options.jobs != 1
+            and not binary
+            and isinstance(options.input_file, str)
+        )
+        self.read_entities(get_line, line, inENTITIES, writer, chunked)
+        if chunked:
+            self.convert_chunks(stream, writer)
+
+        #     for debug
+        # tree = etree.ElementTree(svg)
+        # tree.write('c:\Python\svgCH2.xml')
+        if self.be_extrude:
+            inkex.errormsg(
+                _(
+                    "An object that has the extrude parameter set was detected. "
+                    "The imported figure may be displayed incorrectly."
+                )
+            )
+        return self.finish(doc, writer)
 
+    def read_entities(self, get_line, line, inENTITIES, writer=None, chunked=False):
+        """Export the entities read with get_line, up to the ENDSEC of ENTITIES
+
+        BLOCKS are read into defs as they are met. With chunked, reading stops
+        at the start of the ENTITIES section.
+        """
         entity = ""
-        block = defs  # initiallize with dummy
+        self.block = self.defs  # initiallize with dummy
         while line[0] and (line[1] != "ENDSEC" or not inENTITIES):
+            if chunked and inENTITIES:  # the ENTITIES are read by convert_chunks
+                return
             line = get_line()
             if line[1] == "ENTITIES":
                 inENTITIES = True
             if entity and vals.is_valid(line[0]):
-                seqs.append(line[0])  # list of group codes
-                if line[0] in ("1", "2", "3", "6", "7", "8"):  # text value
-                    # TODO: if add funs of export_mtext, delete the line
-                    val = line[1].replace(r"\~", " ")
-                    # val = re.sub(r"\\A.*;", "", val)
-                    # val = re.sub(r'\\H.*;', '', val)
-                    val = re.sub(r"\^I", "", val)
-                    val = re.sub(r"{\\L", "", val)
-                    # val = re.sub(r'}', '', val)  {\\C; '}' in mtext
-                    val = re.sub(r"\\S.*;", "", val)
-                    val = re.sub(r"\\W.*;", "", val)
-                    val = val
-                    val = re.sub(r"\\U\+([0-9A-Fa-f]{4})", re_hex2unichar, val)
-                elif line[0] in ("62", "70", "92", "93"):
-                    val = int(line[1])
-                else:  # unscaled float value
-                    val = float(line[1])
-                vals[line[0]].append(val)
-            elif has_export(line[1]):
-                if has_export(entity):
-                    if block != defs:  # in a BLOCK
-                        layer = block
+                self.seqs.append(line[0])  # list of group codes
+                vals[line[0]].append(line[1])  # decoded on access
+            elif line[1] in EXPORTERS:
+                if entity in EXPORTERS:
+                    if self.block != self.defs:  # in a BLOCK
+                        self.layer = self.block
                     elif vals.has_layer_name:  # use Common Layer Name
                         if not vals.layer_name:
                             vals.layer_name = "0"  # use default name
-                        if vals.layer_name not in layer_nodes:
+                        if vals.layer_name not in self.layer_nodes:
                             # attribs = {inkex.addNS('groupmode','inkscape') :
                             #    'layer', inkex.addNS('label','inkscape') : '%s' % vals.layer_name}
-                            # layer_nodes[vals.layer_name] = etree.SubElement(doc.getroot(), 'g', attribs)
-                            layer_nodes[vals.layer_name] = svg.add(
+                            # self.layer_nodes[vals.layer_name] = etree.SubElement(doc.getroot(), 'g', attribs)
+                            self.layer_nodes[vals.layer_name] = self.svg.add(
                                 inkex.Layer.new(vals.layer_name)
                             )
-                        layer = layer_nodes[vals.layer_name]
-                    color = "#000000"  # default color
+                        self.layer = self.layer_nodes[vals.layer_name]
+                    self.color = "#000000"  # default color
                     if vals.has_layer_name:
-                        if vals.layer_name in layer_colors:
-                            color = get_rgbcolor(layer_colors[vals.layer_name], color)
+                        if vals.layer_name in self.layer_colors:
+                            self.color = get_rgbcolor(self.layer_colors[vals.layer_name], self.color)
                     if vals.has_color:  # Common Color Number
-                        color = get_rgbcolor(vals.color, color)
-                    style = formatStyle({"stroke": "%s" % color, "fill": "none"})
+                        self.color = get_rgbcolor(vals.color, self.color)
+                    self.style = formatStyle({"stroke": "%s" % self.color, "fill": "none"})
                     w = 0.5  # default lineweight for POINT
                     if vals.has_line_weight:  # Common Lineweight
                         if vals.line_weight > 0:
                             w = 96.0 / 25.4 * vals.line_weight / 100.0
-                            w *= scale  # real wide : line_weight /144 inch
+                            w *= self.scale  # real wide : line_weight /144 inch
                             if w < 0.5:
                                 w = 0.5
                             if (
-                                block == defs
+                                self.block == self.defs
                             ):  # not in a BLOCK for INSERT except stroke-width 2021.july
-                                style = formatStyle(
+                                self.style = formatStyle(
                                     {
-                                        "stroke": "%s" % color,
+                                        "stroke": "%s" % self.color,
                                         "fill": "none",
                                         "stroke-width": "%.3f" % w,
                                     }
                                 )
                     if vals.has_line_type:  # Common Linetype
-                        if vals.line_type in linetypes:
-                            style += ";" + linetypes[vals.line_type]
-                    extrude = 1.0
+                        if vals.line_type in self.linetypes:
+                            self.style += ";" + self.linetypes[vals.line_type]
+                    self.extrude = 1.0
                     if vals.has_extrude:
                         if (entity != "LINE") and (entity != "POINT"):
-                            extrude = float(vals.extrude)
-                            if extrude < 1.0:
-                                be_extrude = True
+                            self.extrude = float(vals.extrude)
+                            if self.extrude < 1.0:
+                                self.be_extrude = True
 
-                    vals.adjust_coords(xmin, ymin, scale, extrude, height)
+                    vals.adjust_coords(self.xmin, self.ymin, self.scale, self.extrude, self.height)
 
-                    if extrude == -1.0:  # reflect angles
+                    if self.extrude == -1.0:  # reflect angles
                         if vals.has_angle and vals.has_angle2:
                             vals.angle2, vals.angle = (
                                 180.0 - vals.angle,
                                 180.0 - vals.angle2,
                             )
-                    exporter = get_export(entity)
+                    exporter = EXPORTERS[entity]
                     if exporter:
                         if entity == "POINT":
-                            exporter(vals, w)
+                            exporter(self, vals, w)
                         else:
-                            exporter(vals)
+                            exporter(self, vals)
+                    # BLOCK symbols stay in defs, only layers are streamed
+                    if writer and inENTITIES and isinstance(self.layer, inkex.Layer):
+                        writer.write(self.svg, self.layer)
 
                 if line[1] == "POLYLINE":
                     inVertexs = False
                     entity = "LWPOLYLINE"
                     vals = ValueConstruct()
-                    seqs = []
+                    self.seqs = []
                     flag70 = 0  # default closed-line or not
                     val8 = "0"  # default layer name
                     val10 = 0  # x
@@ -1642,18 +2234,18 @@ class DxfInput(inkex.InputExtension):
                         if line[1] == "VERTEX":
                             if inVertexs == True:
                                 if valid:
-                                    seqs.append("10")
+                                    self.seqs.append("10")
                                     vals["10"].append(val10)
-                                    seqs.append("20")
+                                    self.seqs.append("20")
                                     vals["20"].append(val20)
-                                    seqs.append("42")
+                                    self.seqs.append("42")
                                     vals["42"].append(val42)
                                     val42 = 0
                             inVertexs = True
                             valid = True
                         if inVertexs == False:
                             if line[0] == "6":  # 6:line style
-                                seqs.append(line[0])
+                                self.seqs.append(line[0])
                                 vals[line[0]].append(line[1])
                             if line[0] == "8":  # 8:layer
                                 val8 = line[1]
@@ -1672,41 +2264,145 @@ class DxfInput(inkex.InputExtension):
                                 else:
                                     val42 = val
                     if valid:
-                        seqs.append("8")  # layer_name
+                        self.seqs.append("8")  # layer_name
                         vals["8"].append(val8)
-                        seqs.append("10")
+                        self.seqs.append("10")
                         vals["10"].append(val10)
-                        seqs.append("20")
+                        self.seqs.append("20")
                         vals["20"].append(val20)
-                        seqs.append("42")  # bulge
+                        self.seqs.append("42")  # bulge
                         vals["42"].append(val42)
-                    seqs.append("70")  # closed line?
+                    self.seqs.append("70")  # closed line?
                     vals["70"].append(flag70)
                     continue
 
                 entity = line[1]
                 vals = ValueConstruct()
-                seqs = []
+                self.seqs = []
+
+    def convert_chunks(self, stream, writer=None):
+        """Export the ENTITIES section in byte range chunks on a process pool
+
+        Each chunk is converted with the tables read by this importer & its
+        layers are merged in file order, so the document matches a serial
+        conversion.
+        """
+        jobs = self.options.jobs or os.cpu_count()
+        options = type(self.options)(**vars(self.options))
+        options.output = None  # the output stream stays in this process
+        state = {name: getattr(self, name) for name in CHUNK_STATE}
+        ranges = split_entities(stream, jobs)
+        if not ranges:
+            return
+        with concurrent.futures.ProcessPoolExecutor(min(jobs, len(ranges))) as pool:
+            futures = [
+                pool.submit(convert_chunk, options, state, start, end)
+                for start, end in ranges
+            ]
+            for future in futures:
+                layers, be_extrude = future.result()
+                self.be_extrude = self.be_extrude or be_extrude
+                for name, fragment in layers:
+                    if name not in self.layer_nodes:
+                        self.layer_nodes[name] = self.svg.add(inkex.Layer.new(name))
+                    layer = self.layer_nodes[name]
+                    layer.extend(list(etree.fromstring(fragment)))
+                    if writer:
+                        writer.write(self.svg, layer)
+
+    def finish(self, doc, writer):
+        self.geometry.flush()
+        if writer is None:
+            return doc
+        writer.close(self.svg)
+        return None
+
+
+# importer attributes a chunk needs from the HEADER & TABLES
+CHUNK_STATE = (
+    "scale",
+    "textscale",
+    "xmin",
+    "ymin",
+    "height",
+    "DIMTXT",
+    "style_font3",
+    "style_direction",
+    "layer_colors",
+    "linetypes",
+)
+
+
+def convert_chunk(options, state, start, end):
+    """Export the entities in a byte range of the input file
+
+    Returns the layers as (name, serialized layer) in the order they were
+    created & whether an extruded entity was met.
+    """
+    importer = DxfImporter(options)
+    for name, value in state.items():
+        setattr(importer, name, value)
+    importer.svg = DxfInput.get_template(
+        width=210 * 96 / 25.4, height=297 * 96 / 25.4
+    ).getroot()
+    importer.defs = importer.svg.defs
+    importer.layer = importer.svg.add(inkex.Layer.new("0"))
+    importer.layer_nodes = {"0": importer.layer}
+
+    with open(options.input_file, "rb") as stream:
+        stream.seek(start)
+        data = io.BytesIO(stream.read(end - start))
+    # the ENDSEC exports the last entity of the chunk
+    groups = itertools.chain(
+        iter_ascii_groups(data, options.input_encode), [("0", "ENDSEC")]
+    )
+    importer.read_entities(functools.partial(next, groups, ("", "")), ("0", ""), True)
+    importer.geometry.flush()
+    layers = [
+        (name, etree.tostring(layer)) for name, layer in importer.layer_nodes.items()
+    ]
+    return layers, importer.be_extrude
 
-        #     for debug
-        # tree = etree.ElementTree(svg)
-        # tree.write('c:\Python\svgCH2.xml')
-        if be_extrude:
-            inkex.errormsg(
-                _(
-                    "An object that has the extrude parameter set was detected. "
-                    "The imported figure may be displayed incorrectly."
-                )
-            )
-        self.document = doc
 
+class DxfInput(inkex.InputExtension):
+    def add_arguments(self, pars):
+        pars.add_argument("--tab", default="options")
+        pars.add_argument("--scalemethod", default="manual")
+        pars.add_argument("--scale", default="1.0")
+        pars.add_argument("--textscale", default="1.0")
+        pars.add_argument("--xmin", default="0.0")
+        pars.add_argument("--ymin", default="0.0")
+        pars.add_argument("--gcodetoolspoints", default=False, type=inkex.Boolean)
+        pars.add_argument("--encoding", dest="input_encode", default="latin_1")
+        pars.add_argument("--font", default="Arial")
+        pars.add_argument("--precision", default=6, type=int)
+        pars.add_argument("--tolerance", default=0.1, type=float)
+        pars.add_argument("--stream", default=False, type=inkex.Boolean)
+        pars.add_argument("--jobs", default=1, type=int)
+
+    def load(self, stream):
+        return stream
 
-def get_export(opt):
-    return globals().get("export_" + opt.lower(), None)
+    def effect(self):
+        if not self.options.stream:
+            self.document = DxfImporter(self.options).convert(self.document)
 
+    def save(self, stream):
+        if self.options.stream:  # convert straight to the output
+            DxfImporter(self.options).convert(self.document, stream)
+        else:
+            super().save(stream)
 
-def has_export(opt):
-    return get_export(opt) is not None
+
+def import_dxf(input_file, *args):
+    """Returns the SVG document of a DXF file
+
+    args are DxfInput options, e.g. "--scalemethod=auto". Each call uses its
+    own DxfImporter, so it is safe to call from several threads.
+    """
+    options = DxfInput().arg_parser.parse_args([*args, input_file])
+    with open(input_file, "rb") as stream:
+        return DxfImporter(options).convert(stream)
 
 
 if __name__ == "__main__":
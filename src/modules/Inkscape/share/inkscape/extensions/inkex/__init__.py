@@ -11,7 +11,7 @@ import sys
 from .extensions import *
 from .utils import AbortExtension, DependencyError, Boolean, errormsg
 from .styles import *
-from .paths import Path, CubicSuperPath  # Path commands are not exported
+from .paths import Path, CubicSuperPath, CompactPath  # Path commands are not exported
 from .colors import *
 from .transforms import *
 from .elements import *
@@ -39,6 +39,7 @@ from .curves import curve, Curve, smooth, Smooth
 from .quadratic import quadratic, Quadratic, tepidQuadratic, TepidQuadratic
 from .arc import Arc, arc, arc_to_path, matprod, rotmat, applymat, norm
 from .path import CubicSuperPath, Path, InvalidPath
+from .compact import CompactPath
 
 import numpy as np
 
@@ -90,6 +91,7 @@ PathCommand._letter_to_class = {  # pylint: disable=protected-access
 __all__ = (
     "Path",
     "CubicSuperPath",
+    "CompactPath",
     "PathCommand",
     "AbsolutePathCommand",
     "RelativePathCommand",
@@ -0,0 +1,702 @@
+# coding=utf-8
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+#
+"""
+Array backed paths
+
+A :class:`CompactPath` holds the letters of its commands as a uint8 array and the
+arguments of all commands as one contiguous float64 array, so that long paths
+don't need a :class:`PathCommand` object per segment. Parsing, transforms,
+bounding boxes, reversing and absolute conversion work on whole arrays.
+
+.. versionadded:: 1.4
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+
+from ..transforms import BoundingBox, Transform
+from .interfaces import PathCommand
+from .path import CubicSuperPath, InvalidPath, Path
+
+LETTERS = "MLHVCSQTAZ"
+# the numbers of utils.NUMBER_REX, as a pattern which is faster to match
+NUMBER = r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+NUMBER_FAST_REX = re.compile(NUMBER)
+KIND_REX = re.compile(rf"([{LETTERS}{LETTERS.lower()}])|{NUMBER}")
+
+# argument count & (x, y) argument pairs of each command, the last pair is its
+# end point & None stands for a coordinate the command keeps
+COMMANDS = {
+    "M": (2, ((0, 1),)),
+    "L": (2, ((0, 1),)),
+    "H": (1, ((0, None),)),
+    "V": (1, ((None, 0),)),
+    "C": (6, ((0, 1), (2, 3), (4, 5))),
+    "S": (4, ((0, 1), (2, 3))),
+    "Q": (4, ((0, 1), (2, 3))),
+    "T": (2, ((0, 1),)),
+    "A": (7, ((5, 6),)),
+    "Z": (0, ()),
+}
+MAX_ARGS = 7
+
+
+def _command_tables():
+    """Lookup tables by command letter code"""
+    valid = np.zeros(256, dtype=bool)
+    nargs = np.zeros(256, dtype=np.intp)
+    axes = np.full((256, MAX_ARGS), -1, dtype=np.intp)  # 0 for x & 1 for y
+    end = np.full((256, 2), -1, dtype=np.intp)
+    following = np.arange(256, dtype=np.uint8)  # command implied by more numbers
+    templates = {}
+    for letter, (count, pairs) in COMMANDS.items():
+        for char in (letter, letter.lower()):
+            code = ord(char)
+            valid[code] = True
+            nargs[code] = count
+            for pair in pairs:
+                for axis, index in enumerate(pair):
+                    if index is not None:
+                        axes[code, index] = axis
+            if pairs:
+                end[code] = [-1 if index is None else index for index in pairs[-1]]
+            numbers = " ".join([PathCommand.number_template] * count)
+            templates[char] = f"{char} {numbers}".strip()
+    following[ord("M")], following[ord("m")] = ord("L"), ord("l")
+    return valid, nargs, axes, end, following, templates
+
+
+VALID, NARGS, AXES, END, FOLLOWING, TEMPLATES = _command_tables()
+
+
+def _letters(codes: np.ndarray, letters: str) -> np.ndarray:
+    """Mask of the commands with one of the letters"""
+    table = np.zeros(256, dtype=bool)
+    table[list(letters.encode("ascii"))] = True
+    return table[codes]
+
+
+def _scan(keep: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """x[i] = x[i - 1] + step[i] where keep[i], else step[i], from x[-1] = 0
+
+    Runs are summed by doubling, without the rounding of a global running sum."""
+    keep = np.broadcast_to(keep, step.shape)
+    index = np.arange(len(step)).reshape((-1,) + (1,) * (step.ndim - 1))
+    # position of each step in its run
+    position = index - np.maximum.accumulate(np.where(keep, 0, index), axis=0)
+    result = np.array(step, dtype=float)
+    shift, longest = 1, position.max(initial=0)
+    while shift <= longest:
+        result[shift:] += np.where(position[shift:] >= shift, result[:-shift], 0.0)
+        shift *= 2
+    return result
+
+
+def _previous(points: np.ndarray) -> np.ndarray:
+    """The point before each point, from the origin"""
+    return np.concatenate([np.zeros((1, 2)), points[:-1]])
+
+
+def _cubic_extrema(py0, py1, py2, py3):
+    """Extreme values of cubic bezier coordinates, as :func:`cubic_extrema`"""
+    cmin, cmax = np.minimum(py0, py3), np.maximum(py0, py3)
+    pd1, pd2, pd3 = py1 - py0, py2 - py1, py3 - py2
+    denominator = pd1 - 2 * pd2 + pd3
+    radicand = pd2 * pd2 - pd1 * pd3
+    quadratic = (np.abs(denominator) > 1e-9) & (radicand > 0)
+    linear = (np.abs(denominator) <= 1e-9) & (np.abs(pd2 - pd1) > 1e-9)
+    root = np.sqrt(np.where(quadratic, radicand, 0.0))
+    denominator = np.where(quadratic, denominator, 1.0)
+    points = (
+        (quadratic, (pd1 - pd2 + root) / denominator),
+        (quadratic, (pd1 - pd2 - root) / denominator),
+        (linear, -pd1 / (2 * np.where(linear, pd2 - pd1, 1.0))),
+    )
+    for valid, point in points:
+        valid = valid & (point > 0) & (point < 1)
+        pyx = (
+            py0 * (1 - point) * (1 - point) * (1 - point)
+            + 3 * py1 * point * (1 - point) * (1 - point)
+            + 3 * py2 * point * point * (1 - point)
+            + py3 * point * point * point
+        )
+        cmin = np.where(valid, np.minimum(cmin, pyx), cmin)
+        cmax = np.where(valid, np.maximum(cmax, pyx), cmax)
+    return cmin, cmax
+
+
+def _quadratic_extrema(py0, py1, py2):
+    """Extreme values of quadratic bezier coordinates, as :func:`quadratic_extrema`"""
+    cmin, cmax = np.minimum(py0, py2), np.maximum(py0, py2)
+    denominator = py0 + py2 - 2 * py1
+    valid = np.abs(denominator) > 1e-9
+    point = (py0 - py1) / np.where(valid, denominator, 1.0)
+    valid &= (point > 0) & (point < 1)
+    pyx = (
+        py0 * (1 - point) * (1 - point)
+        + 2 * py1 * point * (1 - point)
+        + py2 * point * point
+    )
+    cmin = np.where(valid, np.minimum(cmin, pyx), cmin)
+    cmax = np.where(valid, np.maximum(cmax, pyx), cmax)
+    return cmin, cmax
+
+
+def _arc_curves(start: np.ndarray, args: np.ndarray):
+    """Cubic bezier curves of arcs, as :func:`arc_to_path` and :meth:`Arc.to_curves`
+
+    Returns the two control points & end point of each curve as a (n, 3, 2) array
+    and the index of the arc each curve belongs to.
+    """
+    # pylint: disable=too-many-locals
+    radius_x, radius_y, teta, longflag, sweepflag = args[:, :5].T
+    end = args[:, 5:7]
+    teta = teta * np.pi / 180.0
+    degenerate = (radius_x == 0) | (radius_y == 0) | (start == end).all(axis=1)
+    radius_x = np.where(degenerate, 1.0, radius_x)
+    radius_y = np.where(degenerate, 1.0, radius_y)
+    cos, sin = np.cos(teta), np.sin(teta)
+
+    def apply(cos, sin, scale_x, scale_y, x, y):
+        # rotmat(teta) @ [[scale_x, 0], [0, scale_y]] @ rotmat(-teta)
+        p00, p01, p10, p11 = cos * scale_x, -sin * scale_y, sin * scale_x, cos * scale_y
+        a00, a01 = p00 * cos + p01 * -sin, p00 * sin + p01 * cos
+        a10, a11 = p10 * cos + p11 * -sin, p10 * sin + p11 * cos
+        return a00 * x + a01 * y, a10 * x + a11 * y
+
+    # on the unit circle the ellipse turns into
+    ax, ay = apply(cos, sin, 1.0 / radius_x, 1.0 / radius_y, *start.T)
+    bx, by = apply(cos, sin, 1.0 / radius_x, 1.0 / radius_y, *end.T)
+    kx, ky = -(by - ay), bx - ax
+    distance = np.where(degenerate, 1.0, kx * kx + ky * ky)
+    kx, ky = kx / np.sqrt(distance), ky / np.sqrt(distance)
+    distance = np.sqrt(np.maximum(0, 1 - distance / 4.0))
+    distance = np.where(longflag == sweepflag, -distance, distance)
+    ox, oy = (bx + ax) / 2.0 + distance * kx, (by + ay) / 2.0 + distance * ky
+
+    def angle(x, y):
+        cos_angle = np.clip(x / np.sqrt(x * x + y * y), -1, 1)
+        return np.where(y < 0, -1, 1) * np.arccos(cos_angle)
+
+    first, last = angle(ax - ox, ay - oy), angle(bx - ox, by - oy)
+    last = np.where((sweepflag != 0) & (first > last), last + 2 * np.pi, last)
+    last = np.where((sweepflag == 0) & (first < last), last - 2 * np.pi, last)
+    sectors = (np.abs(first - last) * 2 / np.pi).astype(int) + 1
+    sectors = np.where(degenerate, 1, sectors)
+    step = (last - first) / sectors
+    handle = 4 * np.tan(step / 4.0) / 3.0
+
+    # nodes at the ends of the sectors, with their handles
+    arc = np.repeat(np.arange(len(args)), sectors + 1)
+    first_node = np.cumsum(sectors + 1) - sectors - 1
+    node = np.arange(len(arc)) - np.repeat(first_node, sectors + 1)
+    angles = first[arc] + node * step[arc]
+    cos_node, sin_node, handle = np.cos(angles), np.sin(angles), handle[arc]
+    node_x, node_y = ox[arc] + cos_node, oy[arc] + sin_node
+    before = (node_x - (-handle) * sin_node, node_y + (-handle) * cos_node)
+    after = (node_x - handle * sin_node, node_y + handle * cos_node)
+    scales = (cos[arc], sin[arc], radius_x[arc], radius_y[arc])
+
+    def back(x, y):
+        return apply(*scales, x, y)
+
+    points = np.stack(
+        [np.stack(back(*before), -1), np.stack(back(node_x, node_y), -1)], axis=1
+    )
+    after = np.stack(back(*after), -1)
+
+    # a curve from each node to the next
+    curve = np.ones(len(arc), dtype=bool)
+    curve[np.cumsum(sectors + 1) - 1] = False
+    curves = np.concatenate([after[curve, None], points[np.roll(curve, 1)]], axis=1)
+    owner = arc[curve]
+    flat = degenerate[owner]
+    curves[flat, 0] = start[owner[flat]]
+    curves[flat, 1:] = end[owner[flat], None]
+    return curves, owner
+
+
+def _transform_arcs(args: np.ndarray, matrix) -> np.ndarray:
+    """Radii, rotation & flags of arcs after a transform, as :meth:`Arc.transform`"""
+    # pylint: disable=invalid-name, too-many-locals
+    radius_x, radius_y, rotation, large_arc, sweep = args[:, :5].T
+    teta = rotation * np.pi / 180.0
+    cos, sin = np.cos(teta), np.sin(teta)
+    # transform @ Transform(rotate=rotation) as | a b |
+    #                                           | c d |
+    a = matrix[0] * cos + matrix[2] * sin
+    b = -matrix[0] * sin + matrix[2] * cos
+    c = matrix[1] * cos + matrix[3] * sin
+    d = -matrix[1] * sin + matrix[3] * cos
+    detT = a * d - b * c
+    detT2 = detT**2
+    degenerate = (radius_x == 0) | (radius_y == 0) | (detT2 == 0)
+    rx2 = np.where(degenerate, 1.0, radius_x) ** 2
+    ry2 = np.where(degenerate, 1.0, radius_y) ** 2
+    detT2 = np.where(degenerate, 1.0, detT2)
+
+    A = (d**2 / rx2 + c**2 / ry2) / detT2
+    B = -(d * b / rx2 + c * a / ry2) / detT2
+    D = (b**2 / rx2 + a**2 / ry2) / detT2
+    theta_deg = np.arctan2(-2 * B, D - A) / 2 * 180.0 / np.pi
+    DA = D - A
+    l2 = 4 * B**2 + DA**2
+    delta = 0.5 * (-(DA**2) - 4 * B**2) / np.sqrt(np.where(l2 == 0, 1.0, l2))
+    delta = np.where(l2 == 0, 0.0, delta)
+    half = (A + D) / 2
+    # the arc stays as it is where Arc.transform divides by zero
+    degenerate |= (half + delta <= 0) | (half - delta <= 0)
+    result = np.stack(
+        [
+            1.0 / np.sqrt(np.where(degenerate, 1.0, half + delta)),
+            1.0 / np.sqrt(np.where(degenerate, 1.0, half - delta)),
+            theta_deg,
+            large_arc,
+            np.where(detT > 0, sweep, sweep <= 0),
+        ],
+        axis=1,
+    )
+    result[degenerate] = args[degenerate, :5]
+    return result
+
+
+class CompactPath:
+    """A path as arrays: ``codes`` holds the ASCII letter of each command (uint8)
+    and ``coords`` the arguments of all commands in order (float64)
+
+    Convert from and to :class:`Path` with :meth:`from_path` / :meth:`to_path`,
+    from and to :class:`CubicSuperPath` with :meth:`from_superpath` /
+    :meth:`to_superpath`, and parse path data with :meth:`parse`.
+
+    Each operation costs a fixed number of array calls, so this pays off for paths
+    of a few hundred commands and more; :class:`Path` is quicker on short paths.
+
+    .. versionadded:: 1.4"""
+
+    def __init__(self, codes="", coords=()):
+        if isinstance(codes, str):
+            codes = codes.encode("ascii")
+        if isinstance(codes, bytes):
+            codes = np.frombuffer(codes, dtype=np.uint8)
+        self.codes = np.array(codes, dtype=np.uint8).reshape(-1)
+        self.coords = np.array(coords, dtype=float).reshape(-1)
+        if not VALID[self.codes].all():
+            raise InvalidPath(f"Invalid path command letters: {self.letters}")
+        if NARGS[self.codes].sum() != len(self.coords):
+            raise InvalidPath(
+                f"{self.letters} takes {NARGS[self.codes].sum()} arguments, "
+                f"got {len(self.coords)}"
+            )
+
+    @property
+    def letters(self) -> str:
+        """The letters of the commands"""
+        return self.codes.tobytes().decode("latin_1")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactPath):
+            return NotImplemented
+        return np.array_equal(self.codes, other.codes) and np.array_equal(
+            self.coords, other.coords
+        )
+
+    def __str__(self):
+        template = " ".join([TEMPLATES[letter] for letter in self.letters])
+        return template.format(*self.coords.tolist())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.letters!r}, {self.coords.tolist()!r})"
+
+    def copy(self) -> CompactPath:
+        """Make a copy"""
+        return CompactPath(self.codes, self.coords)
+
+    @classmethod
+    def parse(cls, path_d: str) -> CompactPath:
+        """Parse a path string, with the rules of :meth:`Path.parse_string`"""
+        kinds = np.array(KIND_REX.findall(path_d), dtype="U1")
+        at = np.flatnonzero(kinds != "")
+        if not len(at):
+            return cls()
+        # numbers before the first command are ignored
+        numbers = np.array(NUMBER_FAST_REX.findall(path_d), dtype=float)[at[0] :]
+        codes = kinds[at].view(np.uint32).astype(np.uint8)
+        count = np.diff(np.append(at, len(kinds))) - 1
+
+        # numbers after a close command start an implicit move
+        extra = _letters(codes, "Zz") & (count > 0)
+        if extra.any():
+            copies = 1 + extra
+            codes, count = np.repeat(codes, copies), np.repeat(count, copies)
+            closes = (np.cumsum(copies) - copies)[extra]
+            codes[closes + 1], count[closes] = ord("M"), 0
+
+        nargs = NARGS[codes]
+        repeats = np.where(nargs > 0, count // np.maximum(nargs, 1), 1)
+        # parsing stops after the first command with missing arguments
+        partial = np.flatnonzero(count != repeats * nargs)
+        if len(partial):
+            codes, nargs = codes[: partial[0] + 1], nargs[: partial[0] + 1]
+            repeats = repeats[: partial[0] + 1]
+        segments = np.repeat(codes, repeats)
+        implicit = np.ones(len(segments), dtype=bool)
+        implicit[(np.cumsum(repeats) - repeats)[repeats > 0]] = False
+        segments[implicit] = FOLLOWING[segments[implicit]]
+        return cls(segments, numbers[: (repeats * nargs).sum()])
+
+    @classmethod
+    def from_path(cls, path: Path) -> CompactPath:
+        """Convert a :class:`Path`"""
+        letters = "".join([seg.letter for seg in path])
+        return cls(letters, list(chain.from_iterable(seg.args for seg in path)))
+
+    def to_path(self) -> Path:
+        """Convert to a :class:`Path`"""
+        coords = self.coords.tolist()
+        ends = np.cumsum(NARGS[self.codes])
+        starts = (ends - NARGS[self.codes]).tolist()
+        return Path(
+            [
+                (letter, coords[start:end])
+                for letter, start, end in zip(self.letters, starts, ends.tolist())
+            ]
+        )
+
+    @classmethod
+    def from_superpath(cls, csp: CubicSuperPath) -> CompactPath:
+        """Convert a :class:`CubicSuperPath`, as ``csp.to_path(curves_only=True)``"""
+        subpaths = [subpath for subpath in csp if subpath]
+        if not subpaths:
+            return cls()
+        nodes = np.array(list(chain.from_iterable(subpaths)), dtype=float)
+        nodes = nodes.reshape(-1, 3, 2)
+        sizes = np.array([len(subpath) for subpath in subpaths])
+        first = np.cumsum(sizes) - sizes
+        codes = np.full(len(nodes), ord("C"), dtype=np.uint8)
+        codes[first] = ord("M")
+        args = np.zeros((len(nodes), MAX_ARGS))
+        # outgoing handle of the node before, incoming handle & node
+        args[:, :2] = np.roll(nodes[:, 2], 1, axis=0)
+        args[:, 2:4], args[:, 4:6] = nodes[:, 0], nodes[:, 1]
+        args[first, :2] = nodes[first, 1]
+        return cls._from_padded(codes, args)
+
+    def to_superpath(self) -> CubicSuperPath:
+        """Convert to a :class:`CubicSuperPath`, as
+        ``CubicSuperPath(path.to_non_shorthand())``
+
+        Paths which don't start with a move are converted through :meth:`to_path`.
+        """
+        if not len(self.codes) or self.codes[0] | 0x20 != ord("m"):
+            return CubicSuperPath(self.to_path())
+        codes, args, ends = self._curves()
+        prev = _previous(ends)
+
+        # incoming handle, node & outgoing handle of the node each command ends on,
+        # and the outgoing handle each command sets on the node before
+        nodes = np.repeat(ends[:, None], 3, axis=1)
+        handle = prev.copy()
+        curve, quadratic = codes == ord("C"), codes == ord("Q")
+        nodes[curve, 0], handle[curve] = args[curve, 2:4], args[curve, :2]
+        control = args[quadratic, :2]
+        nodes[quadratic, 0] = 2.0 / 3 * control + 1.0 / 3 * ends[quadratic]
+        handle[quadratic] = 1.0 / 3 * prev[quadratic] + 2.0 / 3 * control
+        drawn = np.flatnonzero(_letters(codes, "LCQ"))
+        nodes[drawn - 1, 2] = handle[drawn]
+        # a close command repeats the first node of its subpath
+        index = np.arange(len(codes))
+        moves = np.flatnonzero(codes == ord("M"))
+        close = codes == ord("Z")
+        subpath = np.maximum.accumulate(np.where(codes == ord("M"), index, 0))
+        nodes[close] = nodes[subpath[close]]
+        drawn = drawn[close[drawn - 1]]
+        nodes[drawn - 1, 2] = handle[drawn]
+
+        result = CubicSuperPath([])
+        result.extend(subpath.tolist() for subpath in np.split(nodes, moves[1:]))
+        # pylint: disable=protected-access
+        result._prev_prev = complex(*nodes[-1, 0])
+        result._prev = complex(*nodes[-1, 1])
+        return result
+
+    @staticmethod
+    def _slots(codes: np.ndarray) -> np.ndarray:
+        """Index of each coordinate in the flat (n, 7) arguments of the commands"""
+        nargs = NARGS[codes]
+        offset = np.arange(len(codes)) * MAX_ARGS - (np.cumsum(nargs) - nargs)
+        return np.arange(nargs.sum()) + np.repeat(offset, nargs)
+
+    def _padded(self) -> np.ndarray:
+        """Arguments as a (n, 7) array, zero after the arguments of each command"""
+        args = np.zeros((len(self.codes), MAX_ARGS))
+        args.reshape(-1)[self._slots(self.codes)] = self.coords
+        return args
+
+    @classmethod
+    def _from_padded(cls, codes: np.ndarray, args: np.ndarray) -> CompactPath:
+        return cls(codes, args.reshape(-1)[cls._slots(codes)])
+
+    @staticmethod
+    def _offset(args, codes, rows, points, sign=1.0):
+        """Add the points to the coordinates of the commands in rows, in place"""
+        axes = AXES[codes]
+        offset = np.take_along_axis(points, np.maximum(axes, 0), axis=1)
+        args += sign * np.where((axes >= 0) & rows[:, None], offset, 0.0)
+
+    @property
+    def end_points(self) -> np.ndarray:
+        """Absolute end point of each command, as a (n, 2) array"""
+        return self._end_points(self.codes, self._padded())
+
+    @staticmethod
+    def _end_points(codes: np.ndarray, args: np.ndarray) -> np.ndarray:
+        index = END[codes]
+        value = np.take_along_axis(args, np.maximum(index, 0), axis=1)
+        value = np.where(index >= 0, value, 0.0)
+        relative = (codes >= ord("a"))[:, None]
+        move = codes | 0x20 == ord("m")
+        restart = (move | (codes | 0x20 == ord("z")))[:, None]
+
+        # within a subpath, end = a * start + b, where a is 0 after an absolute
+        # coordinate and 1 after moves, closes and relative coordinates
+        reset = restart | ((index >= 0) & ~relative)
+        a = _scan(~reset, np.where(restart, 1.0, 0.0) * reset)
+        b = _scan(~reset, np.where(restart, 0.0, value))
+
+        # the start of each subpath, from the end of the command before its move
+        moves = np.flatnonzero(move)
+        before = (moves > 0)[:, None]
+        before_a = np.where(before, a[moves - 1], 0.0)
+        before_b = np.where(before, b[moves - 1], 0.0)
+        relative = relative[moves]
+        starts = np.zeros((len(moves) + 1, 2))
+        starts[1:] = _scan(
+            relative & (before_a == 1), np.where(relative, before_b, 0.0) + value[moves]
+        )
+        return a * starts[np.cumsum(move)] + b
+
+    def _absolute(self):
+        """Absolute codes, arguments & end points of the commands"""
+        relative = self.codes >= ord("a")
+        args = self._padded()
+        ends = self._end_points(self.codes, args)
+        self._offset(args, self.codes, relative, _previous(ends))
+        return np.where(relative, self.codes - 32, self.codes), args, ends
+
+    def to_absolute(self) -> CompactPath:
+        """Convert this path to use only absolute coordinates"""
+        return self._from_padded(*self._absolute()[:2])
+
+    @staticmethod
+    def _lines(codes, args, prev):
+        """Turn absolute horizontal & vertical lines into lines, in place"""
+        horz, vert = codes == ord("H"), codes == ord("V")
+        args[vert, 1] = args[vert, 0]
+        args[vert, 0] = prev[vert, 0]
+        args[horz, 1] = prev[horz, 1]
+        codes[horz | vert] = ord("L")
+
+    def to_non_shorthand(self) -> CompactPath:
+        """Convert this path to use only absolute non-shorthand commands (M, L, C, Q,
+        A and Z), as :meth:`Path.to_non_shorthand`"""
+        return self._from_padded(*self._non_shorthand()[:2])
+
+    def _non_shorthand(self):
+        """Absolute non-shorthand codes, arguments & end points of the commands"""
+        codes, args, ends = self._absolute()
+        prev = _previous(ends)
+        self._lines(codes, args, prev)
+        smooth, tepid = codes == ord("S"), codes == ord("T")
+
+        # the last control point of each curve, which the command after reflects
+        control = np.zeros((len(codes), 2))
+        control[codes == ord("C")] = args[codes == ord("C"), 2:4]
+        control[smooth | (codes == ord("Q"))] = args[smooth | (codes == ord("Q")), :2]
+        after_curve = np.roll(_letters(codes, "CSQT"), 1)[:, None]
+        after_curve[:1] = False
+        reflected = np.where(after_curve, np.roll(control, 1, axis=0), prev)
+        # along runs of T, control[i] = 2 prev[i] - control[i - 1], as a running
+        # sum of the controls with alternating signs
+        run = (tepid & np.roll(tepid, 1))[:, None]
+        run[:1] = False
+        sign = np.where(np.arange(len(codes)) % 2, -1.0, 1.0)[:, None]
+        step = sign * (2 * prev - np.where(run, 0.0, reflected))
+        control[tepid] = (sign * _scan(run, step))[tepid] + 0.0  # no negative zeros
+        reflected = np.where(after_curve, np.roll(control, 1, axis=0), prev)
+
+        result = args.copy()
+        result[smooth, :2] = 2 * prev[smooth] - reflected[smooth]
+        result[smooth, 2:6] = args[smooth, :4]
+        result[tepid, :2] = control[tepid]
+        result[tepid, 2:4] = args[tepid, :2]
+        codes[smooth], codes[tepid] = ord("C"), ord("Q")
+        return codes, result, ends
+
+    def _curves(self):
+        """As :meth:`_non_shorthand`, with arcs replaced by cubic curves"""
+        codes, args, ends = self._non_shorthand()
+        arcs = codes == ord("A")
+        if not arcs.any():
+            return codes, args, ends
+        curves, owner = _arc_curves(_previous(ends)[arcs], args[arcs])
+        count = np.ones(len(codes), dtype=np.intp)
+        count[arcs] = np.bincount(owner, minlength=arcs.sum())
+        codes, args = np.repeat(codes, count), np.repeat(args, count, axis=0)
+        ends = np.repeat(ends, count, axis=0)
+        slots = np.repeat(arcs, count)
+        codes[slots] = ord("C")
+        args[slots, :6], args[slots, 6] = curves.reshape(-1, 6), 0.0
+        ends[slots] = curves[:, 2]
+        return codes, args, ends
+
+    def transform(self, transform) -> CompactPath:
+        """Apply a transform to this path, as :meth:`Path.transform`
+
+        Horizontal and vertical lines turn into absolute lines, relative commands
+        stay relative."""
+        a, b, c, d, e, f = Transform(transform).to_hexad()
+        relative = (self.codes >= ord("a")) & ~_letters(self.codes, "hv")
+        codes, args, ends = self._absolute()
+        self._lines(codes, args, _previous(ends))
+
+        axes = AXES[codes]
+        left, right = np.roll(args, 1, axis=1), np.roll(args, -1, axis=1)
+        result = np.where(axes == 0, a * args + c * right + e, args)
+        result = np.where(axes == 1, b * left + d * args + f, result)
+        arcs = codes == ord("A")
+        if arcs.any():
+            result[arcs, :5] = _transform_arcs(args[arcs], (a, b, c, d))
+        # relative commands stay relative to the transformed end points
+        ends = ends @ np.array([[a, b], [c, d]]) + [e, f]
+        self._offset(result, codes, relative, _previous(ends), -1.0)
+        codes[relative] += 32
+        return self._from_padded(codes, result)
+
+    def bounding_box(self) -> Optional[BoundingBox]:
+        """Return bounding box of the path, as
+        ``path.to_non_shorthand().bounding_box()``"""
+        if not len(self.codes):
+            return None
+        codes, args, ends = self._non_shorthand()
+        prev = _previous(ends)
+        first = ends[0] if int(codes[0]) in b"MZ" else np.zeros(2)
+        later = np.arange(len(codes)) > 0
+        lows, highs = [first[None]], [first[None]]
+
+        lines = later & _letters(codes, "ML")
+        lows.append(ends[lines])
+        lines &= codes == ord("L")
+        lows.append(prev[lines])
+        extrema = []
+        curves = later & (codes == ord("C"))
+        extrema.append(
+            _cubic_extrema(
+                prev[curves], args[curves, :2], args[curves, 2:4], args[curves, 4:6]
+            )
+        )
+        quadratics = later & (codes == ord("Q"))
+        extrema.append(
+            _quadratic_extrema(
+                prev[quadratics], args[quadratics, :2], args[quadratics, 2:4]
+            )
+        )
+        arcs = later & (codes == ord("A"))
+        if arcs.any():
+            curves, owner = _arc_curves(prev[arcs], args[arcs])
+            # each curve starts on the end of the one before, or the arc start
+            starts = np.roll(curves[:, 2], 1, axis=0)
+            starts[np.flatnonzero(np.diff(owner, prepend=-1))] = prev[arcs]
+            extrema.append(
+                _cubic_extrema(starts, curves[:, 0], curves[:, 1], curves[:, 2])
+            )
+        lows.extend(low for low, _ in extrema)
+        highs.extend(high for _, high in extrema)
+
+        low = np.concatenate(lows).min(axis=0)
+        high = np.concatenate(lows + highs).max(axis=0)
+        return BoundingBox((low[0], high[0]), (low[1], high[1]))
+
+    def reverse(self) -> CompactPath:
+        """Returns a reversed path: subpaths in reverse order, each drawn backwards
+
+        The result uses absolute non-shorthand commands. A closed subpath starts on
+        the same point and stays closed."""
+        # pylint: disable=too-many-locals
+        codes, args, ends = self._non_shorthand()
+        if not len(codes):
+            return CompactPath()
+        if codes[0] != ord("M"):  # drawn from the origin
+            codes = np.concatenate([[ord("M")], codes]).astype(np.uint8)
+            args = np.concatenate([np.zeros((1, MAX_ARGS)), args])
+            ends = np.concatenate([np.zeros((1, 2)), ends])
+        prev = _previous(ends)
+        index = np.arange(len(codes))
+        moves = np.flatnonzero(codes == ord("M"))
+        block_end = np.append(moves[1:], len(codes))
+        block = np.cumsum(codes == ord("M")) - 1
+
+        # each command reversed: ending on its start, control points swapped
+        result, reversed_codes = np.zeros_like(args), codes.copy()
+        lines = _letters(codes, "LZ")
+        result[lines, :2] = prev[lines]
+        reversed_codes[lines] = ord("L")
+        curves = codes == ord("C")
+        result[curves, :2], result[curves, 2:4] = args[curves, 2:4], args[curves, :2]
+        result[curves, 4:6] = prev[curves]
+        quadratics = codes == ord("Q")
+        result[quadratics, :2], result[quadratics, 2:4] = (
+            args[quadratics, :2],
+            prev[quadratics],
+        )
+        arcs = codes == ord("A")
+        result[arcs, :4], result[arcs, 4] = args[arcs, :4], args[arcs, 4] == 0
+        result[arcs, 5:7] = prev[arcs]
+        result[moves, :2] = ends[block_end - 1]
+
+        # the close of a closed subpath becomes its first line, left out where it has
+        # no length, and a line which started the subpath becomes its close
+        closed = (codes[block_end - 1] == ord("Z")) & (block_end - 1 > moves)
+        last, first = block_end[closed] - 1, moves[closed] + 1
+        drop = np.zeros(len(codes), dtype=bool)
+        drop[last] = (prev[last] == ends[moves[closed]]).all(axis=1)
+        merge = (first != last) & _letters(codes[first], "LZ")
+        reversed_codes[first[merge]] = ord("Z")
+        close_after = np.zeros(len(codes), dtype=np.intp)
+        close_after[first[~merge]] = 1
+
+        # subpaths in reverse order, each a move then its commands from the last
+        sizes = (block_end - moves)[::-1]
+        block_start = (np.cumsum(sizes) - sizes)[::-1]
+        position = np.where(codes == ord("M"), 0, block_end[block] - index)
+        order = np.empty_like(index)
+        order[block_start[block] + position] = index
+
+        count = 1 + close_after[order]
+        codes = np.repeat(reversed_codes[order], count)
+        args = np.repeat(result[order], count, axis=0)
+        keep = np.repeat(~drop[order], count)
+        closes = (np.cumsum(count) - 1)[count > 1]
+        codes[closes], keep[closes] = ord("Z"), True
+        return self._from_padded(codes[keep], args[keep])
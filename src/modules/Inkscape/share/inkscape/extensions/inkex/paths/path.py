@@ -610,6 +610,14 @@ class Path(list):
         """Convert this path into a cubic super path"""
         return CubicSuperPath(self)
 
+    def to_compact(self):
+        """Convert this path into an array backed :class:`CompactPath`
+
+        .. versionadded:: 1.4"""
+        from .compact import CompactPath
+
+        return CompactPath.from_path(self)
+
     def copy(self):
         """Make a copy"""
         return copy.deepcopy(self)
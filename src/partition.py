@@ -0,0 +1,95 @@
+# Partitioned DXF Render
+# Split one modelspace into entity chunks, draw each chunk in its own process & merge the recordings
+import os, re, mmap, ezdxf, glyphs
+from ezdxf.addons.drawing import Frontend, RenderContext, config
+from ezdxf.addons.drawing.recorder import Recorder
+from streaming import find_entities, iter_modelspace, write_skeleton
+from warm import warm_pool
+
+# A (0, <entity>) structure tag, VERTEX / SEQEND / ATTRIB belong to the entity before them
+ENTITY_START = re.compile(rb"\n[ \t]*0\r?\n(?!VERTEX|SEQEND|ATTRIB)[A-Z]")
+
+def split_entities(dxf_file:str, chunks:int) -> list:
+    """
+    Split the entity data of an ASCII DXF file into byte ranges of about equal size
+
+    - ranges start on an entity, so POLYLINE & INSERT sub-entities stay with their parent
+    - returns (start, end) byte offsets in file order
+    """
+    with open(dxf_file, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start, end = find_entities(data)
+
+        bounds = [start]
+        for i in range(1, chunks):
+            match = ENTITY_START.search(data, start + i * (end - start) // chunks - 1, end)
+            if match and match.start() + 1 > bounds[-1]:
+                bounds.append(match.start() + 1)
+        bounds.append(end)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def draw_chunk(
+    dxf_file:str, skeleton_file:str, start:int, end:int, cfg:config.Configuration, glyph_cache:bool=False,
+) -> tuple[list, dict]:
+    """Draw the entities of one byte range, returns the recorded records & properties"""
+    if glyph_cache:
+        glyphs.install()
+
+    doc = ezdxf.readfile(skeleton_file)
+    recorder = Recorder()
+    context = RenderContext(doc)
+    frontend = Frontend(context, recorder, cfg)
+
+    context.set_current_layout(doc.modelspace())
+    frontend.draw_entities(iter_modelspace(dxf_file, doc, start, end))
+    frontend.pipeline.finalize()
+    glyphs.save()
+
+    return recorder.records, recorder.properties
+
+def merge_chunk(backend:Recorder, records:list, properties:dict) -> None:
+    """
+    Append the recordings of a chunk to the backend
+
+    - property keys are str hashes, which differ between processes, so they are rebuilt here
+    """
+    keys = {key: hash(value[:4]) for key, value in properties.items()}
+    for key, value in properties.items():
+        backend.properties[keys[key]] = value
+    for record in records:
+        record.property_hash = keys[record.property_hash]
+        backend.records.append(record)
+
+def draw_modelspace_parallel(
+    dxf_file:str, backend:Recorder, cfg:config.Configuration, chunks:int=None, glyph_cache:bool=False,
+) -> None:
+    """
+    Draw the modelspace of an ASCII DXF file in parallel entity chunks
+
+    - each process loads the shared skeleton document & draws its byte range with the same config
+    - chunks are merged in file order, so the output matches a single process streaming render
+    - chunks defaults to the CPU count
+    - glyph_cache installs the glyph outline cache in each process, see glyphs.py
+    """
+    chunks = chunks or os.cpu_count()
+    skeleton_file = f"{os.path.splitext(dxf_file)[0]}.skeleton.dxf"
+    write_skeleton(dxf_file, skeleton_file)
+
+    try:
+        # 1. Configure the backend & background as Frontend.draw_layout does
+        doc = ezdxf.readfile(skeleton_file)
+        context = RenderContext(doc)
+        frontend = Frontend(context, backend, cfg)
+        context.set_current_layout(doc.modelspace())
+        frontend.set_background(context.current_layout_properties.background_color)
+
+        # 2. Draw the chunks & merge the recordings in file order
+        ranges = split_entities(dxf_file, chunks)
+        with warm_pool(min(chunks, len(ranges)), backends=(), glyph_cache=glyph_cache) as pool:
+            futures = [pool.submit(draw_chunk, dxf_file, skeleton_file, start, end, cfg, glyph_cache) for start, end in ranges]
+            for future in futures:
+                merge_chunk(backend, *future.result())
+
+        frontend.pipeline.finalize()
+    finally:
+        os.remove(skeleton_file)
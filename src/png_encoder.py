@@ -0,0 +1,209 @@
+# PNG Encoder
+# In-process PNG writer with bilevel, grayscale & palette modes, row filter & zlib strategy choice
+import os, struct, zlib
+import numpy as np
+from image_options import PngOptions
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG color types
+GRAY, RGB, PALETTE, RGBA = 0, 2, 3, 6
+
+# PNG row filter types, "adaptive" picks the smallest per row as libpng does
+FILTERS = {"none": 0, "sub": 1, "up": 2, "average": 3, "paeth": 4}
+
+# zlib strategies by name
+STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+    "rle": zlib.Z_RLE,
+}
+
+# Trials of an optimisation pass, as optipng's filter & strategy search
+TRIALS = [(f, s) for f in ("none", "up", "paeth", "adaptive") for s in ("default", "filtered", "rle")]
+
+# Compressed bytes per IDAT chunk
+IDAT_SIZE = 2**20
+
+# Rows filtered at once, bounds the filter working memory
+BLOCK_ROWS = 256
+
+def chunk(tag:bytes, data:bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+def pack_bits(rows:np.ndarray, bit_depth:int) -> np.ndarray:
+    """Pack sample rows of 1, 2 or 4 bit values into bytes, first sample in the high bits"""
+    if bit_depth == 8:
+        return rows
+    per_byte = 8 // bit_depth
+    height, width = rows.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = rows
+    padded = padded.reshape(height, -1, per_byte)
+    shifts = np.arange(8 - bit_depth, -1, -bit_depth, dtype=np.uint8)
+    return np.bitwise_or.reduce(padded << shifts, axis=2).astype(np.uint8)
+
+def filter_rows(rows:np.ndarray, prior:np.ndarray, bpp:int, method:str) -> np.ndarray:
+    """
+    Apply a PNG row filter to packed rows, returns rows prefixed with their filter type byte
+
+    - prior is the last raw row above the block, zeros for the first block
+    - every filter reads raw neighbours only, so the whole block is filtered at once
+    """
+    x = rows.astype(np.int16)
+    b = np.vstack([prior[None, :], rows[:-1]]).astype(np.int16)
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]
+    c = np.zeros_like(x)
+    c[:, bpp:] = b[:, :-bpp]
+
+    def paeth():
+        p = a + b - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+        return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+    predictors = {
+        "none": lambda: 0,
+        "sub": lambda: a,
+        "up": lambda: b,
+        "average": lambda: (a + b) >> 1,
+        "paeth": paeth,
+    }
+
+    if method != "adaptive":
+        filtered = ((x - predictors[method]()) & 0xFF).astype(np.uint8)
+        types = np.full((len(rows), 1), FILTERS[method], dtype=np.uint8)
+        return np.hstack([types, filtered])
+
+    # minimum sum of absolute differences per row, bytes read as signed
+    candidates = np.stack([((x - predictors[name]()) & 0xFF).astype(np.uint8) for name in FILTERS])
+    scores = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    best = scores.argmin(axis=0)
+    filtered = candidates[best, np.arange(len(rows))]
+    return np.hstack([best.astype(np.uint8)[:, None], filtered])
+
+class PngWriter:
+    """
+    Streams a PNG file one block of rows at a time
+
+    - rows are sample arrays of shape (n, width) or (n, width, channels), packed to the bit depth here
+    - compressed data is written out as IDAT chunks as it becomes available
+    """
+    def __init__(
+        self, fp, width:int, height:int, color_type:int, bit_depth:int=8, palette:np.ndarray=None,
+        level:int=6, filter:str="adaptive", strategy:str="default",
+    ):
+        self.fp = fp
+        self.width = width
+        self.height = height
+        self.bit_depth = bit_depth
+        self.filter = filter
+        self.channels = {GRAY: 1, RGB: 3, PALETTE: 1, RGBA: 4}[color_type]
+        self.bpp = max(1, self.channels * bit_depth // 8)
+        self.prior = None
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, STRATEGIES[strategy])
+        self.pending = b""
+
+        fp.write(PNG_SIGNATURE)
+        fp.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)))
+        if palette is not None:
+            fp.write(chunk(b"PLTE", np.asarray(palette, dtype=np.uint8).tobytes()))
+
+    def write_rows(self, rows:np.ndarray) -> None:
+        rows = pack_bits(rows.reshape(len(rows), -1), self.bit_depth)
+        if self.prior is None:
+            self.prior = np.zeros(rows.shape[1], dtype=np.uint8)
+
+        data = filter_rows(rows, self.prior, self.bpp, self.filter)
+        self.prior = rows[-1]
+        self.rows_written += len(rows)
+        self.write_idat(self.compressor.compress(data.tobytes()))
+
+    def write_idat(self, data:bytes, final:bool=False) -> None:
+        self.pending += data
+        while len(self.pending) >= IDAT_SIZE or (final and self.pending):
+            self.fp.write(chunk(b"IDAT", self.pending[:IDAT_SIZE]))
+            self.pending = self.pending[IDAT_SIZE:]
+
+    def close(self) -> None:
+        if self.rows_written != self.height:
+            raise ValueError(f"{self.rows_written} of {self.height} PNG rows written")
+        self.write_idat(self.compressor.flush(), final=True)
+        self.fp.write(chunk(b"IEND", b""))
+
+def reduce_image(pixels:np.ndarray, mode:str) -> tuple[np.ndarray, int, int, np.ndarray | None]:
+    """
+    Convert RGB pixels to the samples of a PNG mode
+
+    - returns (samples, color type, bit depth, palette or None)
+    - auto is lossless : bilevel for black & white, a 1 - 4 bit palette up to 16 colors, gray for gray levels,
+      an 8 bit palette up to 256 colors, else RGB
+    - bilevel thresholds the gray level at 128
+    """
+    gray = (pixels @ np.array([299, 587, 114]) // 1000).astype(np.uint8)
+    is_gray = mode == "auto" and (pixels == pixels[..., :1]).all()
+
+    if mode == "bilevel" or (is_gray and np.isin(gray, (0, 255)).all()):
+        return (gray >= 128).astype(np.uint8), GRAY, 1, None
+    if mode == "gray":
+        return gray, GRAY, 8, None
+    if mode == "rgba":
+        alpha = np.full(pixels.shape[:2] + (1,), 255, dtype=np.uint8)
+        return np.concatenate([pixels, alpha], axis=2), RGBA, 8, None
+
+    packed = pixels.astype(np.uint32) @ np.array([1 << 16, 1 << 8, 1], dtype=np.uint32)
+    colors, indices = np.unique(packed, return_inverse=True)
+    if mode == "palette" and len(colors) > 256:
+        raise ValueError(f"{len(colors)} colors do not fit a palette")
+    if mode == "auto" and (len(colors) > 256 or (is_gray and len(colors) > 16)):
+        return (gray, GRAY, 8, None) if is_gray else (pixels, RGB, 8, None)
+
+    palette = np.stack([colors >> 16, colors >> 8, colors], axis=1) & 0xFF
+    bit_depth = next(depth for depth in (1, 2, 4, 8) if len(colors) <= 1 << depth)
+    return indices.reshape(pixels.shape[:2]).astype(np.uint8), PALETTE, bit_depth, palette
+
+def encode_png(pixels:np.ndarray, options:PngOptions=PngOptions(), filter:str=None, strategy:str=None) -> bytes:
+    """Encode RGB pixels as PNG bytes, see PngOptions"""
+    import io
+    samples, color_type, bit_depth, palette = reduce_image(pixels, options.mode)
+    height, width = pixels.shape[:2]
+
+    buffer = io.BytesIO()
+    writer = PngWriter(
+        buffer, width, height, color_type, bit_depth, palette,
+        level=options.level, filter=filter or options.filter, strategy=strategy or options.strategy,
+    )
+    for start in range(0, height, BLOCK_ROWS):
+        writer.write_rows(samples[start:start + BLOCK_ROWS])
+    writer.close()
+    return buffer.getvalue()
+
+def load_rgb(png_file:str) -> np.ndarray:
+    """Read a PNG as RGB pixels, transparent areas composited onto white"""
+    from PIL import Image
+    with Image.open(png_file) as image:
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, "white")
+        return np.asarray(Image.alpha_composite(background, image).convert("RGB"))
+
+def recode_png(png_file:str, options:PngOptions=PngOptions()) -> int:
+    """
+    Re-encode a PNG file in place, e.g. the RGBA output of Inkscape
+
+    - optimize encodes every trial of TRIALS at level 9 & keeps the smallest
+    - returns the new file size
+    """
+    pixels = load_rgb(png_file)
+    if options.optimize:
+        options = options._replace(level=9)
+        data = min((encode_png(pixels, options, f, s) for f, s in TRIALS), key=len)
+    else:
+        data = encode_png(pixels, options)
+
+    temp_path = f"{png_file}.tmp"
+    with open(temp_path, "wb") as fp:
+        fp.write(data)
+    os.replace(temp_path, png_file)
+    return len(data)
@@ -1,24 +1,90 @@
 # DWG Processing Tools
 # Convert DWG files into PNG using ODA File Converter & Inkscape binaries 
-import os, subprocess, xml.etree.ElementTree as etree, ezdxf 
-from ezdxf.addons.drawing import Frontend, RenderContext, svg, layout, config
+# ezdxf & its drawing stack are imported where a conversion needs them, so the CLI starts fast
+import os, sys, subprocess, xml.etree.ElementTree as etree
+from typing import NamedTuple
+
+# Sibling modules resolve when run as `python -m src.process_dwg`
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from converters import DxfConverter, OdaConverter, detect_format
+from report import RunReport
+from deadlines import Deadlines, NO_DEADLINES, StageTimeout, call_with_deadline, run_with_deadline
+from image_options import PngOptions, RasterOptions
 
 # Binary paths
-ODA_EXE_PATH = r"src/modules/ODAFileConverter-v25.12.0/ODAFileConverter.exe"
 INKSCAPE_EXE_PATH = "src/modules/Inkscape/bin/inkscape.exe"
 
-def main(target_dir:str):
+class Tier(NamedTuple):
+    """A conversion attempt : DWG to DXF converter & ezdxf load mode"""
+    name: str
+    converter: DxfConverter | None
+    recover: bool
+
+class RenderOptions(NamedTuple):
+    """
+    DXF to SVG render settings
+    
+    - streaming draws ASCII DXF modelspace entities as they are read, see streaming.py
+    - parallel draws ASCII DXF modelspace entities in that many processes, see partition.py
+    - glyph_cache reuses text glyph outlines across labels, files & runs, see glyphs.py
+    - instancing draws each block once & places its INSERTs as SVG <use> references, see instancing.py
+    - compact quantises coordinates to the PNG resolution & merges same style strokes, see compact.py
+    - svgz writes the SVG gzip compressed
+    - engine renders the SVG with ezdxf, dxf_input or the fastest engine supporting each file as auto, see engines.py
+    """
+    streaming: bool = False
+    parallel: int = 0
+    glyph_cache: bool = True
+    instancing: bool = False
+    compact: bool = False
+    svgz: bool = False
+    engine: str = "ezdxf"
+
+def main(
+    target_dir:str, thumbnail:bool=False, size:int=256, workers:int=None, converter:DxfConverter=None, 
+    tiers:list=None, report_path:str=None, options:RenderOptions=RenderOptions(), deadlines:Deadlines=Deadlines(),
+    encoding:PngOptions=None, raster:RasterOptions=None, scratch:bool=True, scratch_root:str=None,
+):
+    if thumbnail:
+        return thumbnail_batch(target_dir, size, workers, converter)
+
     from time import time
     lap_time = time()
+    report = RunReport()
 
-    for file in list_files(target_dir, "dwg"):
+    for file in list_inputs(target_dir):
       print(f"Processing : {file}")
-      extract_png(file)
+      extract_png(file, converter, tiers, report, options, deadlines, encoding, raster, scratch, scratch_root)
       
       mid_lap = time()
-      print(f"Conversion of DWG to PNG complete in {round(mid_lap - lap_time, 0)}s")
+      print(f"Conversion of {os.path.splitext(file)[1][1:].upper()} to PNG complete in {round(mid_lap - lap_time, 0)}s")
       lap_time = time()
 
+    print(report.summary())
+    if tiers:
+        print(f"Estimated time saved by the {tiers[0].name} tier : {round(report.time_saved(tiers[0].name, tiers[-1].name), 1)}s")
+    if report_path:
+        report.save(report_path)
+
+def thumbnail_batch(target_dir:str, size:int=256, workers:int=None, converter:DxfConverter=None) -> int:
+    """
+    Extract thumbnails for all DWG & DXF files in a directory tree
+    
+    - returns the number of thumbnails created
+    """
+    from time import time
+    from functools import partial
+    from warm import warm_pool
+    start_time = time()
+
+    files = list_inputs(target_dir)
+    with warm_pool(workers, backends=("pymupdf",)) as pool:
+        results = list(pool.map(partial(extract_thumbnail, size=size, converter=converter), files, chunksize=64))
+
+    print(f"{sum(results)} of {len(files)} thumbnails created in {round(time() - start_time, 1)}s")
+    return sum(results)
+
 def list_files(dir:str, filetype:str=None) -> list:
     output = []
     for path in os.listdir(dir):
@@ -36,121 +102,456 @@ def list_files(dir:str, filetype:str=None) -> list:
      
     return output
 
-def extract_png(input_file:str) -> bool:
+def list_inputs(dir:str) -> list:
     """
-    Convert a DWG file to PNG format and store in the same directory 
+    List the DWG & DXF files in a directory tree
     
-    - prints step error & returns False if failure occurs
-    - else returns True
+    - a DXF beside a DWG of the same name is an ODA intermediate, so it is skipped
     """
-    # Convert DWG to DXF
+    dwg_files = list_files(dir, ".dwg")
+    dwg_stems = {os.path.splitext(i)[0] for i in dwg_files}
+    dxf_files = [i for i in list_files(dir, ".dxf") if os.path.splitext(i)[0] not in dwg_stems]
 
-    # 1. Split source dir & file name for binary config
-    input_file = input_file.replace("\\", "/").split("/")
-    working_dir = "/".join(input_file[:-1])
-    input_file = input_file[-1]
+    return sorted([*dwg_files, *dxf_files])
+
+def to_dxf(input_file:str, converter:DxfConverter=None) -> str | None:
+    """
+    Route an input file to a DXF path ezdxf can load
     
-    # 2. Set output formats
-    output_version = "ACAD2018"
-    output_format = "dxf"
+    - ASCII & binary DXF files are returned as is, ezdxf.readfile detects binary DXF
+    - DWG files are converted, by default with the ODA File Converter
+    - prints error & returns None if failure occurs
+    """
+    try:
+        file_format = detect_format(input_file)
+    except OSError as e:
+        print(f"Input file error : {e}")
+        return None
 
-    # 3. Binary will not run with an ODA exe path containing "/" characters
-    oda_exe_path = ODA_EXE_PATH.replace("/", "\\")
+    if file_format in ("dxf", "binary_dxf"):
+        return input_file
 
-    # 4. Binary subprocess requires int's as str
-    recursive = True 
-    audit = True
+    if file_format != "dwg":
+        print(f"Input format error : {input_file} is not a DWG or DXF file")
+        return None
 
-    recursive = "1" if recursive else "0"
-    audit = "1" if audit else "0"
+    return (converter or OdaConverter()).convert(input_file)
 
-    # 5. Run conversion process
+def extract_thumbnail(input_file:str, size:int=256, converter:DxfConverter=None, scratch_root:str=None) -> bool:
+    """
+    Save a PNG thumbnail of a DWG or DXF file as <name>_thumb.png in the same directory
+    
+    - uses the embedded preview image, so ODA & rendering are skipped
+    - falls back to a coarse render only when no preview exists
+    - a DWG without preview is converted in its own directory under scratch_root, see scratch.py
+    - prints step error & returns False if failure occurs
+    - else returns True
+    """
+    from contextlib import nullcontext
+    from thumbnail import read_dwg_preview, read_dxf_preview, save_thumbnail, render_thumbnail
+
+    output_path = f"{os.path.splitext(input_file)[0]}_thumb.png"
     try:
-      subprocess.run(
-        args=[oda_exe_path, working_dir, working_dir, output_version, output_format, recursive, audit, input_file], 
-        shell=True
-      )
-    except Exception as e:
-        print(f"DWG to DXF error : {e}") 
+        is_dwg = detect_format(input_file) == "dwg"
+    except OSError as e:
+        print(f"Input file error : {e}")
         return False
 
-    # Convert dxf to svg
-
+    # 1. Use the embedded preview image
     try:
-        # 1. create the render context
-        doc = ezdxf.readfile(f"{working_dir}/{input_file.replace(".dwg", ".dxf")}")    
+        preview = read_dwg_preview(input_file) if is_dwg else read_dxf_preview(input_file)
+        if preview:
+            save_thumbnail(preview, output_path, size)
+            return True
+    except Exception as e:
+        print(f"Thumbnail preview error : {e}")
+
+    # 2. Fall back to a low detail render, the DXF of a DWG is removed with its job directory
+    from scratch import job_dir, stage_input
+    with job_dir(scratch_root) if is_dwg else nullcontext() as work_dir:
+        dxf_file = input_file
+        if is_dwg:
+            try:
+                work_file = stage_input(input_file, work_dir)
+            except OSError as e:
+                print(f"Scratch directory error : {e}")
+                return False
+
+            dxf_file = to_dxf(work_file, converter)
+            if dxf_file is None:
+                return False
+
+        try:
+            render_thumbnail(dxf_file, output_path, size)
+        except Exception as e:
+            print(f"Thumbnail render error : {e}")
+            return False
+
+    return True
+
+def draw_modelspace(
+    dxf_file:str, backend, recover:bool=False, options:RenderOptions=RenderOptions(), frontend_class:type=None,
+) -> None:
+    """
+    Draw the modelspace of a DXF file into a backend, partitioned, streamed from disk or from a fully loaded document
+
+    - partitioned renders need a Recorder based backend, e.g. the SVG & PyMuPDF backends
+    - raises on load or render failure
+    """
+    import ezdxf
+    from ezdxf.addons.drawing import Frontend, RenderContext, config
+
+    frontend_class = frontend_class or Frontend
+    cfg = config.Configuration(
+        color_policy=config.ColorPolicy.MONOCHROME,
+        text_policy=config.TextPolicy.FILLING,
+        hatching_timeout=120,
+    )
+
+    import glyphs
+    if options.glyph_cache:
+        glyphs.install()
+    else:
+        glyphs.uninstall()
+
+    is_ascii = not recover and detect_format(dxf_file) == "dxf"
+    if options.parallel > 1 and is_ascii:
+        from partition import draw_modelspace_parallel
+        draw_modelspace_parallel(dxf_file, backend, cfg, options.parallel, options.glyph_cache)
+    elif options.streaming and is_ascii:
+        from streaming import draw_modelspace_streaming
+        draw_modelspace_streaming(dxf_file, backend, cfg, frontend_class)
+    else:
+        if recover:
+            from ezdxf import recover as ezdxf_recover
+            doc, _ = ezdxf_recover.readfile(dxf_file)
+        else:
+            doc = ezdxf.readfile(dxf_file)    
         msp = doc.modelspace()
         context = RenderContext(doc)
-        
-        # 2. create the backend & frontend contexts
-        backend = svg.SVGBackend()
-        cfg = config.Configuration(
-            color_policy=config.ColorPolicy.MONOCHROME,
-            text_policy=config.TextPolicy.FILLING,
-            hatching_timeout=120,
-        )
-        frontend = Frontend(context, backend, cfg)
+        frontend = frontend_class(context, backend, cfg)
         frontend.draw_layout(msp)
-        
-        # 3. create page layout - width / height = 0 is auto
-        page = layout.Page(
-            width=0, 
-            height=0, 
-            units=layout.Units.mm, 
-            margins=layout.Margins.all(10),
-            max_width=1800,
-        )
-        # 4. get the SVG string
-        svg_string = backend.get_string(
-            page=page, 
-            settings=layout.Settings(
-                scale=4, 
-                fit_page=True, 
-                page_alignment=layout.PageAlignment.MIDDLE_CENTER, 
-                crop_at_margins=True,
-            ),
-        )
-    except Exception as e:
-        print(f"DXF to SVG error : {e}") 
-        return False
-     
-    # 5. Write the file to an svg directory located beside the source path
-    output_path = f"{working_dir}/{input_file.replace(".dwg", ".svg")}"
+
+def page_layout() -> tuple:
+    """Page & layout settings of the exported drawing, width / height = 0 is auto"""
+    from ezdxf.addons.drawing import layout
+    page = layout.Page(
+        width=0, 
+        height=0, 
+        units=layout.Units.mm, 
+        margins=layout.Margins.all(10),
+        max_width=1800,
+    )
+    settings = layout.Settings(
+        scale=4, 
+        fit_page=True, 
+        page_alignment=layout.PageAlignment.MIDDLE_CENTER, 
+        crop_at_margins=True,
+    )
+    return page, settings
+
+def render_svg(dxf_file:str, recover:bool=False, options:RenderOptions=RenderOptions()) -> str:
+    """
+    Render the modelspace of a DXF file to an SVG string
     
-    with open(output_path, "wt", encoding="utf8") as fp:
-        fp.write(svg_string)
+    - recover loads the file with ezdxf's recover mode, for damaged files
+    - instancing is not applied to partitioned renders, their INSERTs are expanded
+    - raises on load or render failure
+    """
+    from ezdxf.addons.drawing import Frontend, svg
 
-    # Convert SVG file to PNG with Inkscape
+    # 1. create the backend
+    if options.instancing:
+        from instancing import InstancingSVGBackend, InstancingFrontend
+        frontend_class = InstancingFrontend
+    else:
+        frontend_class = Frontend
+
+    if options.compact:
+        from compact import CompactSVGBackend, CompactInstancingSVGBackend, coordinate_space
+        backend = CompactInstancingSVGBackend() if options.instancing else CompactSVGBackend()
+    else:
+        backend = InstancingSVGBackend() if options.instancing else svg.SVGBackend()
+
+    # 2. draw the modelspace
+    draw_modelspace(dxf_file, backend, recover, options, frontend_class)
     
-    # 1. Check file can be processed
+    # 3. get the SVG string, default output coordinate space is 1,000,000
+    page, settings = page_layout()
+    if options.compact:
+        settings.output_coordinate_space = coordinate_space(page.max_width)
+
+    return backend.get_string(page=page, settings=settings)
+
+def write_svg(dxf_file:str, output_path:str, recover:bool=False, options:RenderOptions=RenderOptions()) -> None:
+    """
+    Render a DXF file with the options' engine & write the SVG to the output path, see engines.py
+
+    - re-renders with the ezdxf engine if another engine fails, so auto is as reliable as the default
+    """
+    from engines import ENGINES, get_engine
+    engine = get_engine(options.engine, dxf_file, recover)
+    if engine is ENGINES["ezdxf"]:
+        return engine.write(dxf_file, output_path, recover, options)
+
+    try:
+        engine.write(dxf_file, output_path, recover, options)
+    except Exception as e:
+        print(f"{engine.name} engine failed, rendering with ezdxf : {e}")
+        ENGINES["ezdxf"].write(dxf_file, output_path, recover, options)
+
+def write_raster(
+    dxf_file:str, output_path:str, recover:bool=False, options:RenderOptions=RenderOptions(), 
+    raster:RasterOptions=RasterOptions(), encoding:PngOptions=None,
+) -> None:
+    """
+    Render a DXF file straight to a PNG file in strips, see raster.py
+
+    - the drawing is recorded as a PDF page, so no full size pixel buffer is held
+    - instancing, compact, svgz & engine apply to SVG output only
+    """
+    from ezdxf.addons.drawing.pymupdf import PyMuPdfBackend
+    from raster import write_png_strips
+
+    backend = PyMuPdfBackend()
+    draw_modelspace(dxf_file, backend, recover, options)
+    page, settings = page_layout()
+    write_png_strips(backend.get_pdf_bytes(page, settings=settings), output_path, raster, encoding)
+
+    import glyphs
+    glyphs.save()
+
+def render_dxf(
+    input_file:str, converter:DxfConverter, write, extension:str, args:tuple=(), deadlines:Deadlines=Deadlines(),
+) -> str | None:
+    """
+    Convert a DWG or DXF file & write its render beside the DXF with a writer, e.g. write_svg
+
+    - the writer is called as write(dxf_file, output_path, *args) under the render deadline
+    - the DXF intermediate is removed once rendered
+    - raises StageTimeout if a stage passes its deadline
+    - prints step error & returns None if failure occurs
+    - else returns the output path
+    """
+    # Convert DWG to DXF
+    dxf_file = to_dxf(input_file, converter)
+    if dxf_file is None:
+        return None
+
+    # Render the dxf, written beside the source path
+    output_path = f"{os.path.splitext(dxf_file)[0]}.{extension}"
+
     try:
-        etree.parse(output_path)
+        timeout = deadlines.render.seconds(dxf_file) if deadlines.render else None
+        call_with_deadline(write, (dxf_file, output_path, *args), "render", timeout)
+    except StageTimeout:
+        raise
+    except Exception as e:
+        print(f"DXF to {extension.upper()} error : {e}") 
+        return None
+    finally:
+        # remove dxf file, unless it was the input
+        if dxf_file != input_file and os.path.exists(dxf_file):
+            os.remove(dxf_file)
+
+    return output_path
+
+def extract_svg(
+    input_file:str, converter:DxfConverter=None, recover:bool=False, options:RenderOptions=RenderOptions(), 
+    deadlines:Deadlines=Deadlines(),
+) -> str | None:
+    """
+    Convert a DWG or DXF file to an SVG file stored beside the DXF
+    
+    - the DXF intermediate is removed once rendered
+    - raises StageTimeout if a stage passes its deadline
+    - prints step error & returns None if failure occurs
+    - else returns the SVG path
+    """
+    extension = "svgz" if options.svgz else "svg"
+    output_path = render_dxf(input_file, converter, write_svg, extension, (recover, options), deadlines)
+    if output_path is None:
+        return None
+
+    # Check file can be processed
+    try:
+        if options.svgz:
+            import gzip
+            with gzip.open(output_path) as fp:
+                etree.parse(fp)
+        else:
+            etree.parse(output_path)
     except Exception as e:
         print(f"SVG parsing error : {e}")
-        return False
+        os.remove(output_path)
+        return None
+
+    return output_path
+
+def extract_raster(
+    input_file:str, converter:DxfConverter=None, recover:bool=False, options:RenderOptions=RenderOptions(), 
+    deadlines:Deadlines=Deadlines(), raster:RasterOptions=RasterOptions(), encoding:PngOptions=None,
+) -> str | None:
+    """
+    Convert a DWG or DXF file to a PNG file stored beside the DXF, without the SVG & Inkscape stages
+
+    - peak memory is bounded by the strip height, see RasterOptions
+    - prints step error & returns None if failure occurs
+    - else returns the PNG path
+    """
+    return render_dxf(input_file, converter, write_raster, "png", (recover, options, raster, encoding), deadlines)
+
+def make_tiers(binary:bool=False, deadlines:Deadlines=Deadlines()) -> list:
+    """
+    Fast unaudited tier first, audited & recovered tier only on a load or render failure
+    """
+    return [
+        Tier("fast", OdaConverter(audit=False, binary=binary, deadline=deadlines.convert), recover=False),
+        Tier("audited", OdaConverter(audit=True, binary=binary, deadline=deadlines.convert), recover=True),
+    ]
+
+def extract_png(
+    input_file:str, converter:DxfConverter=None, tiers:list=None, report:RunReport=None, 
+    options:RenderOptions=RenderOptions(), deadlines:Deadlines=Deadlines(), encoding:PngOptions=None,
+    raster:RasterOptions=None, scratch:bool=True, scratch_root:str=None,
+) -> bool:
+    """
+    Convert a DWG or DXF file to PNG format and store in the same directory 
     
-    # 2. Run Inkscape conversion call
+    - DXF inputs skip the DWG to DXF stage
+    - converter replaces the ODA File Converter for the DWG to DXF stage
+    - tiers are tried in order until one loads & renders, see make_tiers
+    - tier outcomes & durations are recorded in the report
+    - options control the DXF to SVG render, see RenderOptions
+    - a stage passing its deadline is killed & the file marked as timed out, later tiers are skipped
+    - encoding re-encodes the Inkscape PNG in process, e.g. as bilevel or palette, see png_encoder.py
+    - raster renders the PNG in process strip by strip instead of through SVG & Inkscape, see raster.py
+    - scratch runs the job in its own directory under scratch_root, /dev/shm by default, see scratch.py
+      only the PNG is copied beside the input, the DXF & SVG intermediates never touch the source directory
+    - prints step error & returns False if failure occurs
+    - else returns True
+    """
+    from time import perf_counter
+
+    if scratch:
+        from scratch import job_dir, stage_input, publish
+        with job_dir(scratch_root) as work_dir:
+            try:
+                work_file = stage_input(input_file, work_dir)
+            except OSError as e:
+                print(f"Scratch directory error : {e}")
+                return False
+
+            if not extract_png(work_file, converter, tiers, report, options, deadlines, encoding, raster, scratch=False):
+                return False
+
+            try:
+                publish(f"{os.path.splitext(work_file)[0]}.png", f"{os.path.splitext(input_file)[0]}.png")
+            except OSError as e:
+                print(f"PNG copy error : {e}")
+                return False
+        return True
+
+    # Convert DWG / DXF to SVG, or straight to PNG, falling back through the tiers
+    for tier in tiers or [Tier("default", converter, recover=False)]:
+        start_time = perf_counter()
+        try:
+            if raster is not None:
+                output_path = extract_raster(input_file, tier.converter, tier.recover, options, deadlines, raster, encoding)
+            else:
+                output_path = extract_svg(input_file, tier.converter, tier.recover, options, deadlines)
+        except StageTimeout as e:
+            print(f"Timed out : {e}")
+            if report is not None:
+                report.record(e.stage, "timeout", e.seconds)
+                report.record(tier.name, "timeout", perf_counter() - start_time)
+            return False
+
+        if report is not None:
+            report.record(tier.name, "ok" if output_path else "failed", perf_counter() - start_time)
+        if output_path:
+            break
+    else:
+        return False
+
+    if raster is not None:
+        return True
+
+    # Convert SVG file to PNG with Inkscape
     try:
-        subprocess.check_call([INKSCAPE_EXE_PATH, '--export-type=png', output_path])
+        args = [INKSCAPE_EXE_PATH, '--export-type=png', output_path]
+        timeout = deadlines.export.seconds(output_path) if deadlines.export else None
+        if run_with_deadline(args, "export", timeout) != 0:
+            raise subprocess.CalledProcessError(1, args)
+    except StageTimeout as e:
+        print(f"Timed out : {e}")
+        if report is not None:
+            report.record(e.stage, "timeout", e.seconds)
+        os.remove(output_path)
+        return False
     except Exception as e:
         print(f"Inkscape binary error : {e}")
         return False
 
-    # Clean up temp files
-
-    # 1. remove dxf file
-    os.remove(output_path.replace(".svg", ".dxf"))
-    
-    # 2. remove svg file from img dir
+    # Clean up temp svg file
     os.remove(output_path)
 
+    # Re-encode the RGBA PNG written by Inkscape
+    if encoding is not None:
+        from png_encoder import recode_png
+        start_time = perf_counter()
+        try:
+            recode_png(f"{os.path.splitext(output_path)[0]}.png", encoding)
+        except Exception as e:
+            print(f"PNG encoding error : {e}")
+            return False
+        if report is not None:
+            report.record("encode", "ok", perf_counter() - start_time)
+
     return True
 
 if __name__ == "__main__":
     # CLI Entry Point 
-    import sys
-    args = sys.argv
-    if len(args) == 2:
-        main(args[1])
-    else:
-        print("Please provide the source path as the only CLI argument...")
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert DWG & DXF files to PNG images")
+    parser.add_argument("source", help="source directory")
+    parser.add_argument("--thumbnail", action="store_true", help="extract preview thumbnails only")
+    parser.add_argument("--size", type=int, default=256, help="thumbnail size in px")
+    parser.add_argument("--binary-dxf", action="store_true", help="use binary DXF as the ODA output")
+    parser.add_argument("--tiered", action="store_true", help="try a fast unaudited conversion before the audited one")
+    parser.add_argument("--streaming", action="store_true", help="stream modelspace entities from disk while drawing")
+    parser.add_argument("--parallel", type=int, default=0, help="processes drawing one file in entity chunks")
+    parser.add_argument("--no-deadlines", action="store_true", help="let stages run without a time limit")
+    parser.add_argument("--no-glyph-cache", action="store_true", help="outline every text glyph from its font")
+    parser.add_argument("--instancing", action="store_true", help="draw each block once & reference it per INSERT")
+    parser.add_argument("--compact", action="store_true", help="quantise SVG coordinates & merge same style strokes")
+    parser.add_argument("--svgz", action="store_true", help="write the SVG intermediate gzip compressed")
+    parser.add_argument("--engine", choices=["ezdxf", "dxf_input", "auto"], default="ezdxf", help="DXF to SVG renderer")
+    parser.add_argument("--png-mode", choices=["auto", "bilevel", "gray", "palette", "rgba"], default=None, help="re-encode the PNG in process")
+    parser.add_argument("--png-level", type=int, default=6, help="zlib level of the re-encoded PNG")
+    parser.add_argument("--png-filter", choices=["none", "sub", "up", "average", "paeth", "adaptive"], default="adaptive")
+    parser.add_argument("--png-strategy", choices=["default", "filtered", "huffman", "rle"], default="default")
+    parser.add_argument("--png-optimize", action="store_true", help="keep the smallest of the filter & strategy trials")
+    parser.add_argument("--raster-dpi", type=float, default=None, help="render the PNG in process at this dpi, skipping Inkscape")
+    parser.add_argument("--strip-height", type=int, default=512, help="pixel rows rendered at once by --raster-dpi")
+    parser.add_argument("--scratch-dir", default=None, help="job scratch root, defaults to $DWG_SCRATCH_DIR or /dev/shm")
+    parser.add_argument("--no-scratch", action="store_true", help="write the DXF & SVG intermediates beside the source file")
+    parser.add_argument("--report", default=None, help="JSON run report path")
+    parser.add_argument("--workers", type=int, default=None, help="thumbnail batch processes")
+    args = parser.parse_args()
+    deadlines = NO_DEADLINES if args.no_deadlines else Deadlines()
+    converter = OdaConverter(binary=args.binary_dxf, deadline=deadlines.convert)
+    tiers = make_tiers(binary=args.binary_dxf, deadlines=deadlines) if args.tiered else None
+    options = RenderOptions(
+        streaming=args.streaming, parallel=args.parallel, glyph_cache=not args.no_glyph_cache, instancing=args.instancing,
+        compact=args.compact, svgz=args.svgz, engine=args.engine,
+    )
+    encoding = PngOptions(
+        mode=args.png_mode, level=args.png_level, filter=args.png_filter, strategy=args.png_strategy, optimize=args.png_optimize,
+    ) if args.png_mode else None
+    raster = RasterOptions(dpi=args.raster_dpi, strip_height=args.strip_height) if args.raster_dpi else None
+    main(
+        args.source, thumbnail=args.thumbnail, size=args.size, workers=args.workers, 
+        converter=converter, tiers=tiers, report_path=args.report, options=options, deadlines=deadlines, encoding=encoding,
+        raster=raster, scratch=not args.no_scratch, scratch_root=args.scratch_dir,
+    )
\ No newline at end of file
@@ -0,0 +1,66 @@
+# Strip Raster Output
+# Rasterise a PDF page in horizontal strips with PyMuPDF & stream each strip into the PNG file
+import numpy as np
+from image_options import PngOptions, RasterOptions
+from png_encoder import GRAY, RGBA, PngWriter
+
+def strip_format(mode:str) -> tuple[int, int]:
+    """
+    PNG color type & bit depth of a strip encoding mode
+
+    - rgba keeps the page transparency, areas without a fill stay transparent
+    - auto & palette need the whole image, so strips are written as gray, right for monochrome renders
+    """
+    if mode == "rgba":
+        return RGBA, 8
+    if mode == "bilevel":
+        return GRAY, 1
+    return GRAY, 8
+
+def write_png_strips(pdf_bytes:bytes, output_file:str, options:RasterOptions=RasterOptions(), encoding:PngOptions=None) -> tuple[int, int]:
+    """
+    Rasterise the first page of a PDF to a PNG file one strip at a time
+
+    - the page is interpreted once into a display list, each strip renders only its clip
+    - compressed strips are written as IDAT chunks as they finish, see PngWriter
+    - returns the image (width, height) in pixels
+    """
+    import pymupdf
+    encoding = encoding or PngOptions(mode="gray")
+    color_type, bit_depth = strip_format(encoding.mode)
+    colorspace = pymupdf.csRGB if color_type == RGBA else pymupdf.csGRAY
+    alpha = color_type == RGBA
+
+    doc = pymupdf.open("pdf", pdf_bytes)
+    page = doc[0]
+    display_list = page.get_displaylist()
+    scale = options.dpi / 72
+    matrix = pymupdf.Matrix(scale, scale)
+    width, height = round(page.rect.width * scale), round(page.rect.height * scale)
+
+    with open(output_file, "wb") as fp:
+        writer = PngWriter(
+            fp, width, height, color_type, bit_depth,
+            level=encoding.level, filter=encoding.filter, strategy=encoding.strategy,
+        )
+        for top in range(0, height, options.strip_height):
+            rows = min(options.strip_height, height - top)
+            clip = pymupdf.Rect(0, top / scale, page.rect.width, (top + rows) / scale)
+            pixmap = display_list.get_pixmap(matrix=matrix, colorspace=colorspace, alpha=alpha, clip=clip)
+
+            # clip edges are rounded outwards to whole pixels, so trim or pad to the strip size
+            samples = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.stride)
+            samples = samples[:, :pixmap.width * pixmap.n].reshape(pixmap.height, pixmap.width, pixmap.n)
+            strip = np.full((rows, width, pixmap.n), 255, dtype=np.uint8)
+            if alpha:
+                strip[..., -1] = 0
+            strip[:min(rows, pixmap.height), :min(width, pixmap.width)] = samples[:rows, :width]
+            pixmap = None
+
+            if bit_depth == 1:
+                strip = (strip >= 128).astype(np.uint8)
+            writer.write_rows(strip)
+        writer.close()
+
+    doc.close()
+    return width, height
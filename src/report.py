@@ -0,0 +1,58 @@
+# Run Report
+# Counts & durations recorded per stage during a batch run
+import json
+from collections import defaultdict
+
+class RunReport:
+    """
+    Collects (stage, outcome) events with their durations
+
+    - e.g. ("fast", "ok", 12.1) for a file converted by the fast tier
+    """
+    def __init__(self):
+        self.durations = defaultdict(list)
+
+    def record(self, stage:str, outcome:str, seconds:float) -> None:
+        self.durations[(stage, outcome)].append(seconds)
+
+    def count(self, stage:str, outcome:str=None) -> int:
+        return sum(len(v) for (s, o), v in self.durations.items() if s == stage and outcome in (None, o))
+
+    def total(self, stage:str, outcome:str=None) -> float:
+        return sum(sum(v) for (s, o), v in self.durations.items() if s == stage and outcome in (None, o))
+
+    def stages(self) -> list:
+        return list(dict.fromkeys(s for s, _ in self.durations))
+
+    def time_saved(self, fast:str, fallback:str) -> float:
+        """
+        Estimate the time a fast tier saved against always running the fallback tier
+
+        - files passing the fast tier save the mean fallback time less their own time
+        - time spent on failed fast attempts is deducted
+        """
+        if not self.count(fast, "ok") or not self.count(fallback, "ok"):
+            return 0.0
+
+        fallback_mean = self.total(fallback, "ok") / self.count(fallback, "ok")
+        saved = self.count(fast, "ok") * fallback_mean - self.total(fast, "ok")
+        return saved - self.total(fast, "failed")
+
+    def summary(self) -> str:
+        lines = []
+        for stage in self.stages():
+            attempts, ok = self.count(stage), self.count(stage, "ok")
+            line = f"{stage} : {ok}/{attempts} succeeded ({round(100 * ok / attempts, 1)}%) in {round(self.total(stage), 1)}s"
+            if self.count(stage, "timeout"):
+                line += f", {self.count(stage, 'timeout')} timed out"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def save(self, path:str) -> None:
+        """Write the raw events to a JSON file"""
+        events = [
+            {"stage": stage, "outcome": outcome, "seconds": seconds}
+            for (stage, outcome), values in self.durations.items() for seconds in values
+        ]
+        with open(path, "wt", encoding="utf8") as fp:
+            json.dump(events, fp, indent=2)
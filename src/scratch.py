@@ -0,0 +1,48 @@
+# Job Scratch Directories
+# Each conversion runs in its own directory on tmpfs, only the final PNG is copied to the destination
+import os, shutil, tempfile
+from contextlib import contextmanager
+
+# Overrides the scratch root, e.g. a local SSD when /dev/shm is too small for the intermediates
+SCRATCH_ENV = "DWG_SCRATCH_DIR"
+
+def default_root() -> str:
+    """$DWG_SCRATCH_DIR, else /dev/shm where it is writable, else the system temp dir"""
+    if os.environ.get(SCRATCH_ENV):
+        return os.environ[SCRATCH_ENV]
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+@contextmanager
+def job_dir(root:str=None):
+    """
+    Yield a new, empty directory for one conversion job & remove it with its contents afterwards
+
+    - ODA scans its whole input directory, so a job directory holding one file cannot pick up another job's files
+    """
+    path = tempfile.mkdtemp(prefix="dwg-", dir=root or default_root())
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def stage_input(input_file:str, work_dir:str) -> str:
+    """Copy an input file into a job directory, returns the copy's path"""
+    work_file = f"{work_dir}/{os.path.basename(input_file)}"
+    shutil.copyfile(input_file, work_file)
+    return work_file
+
+def publish(work_file:str, output_file:str) -> None:
+    """
+    Copy a finished file to its destination
+
+    - written under a temporary name & renamed, so readers never see a partial PNG
+    """
+    temp_path = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        shutil.copyfile(work_file, temp_path)
+        os.replace(temp_path, output_file)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
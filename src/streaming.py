@@ -0,0 +1,126 @@
+# Streaming DXF Render
+# Draw modelspace entities as they are read from disk, without loading the whole document
+import os, re, mmap, ezdxf
+from ezdxf.addons import iterdxf
+from ezdxf.addons.drawing import Frontend, RenderContext, config
+from ezdxf.addons.drawing.backend import BackendInterface
+from ezdxf.entities import factory
+from ezdxf.entities.subentity import entity_linker
+from ezdxf.lldxf.extendedtags import ExtendedTags
+from ezdxf.lldxf.tagger import tag_compiler
+
+ENTITIES_SECTION = re.compile(rb"\s*0\r?\n\s*SECTION\r?\n\s*2\r?\nENTITIES\r?\n")
+END_SECTION = re.compile(rb"\n\s*0\r?\n\s*ENDSEC\r?\n")
+
+def find_entities(data:mmap.mmap) -> tuple[int, int]:
+    """Byte range of the entity data between the ENTITIES section header & its ENDSEC"""
+    start = ENTITIES_SECTION.search(data)
+    if start is None:
+        raise ezdxf.DXFStructureError("ENTITIES section not found")
+    end = END_SECTION.search(data, start.end() - 1)
+    if end is None:
+        raise ezdxf.DXFStructureError("ENDSEC of ENTITIES section not found")
+
+    return start.end(), end.start() + 1
+
+def write_skeleton(dxf_file:str, skeleton_file:str) -> tuple[int, int]:
+    """
+    Copy a DXF file without its entity data
+
+    - header, tables, blocks & objects are kept, so layers, linetypes, styles & block definitions resolve
+    - the entity data is skipped with a byte search, never parsed
+    - returns the byte range of the entity data in the source file
+    """
+    with open(dxf_file, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start, end = find_entities(data)
+        with open(skeleton_file, "wb") as out:
+            out.write(data[:start])
+            out.write(data[end:])
+
+    return start, end
+
+def load_skeleton(dxf_file:str) -> tuple[ezdxf.document.Drawing, int]:
+    """
+    Load a DXF file without its ENTITIES section, see write_skeleton
+
+    - returns the document & the byte offset of the first entity
+    """
+    skeleton_file = f"{os.path.splitext(dxf_file)[0]}.skeleton.dxf"
+    start, _ = write_skeleton(dxf_file, skeleton_file)
+
+    try:
+        return ezdxf.readfile(skeleton_file), start
+    finally:
+        os.remove(skeleton_file)
+
+class FileWindow:
+    """Line reader over a file up to a byte offset, closed by an ENDSEC tag"""
+
+    def __init__(self, fp, end:int):
+        self.fp = fp
+        self.end = end
+        self.tail = [b"  0\n", b"ENDSEC\n"]
+
+    def readline(self) -> bytes:
+        if self.fp.tell() < self.end:
+            return self.fp.readline()
+        return self.tail.pop(0) if self.tail else b""
+
+def iter_modelspace(dxf_file:str, doc:ezdxf.document.Drawing, offset:int, end:int=None):
+    """
+    Yield modelspace entities read from disk one at a time, from offset until ENDSEC or end
+
+    - every entity type is loaded, unknown types as DXFTagStorage like the full loader
+    - entities are bound to the skeleton document for table & block lookups only, it does not keep them
+    - VERTEX, ATTRIB & SEQEND are linked to their POLYLINE / INSERT as in iterdxf
+    """
+    linked_entity = entity_linker()
+    queued = None
+    tags = []
+
+    with open(dxf_file, "rb") as fp:
+        fp.seek(offset)
+        stream = fp if end is None else FileWindow(fp, end)
+        for tag in tag_compiler(iterdxf.binary_tagger(stream, doc.encoding)):
+            if tag.code != 0:
+                tags.append(tag)
+                continue
+
+            # 1. A structure tag closes the previous entity, of any type as the full loader reads it
+            if tags:
+                entity = factory.load(ExtendedTags(tags), doc)
+                if not linked_entity(entity) and entity.dxf.get("paperspace", 0) == 0:
+                    # 2. Resolve handles to the skeleton's objects, e.g. IMAGEDEF, as Drawing._2nd_loading_stage
+                    entity.post_load_hook(doc)
+                    if entity.is_alive:
+                        if queued:
+                            yield queued
+                        queued = entity
+
+            if tag.value == "ENDSEC":
+                break
+            tags = [tag]
+
+    if queued:
+        yield queued
+
+def draw_modelspace_streaming(
+    dxf_file:str, backend:BackendInterface, cfg:config.Configuration, frontend_class:type=Frontend,
+) -> None:
+    """
+    Draw the modelspace of an ASCII DXF file with entities streamed from disk
+
+    - peak memory is bounded by the tables & block definitions rather than the entity count
+    - the backend output still grows with the drawing
+    - entities are drawn in file order, SORTENTSTABLE draw order is not applied
+    - frontend_class is a Frontend subclass, e.g. instancing.InstancingFrontend
+    """
+    doc, offset = load_skeleton(dxf_file)
+    context = RenderContext(doc)
+    frontend = frontend_class(context, backend, cfg)
+
+    # Same steps as Frontend.draw_layout, with an entity stream in place of the layout
+    context.set_current_layout(doc.modelspace())
+    frontend.set_background(context.current_layout_properties.background_color)
+    frontend.draw_entities(iter_modelspace(dxf_file, doc, offset))
+    frontend.pipeline.finalize()
@@ -0,0 +1,165 @@
+# DWG / DXF Thumbnail Tools
+# Extract the preview bitmap embedded in DWG & DXF files without ODA or a full render
+import io, mmap, struct
+from PIL import Image
+from converters import BINARY_DXF_SENTINEL
+
+# Sentinel which opens the preview image block of a R13+ DWG file
+DWG_PREVIEW_SENTINEL = bytes.fromhex("1F256D07D43628289D57CA3F9D44102B")
+
+# Image codes used in the DWG preview block
+DWG_PREVIEW_BMP = 2
+DWG_PREVIEW_PNG = 6
+
+# The THUMBNAILIMAGE section is the last DXF section, only the file tail is searched
+DXF_THUMBNAIL_WINDOW = 4 * 1024 * 1024
+
+def read_dwg_preview(input_file:str) -> bytes | None:
+    """
+    Read the preview image embedded in a DWG file header
+
+    - returns PNG or BMP file bytes
+    - returns None if the file has no usable preview
+    """
+    with open(input_file, "rb") as fp:
+        # 1. Preview block address is stored at 0x0D for R13 (AC1012) onwards
+        version = fp.read(6)
+        if not version.startswith(b"AC1") or version < b"AC1012":
+            return None
+
+        try:
+            fp.seek(0x0D)
+            address = struct.unpack("<I", fp.read(4))[0]
+            fp.seek(address)
+            if fp.read(16) != DWG_PREVIEW_SENTINEL:
+                return None
+
+            # 2. Skip overall size & read the image directory
+            fp.read(4)
+            count = struct.unpack("<B", fp.read(1))[0]
+            images = {}
+            for _ in range(count):
+                code, start, size = struct.unpack("<BII", fp.read(9))
+                images[code] = (start, size)
+
+        except struct.error:
+            return None
+
+        # 3. Prefer PNG (R2013+) over BMP, WMF is not supported
+        for code in (DWG_PREVIEW_PNG, DWG_PREVIEW_BMP):
+            if code in images and images[code][1] > 0:
+                start, size = images[code]
+                fp.seek(start)
+                data = fp.read(size)
+                return data if code == DWG_PREVIEW_PNG else dib_to_bmp(data)
+
+    return None
+
+def read_dxf_preview(input_file:str) -> bytes | None:
+    """
+    Read the THUMBNAILIMAGE section of an ASCII or binary DXF file
+
+    - returns BMP file bytes
+    - returns None if the file has no THUMBNAILIMAGE section
+    """
+    with open(input_file, "rb") as fp:
+        try:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return None
+
+        with data:
+            pos = data.rfind(b"THUMBNAILIMAGE", max(0, len(data) - DXF_THUMBNAIL_WINDOW))
+            if pos < 0:
+                return None
+
+            if data[:len(BINARY_DXF_SENTINEL)] == BINARY_DXF_SENTINEL:
+                dib = _read_binary_thumbnail(data, pos + len(b"THUMBNAILIMAGE") + 1)
+            else:
+                dib = _read_ascii_thumbnail(data, pos + len(b"THUMBNAILIMAGE"))
+
+    return dib_to_bmp(dib) if dib else None
+
+def _read_ascii_thumbnail(data:mmap.mmap, pos:int) -> bytes:
+    end = data.find(b"ENDSEC", pos)
+    lines = data[pos:end if end > 0 else len(data)].split(b"\n")[1:]
+    chunks = [
+        value.strip() for code, value in zip(lines[::2], lines[1::2])
+        if code.strip() == b"310"
+    ]
+    return bytes.fromhex(b"".join(chunks).decode("ascii"))
+
+def _read_binary_thumbnail(data:mmap.mmap, pos:int) -> bytes:
+    chunks = []
+    try:
+        while True:
+            code = struct.unpack_from("<h", data, pos)[0]
+            pos += 2
+            if code == 90:
+                pos += 4
+            elif code == 310:
+                length = data[pos]
+                chunks.append(data[pos + 1:pos + 1 + length])
+                pos += 1 + length
+            else:
+                break
+    except struct.error:
+        pass
+
+    return b"".join(chunks)
+
+def dib_to_bmp(dib:bytes) -> bytes:
+    """Prepend a BMP file header to a device independent bitmap"""
+    header_size, = struct.unpack_from("<I", dib, 0)
+    bit_count, = struct.unpack_from("<H", dib, 14)
+    compression, colors_used = struct.unpack_from("<I12xI", dib, 16)
+
+    # 1. Pixel data follows the info header, optional bit masks & the palette
+    offset = 14 + header_size
+    if bit_count <= 8:
+        offset += 4 * (colors_used or 1 << bit_count)
+    if compression == 3 and header_size == 40:
+        offset += 12
+
+    return b"BM" + struct.pack("<IHHI", 14 + len(dib), 0, 0, offset) + dib
+
+def save_thumbnail(image:bytes, output_file:str, size:int=256) -> None:
+    """Scale preview image bytes down to fit the size & save as PNG"""
+    with Image.open(io.BytesIO(image)) as img:
+        img.thumbnail((size, size))
+        img.save(output_file, format="png")
+
+def render_thumbnail(dxf_file:str, output_file:str, size:int=256) -> None:
+    """
+    Coarse low level of detail render of a DXF modelspace to PNG
+
+    - used when a file has no embedded preview
+    - text, hatch patterns, images & proxy graphics are skipped
+    """
+    import ezdxf
+    from ezdxf.addons.drawing import Frontend, RenderContext, pymupdf, layout, config
+
+    # 1. Draw the modelspace with a low detail configuration
+    doc = ezdxf.readfile(dxf_file)
+    backend = pymupdf.PyMuPdfBackend()
+    cfg = config.Configuration(
+        color_policy=config.ColorPolicy.MONOCHROME,
+        background_policy=config.BackgroundPolicy.WHITE,
+        text_policy=config.TextPolicy.IGNORE,
+        hatch_policy=config.HatchPolicy.SHOW_OUTLINE,
+        image_policy=config.ImagePolicy.IGNORE,
+        proxy_graphic_policy=config.ProxyGraphicPolicy.IGNORE,
+        lineweight_policy=config.LineweightPolicy.RELATIVE_FIXED,
+        max_flattening_distance=1.0,
+        circle_approximation_count=16,
+    )
+    Frontend(RenderContext(doc), backend, cfg).draw_layout(doc.modelspace())
+
+    # 2. Render straight to a square pixmap, size in px at 96 dpi
+    page_size = size * 25.4 / 96
+    page = layout.Page(width=page_size, height=page_size, units=layout.Units.mm, margins=layout.Margins.all(0))
+    png = backend.get_pixmap_bytes(page, fmt="png", settings=layout.Settings(fit_page=True), dpi=96)
+
+    with open(output_file, "wb") as fp:
+        fp.write(png)
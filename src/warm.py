@@ -0,0 +1,48 @@
+# Worker Warm Up
+# Load ezdxf, its fonts & the drawing backends once per worker process, before the first file arrives
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Drawing backends by name, imported on warm up
+BACKENDS = {
+    "svg": "ezdxf.addons.drawing.svg",
+    "pymupdf": "ezdxf.addons.drawing.pymupdf",
+}
+
+# Modules imported once by the forkserver, its workers fork with them loaded
+PRELOAD_MODULES = ["ezdxf", "ezdxf.addons.drawing", "ezdxf.addons.drawing.recorder"]
+
+def warm_up(backends:tuple=("svg",), glyph_cache:bool=False) -> None:
+    """
+    Worker initializer : import ezdxf & the drawing backends, then load the default font
+
+    - ezdxf loads its font manager cache on import
+    - glyph_cache installs the glyph outline cache, see glyphs.py, else the fallback TrueType font is parsed
+    """
+    import importlib
+    from ezdxf.addons.drawing import Frontend, RenderContext, config
+    from ezdxf.fonts import fonts
+
+    for name in backends:
+        importlib.import_module(BACKENDS[name])
+
+    if glyph_cache:
+        import glyphs
+        glyphs.install()
+    else:
+        fonts.make_font(fonts.font_manager.fallback_font_name(), 1.0)
+
+def warm_pool(workers:int=None, backends:tuple=("svg",), glyph_cache:bool=False) -> ProcessPoolExecutor:
+    """
+    Process pool whose workers are warmed up once as they start, see warm_up
+
+    - forkserver workers fork from a server which preloaded ezdxf, where the platform has one
+    - elsewhere (Windows) each spawned worker runs warm_up before its first task
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=warm_up, initargs=(backends, glyph_cache))
@@ -0,0 +1,6 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def glyph_cache_path(tmp_path, monkeypatch):
+    # renders keep their glyph cache in the test folder, not in ~/.cache
+    monkeypatch.setenv("DWG_GLYPH_CACHE", f"{tmp_path}/glyphs.pkl")
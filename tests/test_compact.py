@@ -0,0 +1,43 @@
+import sys, gzip, pytest, ezdxf
+import xml.etree.ElementTree as etree
+sys.path.append("src")
+from process_dwg import RenderOptions, render_svg, extract_svg
+from compact import coordinate_space
+from test_streaming import make_dxf
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+def test_coordinate_space():
+    # 1800mm at 96 dpi is 6803.1px, 8 steps per px
+    if coordinate_space(1800) != 6804 * 8:
+        raise AssertionError("Coordinate space test failed")
+
+@pytest.mark.parametrize(argnames="instancing", argvalues=[False, True])
+def test_compact_render(tmp_path, instancing):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    expanded = render_svg(test_file, options=RenderOptions(instancing=instancing))
+    test_res = render_svg(test_file, options=RenderOptions(instancing=instancing, compact=True))
+
+    paths = lambda svg: len(etree.fromstring(svg.encode()).findall(f".//{SVG}path"))
+    if len(test_res) >= len(expanded) or paths(test_res) >= paths(expanded):
+        raise AssertionError("Compact render test failed")
+
+def test_compact_translucent(tmp_path):
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for start, end in [((0, 0), (10, 10)), ((0, 10), (10, 0)), ((0, 5), (10, 5))]:
+        msp.add_line(start, end).transparency = 0.5
+    doc.saveas(f"{tmp_path}/test.dxf")
+    test_res = render_svg(f"{tmp_path}/test.dxf", options=RenderOptions(compact=True))
+
+    # crossing translucent lines keep one path each, so their overlaps still blend
+    if len(etree.fromstring(test_res.encode()).findall(f".//{SVG}path")) != 3:
+        raise AssertionError("Compact translucent test failed")
+
+def test_extract_svgz(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    test_res = extract_svg(test_file, options=RenderOptions(compact=True, svgz=True))
+
+    with gzip.open(test_res) as fp:
+        if not test_res.endswith(".svgz") or etree.parse(fp).getroot().tag != f"{SVG}svg":
+            raise AssertionError("Extract SVGZ test failed")
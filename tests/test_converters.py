@@ -0,0 +1,61 @@
+import os, sys, pytest, ezdxf
+sys.path.append("src")
+from process_dwg import list_inputs, to_dxf
+from converters import FixtureConverter, OdaConverter, detect_format
+
+def make_dxf(path:str, fmt:str="asc") -> str:
+    doc = ezdxf.new()
+    doc.modelspace().add_line((0, 0), (100, 50))
+    doc.saveas(path, fmt=fmt)
+    return path
+
+@pytest.mark.parametrize(argnames="fmt, expected", argvalues=[("asc", "dxf"), ("bin", "binary_dxf")])
+def test_detect_format(tmp_path, fmt, expected):
+    test_res = detect_format(make_dxf(f"{tmp_path}/test.dxf", fmt))
+
+    if test_res != expected:
+        raise AssertionError("Detect format test failed")
+
+def test_detect_format_dwg(tmp_path):
+    with open(f"{tmp_path}/test.dwg", "wb") as fp:
+        fp.write(b"AC1032" + b"\x00" * 32)
+
+    if detect_format(f"{tmp_path}/test.dwg") != "dwg":
+        raise AssertionError("Detect DWG format test failed")
+
+@pytest.mark.parametrize(argnames="fmt", argvalues=["asc", "bin"])
+def test_dxf_skips_converter(tmp_path, fmt):
+    test_file = make_dxf(f"{tmp_path}/test.dxf", fmt)
+
+    if to_dxf(test_file, FixtureConverter(f"{tmp_path}/missing")) != test_file:
+        raise AssertionError("DXF routing test failed")
+
+def test_fixture_converter(tmp_path):
+    os.mkdir(f"{tmp_path}/fixtures")
+    make_dxf(f"{tmp_path}/fixtures/test.dxf")
+    with open(f"{tmp_path}/test.dwg", "wb") as fp:
+        fp.write(b"AC1032" + b"\x00" * 32)
+
+    test_res = to_dxf(f"{tmp_path}/test.dwg", FixtureConverter(f"{tmp_path}/fixtures"))
+
+    if test_res != f"{tmp_path}/test.dxf" or ezdxf.readfile(test_res).modelspace().query("LINE").first is None:
+        raise AssertionError("Fixture converter test failed")
+
+def test_list_inputs(tmp_path):
+    for name in ("a.dwg", "a.dxf", "b.dxf"):
+        open(f"{tmp_path}/{name}", "wb").close()
+
+    if list_inputs(str(tmp_path)) != [f"{tmp_path}/a.dwg", f"{tmp_path}/b.dxf"]:
+        raise AssertionError("List inputs test failed")
+
+@pytest.mark.parametrize(argnames="binary, expected", argvalues=[(False, "dxf"), (True, "dxb")])
+def test_oda_output_format(tmp_path, monkeypatch, binary, expected):
+    calls = []
+    monkeypatch.setattr("converters.run_with_deadline", lambda args, **kwargs: calls.append(args))
+    with open(f"{tmp_path}/test.dwg", "wb") as fp:
+        fp.write(b"AC1032" + b"\x00" * 32)
+
+    test_res = OdaConverter(binary=binary).convert(f"{tmp_path}/test.dwg")
+
+    if test_res != f"{tmp_path}/test.dxf" or calls[0][4] != expected:
+        raise AssertionError("ODA output format test failed")
@@ -0,0 +1,34 @@
+import sys, time, pytest
+sys.path.append("src")
+from deadlines import Deadline, StageTimeout, call_with_deadline, run_with_deadline
+
+def test_deadline_seconds(tmp_path):
+    with open(f"{tmp_path}/test.dxf", "wb") as fp:
+        fp.write(b"0" * 2**21)
+
+    if Deadline(10, 2).seconds(f"{tmp_path}/test.dxf") != 14:
+        raise AssertionError("Deadline seconds test failed")
+
+def test_run_with_deadline():
+    start_time = time.perf_counter()
+    with pytest.raises(StageTimeout):
+        run_with_deadline(["sh", "-c", "sleep 10 & sleep 10"], "convert", 0.5)
+
+    if time.perf_counter() - start_time > 5 or run_with_deadline(["true"], "convert", 5) != 0:
+        raise AssertionError("Run with deadline test failed")
+
+@pytest.mark.parametrize(argnames="timeout", argvalues=[None, 5])
+def test_call_with_deadline(timeout):
+    if call_with_deadline(divmod, (7, 2), "render", timeout) != (3, 1):
+        raise AssertionError("Call with deadline test failed")
+
+    with pytest.raises(ZeroDivisionError):
+        call_with_deadline(divmod, (7, 0), "render", timeout)
+
+def test_call_with_deadline_timeout():
+    start_time = time.perf_counter()
+    with pytest.raises(StageTimeout):
+        call_with_deadline(time.sleep, (10,), "render", 0.5)
+
+    if time.perf_counter() - start_time > 5:
+        raise AssertionError("Call with deadline timeout test failed")
@@ -0,0 +1,258 @@
+import sys, io, re, pytest, ezdxf
+import numpy as np
+import xml.etree.ElementTree as etree
+sys.path.append("src")
+sys.path.append("src/modules/Inkscape/share/inkscape/extensions")
+dxf_input = pytest.importorskip("dxf_input")
+from test_streaming import make_dxf
+
+SVG = "{http://www.w3.org/2000/svg}"
+LABEL = "{http://www.inkscape.org/namespaces/inkscape}label"
+
+def import_dxf(dxf_file:str, *args:str) -> bytes:
+    output = io.BytesIO()
+    dxf_input.DxfInput().run([*args, dxf_file], output=output)
+    return output.getvalue()
+
+def read_lines(dxf_file:str) -> list:
+    # reference reader, one line at a time
+    lines = open(dxf_file, encoding="latin_1", newline="").read().split("\n")
+    return [(lines[i].strip(), lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+
+@pytest.mark.parametrize(argnames="chunk_size", argvalues=[7, 64, 1 << 22])
+def test_iter_ascii_groups(tmp_path, chunk_size):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    with open(test_file, "rb") as fp:
+        test_res = list(dxf_input.iter_ascii_groups(fp, chunk_size=chunk_size))
+
+    expected = read_lines(test_file)
+    if len(test_res) != len(expected) or ("0", "EOF") not in test_res:
+        raise AssertionError("Iterate ASCII groups test failed")
+    for (code, value), (raw_code, raw_value) in zip(test_res, expected):
+        kind = dxf_input.group_code_type(int(raw_code))
+        if code != raw_code or (kind is float and value != float(raw_value)) or (kind is str and value.strip() != raw_value.strip()):
+            raise AssertionError("Iterate ASCII groups test failed")
+
+def test_crlf_groups():
+    stream = io.BytesIO(b"  0\r\nTEXT\r\n  1\r\n two words \r\n 10\r\n1.5\r\n 62\r\n3\r\n  0\r\nEOF\r\n")
+    test_res = list(dxf_input.iter_ascii_groups(stream, chunk_size=5))
+
+    if test_res != [("0", "TEXT"), ("1", " two words "), ("10", 1.5), ("62", 3), ("0", "EOF")]:
+        raise AssertionError("CRLF groups test failed")
+
+def test_iter_binary_groups(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    ezdxf.readfile(test_file).saveas(f"{tmp_path}/test_bin.dxf", fmt="bin")
+    with open(test_file, "rb") as fp:
+        expected = list(dxf_input.iter_ascii_groups(fp))
+    with open(f"{tmp_path}/test_bin.dxf", "rb") as fp:
+        test_res = list(dxf_input.iter_binary_groups(fp))
+
+    # the ASCII file opens with a 999 comment
+    codes = lambda groups: [code for code, _ in groups if code != "999"]
+    if codes(test_res) != codes(expected) or ("0", "EOF") not in test_res:
+        raise AssertionError("Iterate binary groups test failed")
+
+@pytest.mark.parametrize(argnames="text", argvalues=[
+    "plain text", r"a\~b^Ic", r"{\Lunderlined}", r"\W0.8;wide {\FArial|b1;bold} \S1^2; end", r"\U+00B0C \S1#4; x", r"no \S end",
+])
+def test_clean_text(text):
+    # the six passes the entity loop made on every text value
+    expected = re.sub(r"\\U\+([0-9A-Fa-f]{4})", dxf_input.re_hex2unichar, re.sub(r"\\W.*;", "", re.sub(r"\\S.*;", "", re.sub(r"{\\L", "", re.sub(r"\^I", "", text.replace(r"\~", " "))))))
+    if dxf_input.clean_text(text) != expected:
+        raise AssertionError("Clean text test failed")
+
+def test_lazy_values():
+    vals = dxf_input.ValueConstruct()
+    vals["1"].append(r"a\~b")
+    vals["8"].append(r"layer^I1")
+
+    # values stay raw until an exporter reads them
+    if vals["8"] != [r"layer^I1"] or vals.text != "a b" or vals.layer_name_list != ["layer1"] or vals.has_mtext:
+        raise AssertionError("Lazy values test failed")
+
+def test_import_binary_dxf(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    ezdxf.readfile(test_file).saveas(f"{tmp_path}/test_bin.dxf", fmt="bin")
+
+    if import_dxf(f"{tmp_path}/test_bin.dxf").replace(b"test_bin.dxf", b"test.dxf") != import_dxf(test_file):
+        raise AssertionError("Import binary DXF test failed")
+
+def test_import_dxf(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    test_res = etree.fromstring(import_dxf(test_file))
+
+    if len(test_res.findall(f".//{SVG}use")) != 20 or len(test_res.findall(f".//{SVG}text")) != 1:
+        raise AssertionError("Import DXF test failed")
+
+def test_path_data():
+    path = dxf_input.PathData(precision=2).add("M %f,%f", 1, 2.005)
+    for x in range(3):
+        path.add(" A %f,%f 0.0 %d %d %f,%f", 1 / 3, 1 / 3, 0, 1, x, x)
+
+    if str(path) != "M 1.00,2.00" + "".join(f" A 0.33,0.33 0.0 0 1 {x}.00,{x}.00" for x in range(3)):
+        raise AssertionError("Path data test failed")
+
+@pytest.mark.parametrize(argnames="precision", argvalues=[1, 6])
+def test_path_precision(tmp_path, precision):
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(x / 7, (x % 5) / 3) for x in range(5000)], format="xy")
+    doc.saveas(f"{tmp_path}/test.dxf")
+    test_res = etree.fromstring(import_dxf(f"{tmp_path}/test.dxf", f"--precision={precision}"))
+
+    coords = test_res.findall(f".//{SVG}path")[-1].get("d").split()[1:]
+    if len(coords) != 2 * 5000 - 1 or any(len(xy.split(",")[0].split(".")[1]) != precision for xy in coords if "," in xy):
+        raise AssertionError("Path precision test failed")
+
+@pytest.mark.parametrize(argnames="bulges", argvalues=[[0.5, -2.0, 1.0], [0.0, 3.0, -0.25]])
+def test_bulge_arcs(bulges):
+    x, y = [0.0, 3.0, 3.0, -1.5], [0.0, 4.0, 8.0, 2.0]
+    r, large, sweep = (v.tolist() for v in dxf_input.bulge_arcs(x, y, bulges))
+
+    # radius & flags of each bulged segment, as the exporter computed them vertex by vertex
+    for i, b in enumerate(bulges):
+        if b and (r[i] != 0.25 * ((x[i + 1] - x[i]) ** 2 + (y[i + 1] - y[i]) ** 2) ** 0.5 * (abs(b) + 1 / abs(b)) or large[i] != (abs(b) > 1) or sweep[i] != (b < 0)):
+            raise AssertionError("Bulge arcs test failed")
+
+def test_ellipse_points():
+    angles = np.linspace(0, 2 * np.pi, 16)
+    x, y = dxf_input.ellipse_points(5.0, 0.4, np.pi / 6, angles)
+
+    # back in the frame of the major axis, the samples lie on the ellipse
+    u, v = x * np.cos(np.pi / 6) + y * np.sin(np.pi / 6), -x * np.sin(np.pi / 6) + y * np.cos(np.pi / 6)
+    cx, cy = dxf_input.ellipse_points(np.array([1.0, 2.0]), 1.0, 0.0, np.array([0.0, np.pi / 2]))
+    if not np.allclose((u / 5.0) ** 2 + (v / 2.0) ** 2, 1) or not np.allclose([cx, cy], [[1, 0], [0, 2]]):
+        raise AssertionError("Ellipse points test failed")
+
+def test_geometry_batch():
+    batch = dxf_input.GeometryBatch(precision=2, size=3)
+    elements = [etree.Element("path") for _ in range(4)]
+    batch.add_ellipse(elements[0], 10, 10, 5, 0, 1.0, 0.0, 0.0)
+    batch.add_polyline(elements[1], [0, 2, 4], [0, 0, 0], [1.0, 0], False)
+    batch.add_ellipse(elements[2], 0, 0, 0, 4, 0.5, 0.0, np.pi / 2)
+    batch.add_polyline(elements[3], [0, 1, 1], [0, 0, 1], [0, -0.5], True)
+
+    # path data is set for the whole batch on flush
+    queued = [e.get("d") for e in elements]
+    batch.flush()
+    test_res = [e.get("d") for e in elements]
+    expected = [
+        "M 15.00,10.00 A 5.00,5.00 -0.00 0, 0 5.00,10.00 A 5.00,5.00 -0.00 0, 0 15.00,10.00 z",
+        "M 0.00,0.00 A 1.00,1.00 0.0 0 0 2.00,0.00 L 4.00,0.00",
+        "M 0.00,-4.00 A 4.00,2.00 -90.00 0 0 -2.00,-0.00",
+        "M 0.00,0.00 L 1.00,0.00 A 0.62,0.62 0.0 0 1 1.00,1.00 z",
+    ]
+    if queued != [None] * 4 or test_res != expected:
+        raise AssertionError("Geometry batch test failed")
+
+def spline_path(degree:int, knots:list, ctrl:list, weights:list=None, closed:bool=False) -> np.ndarray:
+    element = etree.Element("path")
+    batch = dxf_input.GeometryBatch(precision=6, tolerance=0.01)
+    batch.add_spline(element, degree, knots, [p[0] for p in ctrl], [p[1] for p in ctrl], weights, closed)
+    batch.flush()
+    return element.get("d")
+
+def polyline_distance(points:np.ndarray, polyline:np.ndarray) -> float:
+    # largest distance of the points to the polyline
+    start, seg = polyline[:-1], polyline[1:] - polyline[:-1]
+    q = points[:, None] - start[None]
+    t = np.clip((q * seg).sum(2) / (seg * seg).sum(1), 0, 1)
+    return np.linalg.norm(q - t[..., None] * seg, axis=2).min(1).max()
+
+CTRL = [(0, 0), (10, 25), (30, -5), (45, 20), (60, 0), (70, 30), (90, 10)]
+
+@pytest.mark.parametrize(argnames="degree", argvalues=[2, 3])
+def test_spline_bezier(degree):
+    knots = [0] * (degree + 1) + [0.5, 2, 2, 3.5, 4][: len(CTRL) - degree - 1] + [5] * (degree + 1)
+    test_res = spline_path(degree, knots, CTRL)
+
+    # one exact Bezier segment per span, as ezdxf decomposes the spline
+    segments = list(ezdxf.math.BSpline(CTRL, order=degree + 1, knots=knots).bezier_decomposition())
+    expected = [segments[0][0]] + [p for segment in segments for p in segment[1:]]
+    coords = [float(v) for v in re.findall(r"-?\d+\.\d+", test_res)]
+    if set(re.findall("[A-Z]", test_res)) != {"M", " QC"[degree - 1]} or coords != pytest.approx([v for p in expected for v in (p.x, p.y)], abs=1e-6):
+        raise AssertionError("Spline Bezier test failed")
+
+@pytest.mark.parametrize(argnames="degree, knots, weights, closed", argvalues=[
+    (3, [0, 0, 0, 0, 1, 2, 3, 4, 4, 4, 4], [1, 4, 0.5, 2, 1, 0.25, 1], False),
+    (5, [0] * 6 + [2] + [4] * 6, None, False),
+    (3, list(range(11)), [1, 2, 1, 2, 1, 2, 1], True),
+])
+def test_spline_flatten(degree, knots, weights, closed):
+    test_res = spline_path(degree, knots, CTRL, weights, closed)
+    points = np.array([float(v) for v in re.findall(r"-?\d+\.\d+", test_res)]).reshape(-1, 2)
+
+    # the chords are within the tolerance of the curve, as ezdxf evaluates it
+    spline = ezdxf.math.BSpline(CTRL, order=degree + 1, knots=knots, weights=weights)
+    curve = np.array([(v.x, v.y) for v in spline.points(np.linspace(knots[degree], knots[len(CTRL)], 5000))])
+    if not test_res.startswith("M") or test_res.endswith(" z") != closed or polyline_distance(curve, points) > 0.011 or polyline_distance(points, curve) > 1e-4:
+        raise AssertionError("Spline flatten test failed")
+
+def layer_contents(svg:bytes) -> dict:
+    contents = {}
+    for layer in etree.fromstring(svg).findall(f"{SVG}g"):
+        contents.setdefault(layer.get(LABEL), []).extend(etree.tostring(child) for child in layer)
+    return contents
+
+def test_stream_output(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    doc = ezdxf.readfile(test_file)
+    for i in range(50):  # interleaved layers
+        doc.modelspace().add_line((i, 0), (i, 10), dxfattribs={"layer": f"L{i % 3}"})
+    doc.saveas(test_file)
+    expected = import_dxf(test_file)
+    test_res = import_dxf(test_file, "--stream=true")
+
+    defs = lambda svg: etree.tostring(etree.fromstring(svg).find(f"{SVG}defs"))
+    if layer_contents(test_res) != layer_contents(expected) or defs(test_res) != defs(expected):
+        raise AssertionError("Stream output test failed")
+
+def test_stream_layers(tmp_path):
+    doc = ezdxf.new()
+    for i in range(30):  # interleaved layers
+        doc.modelspace().add_line((i, 0), (i, 10), dxfattribs={"layer": f"L{i % 3}"})
+    doc.saveas(f"{tmp_path}/test.dxf")
+    expected = import_dxf(f"{tmp_path}/test.dxf")
+    test_res = import_dxf(f"{tmp_path}/test.dxf", "--stream=true")
+
+    # one group per layer in the same order, namespaces declared on the root only
+    labels = lambda svg: [layer.get(LABEL) for layer in etree.fromstring(svg).findall(f"{SVG}g")]
+    if labels(test_res) != labels(expected) or test_res.count(b"xmlns") > expected.count(b"xmlns") or len(test_res) > 1.1 * len(expected):
+        raise AssertionError("Stream layers test failed")
+
+def test_split_entities(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    with open(test_file, "rb") as fp:
+        test_res = dxf_input.split_entities(fp, 4)
+        data = fp.read()
+
+    # contiguous ranges, each starting on an entity
+    starts = [data[start:end].split(b"\n")[1].strip() for start, end in test_res]
+    if len(test_res) < 2 or any(a[1] != b[0] for a, b in zip(test_res, test_res[1:])) or not all(s in (b"INSERT", b"LWPOLYLINE", b"POLYLINE", b"TEXT") for s in starts):
+        raise AssertionError("Split entities test failed")
+
+@pytest.mark.parametrize(argnames="jobs", argvalues=[2, 5])
+def test_chunked_import(tmp_path, jobs):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    doc = ezdxf.readfile(test_file)
+    for i in range(50):
+        doc.modelspace().add_lwpolyline([(i, 0), (i, 5), (i + 1, 5)], dxfattribs={"layer": f"L{i % 3}"})
+        doc.modelspace().add_polyline2d([(i, 0), (i, 5)], dxfattribs={"layer": f"P{i % 2}"})
+    doc.saveas(test_file)
+
+    if import_dxf(test_file, f"--jobs={jobs}") != import_dxf(test_file):
+        raise AssertionError("Chunked import test failed")
+
+def test_concurrent_imports(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    files = [make_dxf(f"{tmp_path}/test.dxf")]
+    ezdxf.readfile(files[0]).saveas(f"{tmp_path}/test_bin.dxf", fmt="bin")
+    files.append(f"{tmp_path}/test_bin.dxf")
+
+    render = lambda file: dxf_input.import_dxf(file, "--scalemethod=auto").getroot().tostring()
+    expected = [render(file) for file in files]
+    with ThreadPoolExecutor(4) as pool:
+        test_res = list(pool.map(render, files * 4))
+
+    if test_res != expected * 4:
+        raise AssertionError("Concurrent imports test failed")
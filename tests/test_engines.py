@@ -0,0 +1,69 @@
+import sys, pytest, ezdxf
+import xml.etree.ElementTree as etree
+sys.path.append("src")
+from engines import ENGINES, EzdxfEngine, DxfInputEngine, entity_counts, select_engine, fit_costs
+from process_dwg import RenderOptions, extract_svg, write_svg
+from test_streaming import make_dxf
+
+COSTS = {"ezdxf": (0.5, 1e-3), "dxf_input": (0.05, 1e-4)}
+
+@pytest.mark.parametrize(argnames="fmt", argvalues=["asc", "bin"])
+def test_entity_counts(tmp_path, fmt):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    ezdxf.readfile(test_file).saveas(test_file, fmt=fmt)
+    test_res = entity_counts(test_file)
+
+    # modelspace entities & the VALVE block's CIRCLE & LINE
+    if test_res != {"INSERT": 20, "LWPOLYLINE": 1, "POLYLINE": 1, "TEXT": 1, "CIRCLE": 1, "LINE": 1}:
+        raise AssertionError("Entity counts test failed")
+
+@pytest.mark.parametrize(argnames="hatch, text, recover, expected", argvalues=[
+    (False, False, False, "dxf_input"), (False, True, False, "ezdxf"), (True, False, False, "ezdxf"), (False, False, True, "ezdxf"),
+])
+def test_select_engine(tmp_path, hatch, text, recover, expected):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    doc = ezdxf.readfile(test_file)
+    if hatch:
+        doc.modelspace().add_hatch().paths.add_polyline_path([(0, 0), (1, 0), (1, 1)])
+    if not text:
+        for entity in doc.modelspace().query("TEXT"):
+            doc.modelspace().delete_entity(entity)
+    doc.saveas(test_file)
+
+    # an engine which is always available, so the test does not depend on inkex
+    engines = [EzdxfEngine(), type("Engine", (DxfInputEngine,), {"available": lambda self: True})()]
+    if select_engine(test_file, recover, engines, COSTS).name != expected:
+        raise AssertionError("Select engine test failed")
+
+def test_dxf_input_engine(tmp_path):
+    pytest.importorskip("lxml")
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    doc = ezdxf.readfile(test_file)
+    doc.modelspace().reset_extents((-1, -1, 0), (60, 15, 0))
+    doc.saveas(test_file)
+
+    test_res = extract_svg(test_file, options=RenderOptions(engine="dxf_input"))
+    svg = etree.parse(test_res).getroot()
+
+    # 61 x 16 units at 4 mm per unit, plus 10 mm margins
+    if svg.get("width") != "264mm" or svg.get("height") != "84mm" or len(svg.findall(".//{http://www.w3.org/2000/svg}use")) != 20:
+        raise AssertionError("DXF input engine test failed")
+
+def test_engine_fallback(tmp_path, monkeypatch):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    def fail(*args):
+        raise RuntimeError("engine failure")
+    monkeypatch.setattr(ENGINES["dxf_input"], "write", fail)
+    write_svg(test_file, f"{tmp_path}/test.svg", options=RenderOptions(engine="dxf_input"))
+
+    # re-rendered by ezdxf
+    if etree.parse(f"{tmp_path}/test.svg").getroot().tag != "{http://www.w3.org/2000/svg}svg":
+        raise AssertionError("Engine fallback test failed")
+
+def test_fit_costs():
+    samples = {"a": [(100, 0.2), (1000, 1.1), (10000, 10.1)], "b": [(1000, 0.5)], "c": [(1000, 0.5), (1000, 0.6)]}
+    test_res = fit_costs(samples, defaults={"c": (0.1, 1e-3)})
+
+    # one entity count : all per entity time, or the defaults scaled to the mean time
+    if test_res["a"] != pytest.approx((0.1, 1e-3), abs=1e-9) or test_res["b"] != pytest.approx((0.0, 5e-4)) or test_res["c"] != pytest.approx((0.05, 5e-4)):
+        raise AssertionError("Fit costs test failed")
@@ -0,0 +1,54 @@
+import os, sys, pytest, ezdxf
+sys.path.append("src")
+import glyphs
+from ezdxf.addons.drawing import Frontend, RenderContext, svg, layout, config
+from ezdxf.fonts import fonts
+
+def render_text(doc) -> str:
+    backend = svg.SVGBackend()
+    cfg = config.Configuration(text_policy=config.TextPolicy.FILLING)
+    Frontend(RenderContext(doc), backend, cfg).draw_layout(doc.modelspace())
+    return backend.get_string(layout.Page(0, 0, layout.Units.mm))
+
+@pytest.fixture
+def text_doc():
+    doc = ezdxf.new()
+    doc.modelspace().add_text("WM 150mm DI", height=2.5, dxfattribs={"insert": (10, 10)})
+    doc.modelspace().add_mtext("Valve  V-102\\PWM 150mm", dxfattribs={"insert": (0, 30), "char_height": 5})
+    return doc
+
+def test_glyph_cache_output(tmp_path, text_doc):
+    glyphs.uninstall()
+    expected = render_text(text_doc)
+    glyphs.install(f"{tmp_path}/glyphs.pkl")
+    try:
+        test_res = render_text(text_doc)
+    finally:
+        glyphs.uninstall()
+
+    if test_res != expected:
+        raise AssertionError("Glyph cache output test failed")
+
+def test_glyph_cache_persisted(tmp_path, text_doc, monkeypatch):
+    engine = glyphs.install(f"{tmp_path}/glyphs.pkl")
+    render_text(text_doc)
+    glyphs.save()
+    glyphs.uninstall()
+
+    # a second process loads the outlines from disk & never loads the font
+    engine = glyphs.CachedTextRenderer(f"{tmp_path}/glyphs.pkl")
+    monkeypatch.setattr(engine, "get_font", lambda font_face: None)
+    font_face = fonts.FontFace(filename="DejaVuSans.ttf")
+    test_res = engine.get_text_glyph_paths("150mm", font_face, 2.5)
+
+    if engine.dirty or len(test_res) != 5:
+        raise AssertionError("Glyph cache persisted test failed")
+
+def test_glyph_cache_font_key(tmp_path):
+    engine = glyphs.CachedTextRenderer(f"{tmp_path}/glyphs.pkl")
+    test_res = engine.font_key(fonts.FontFace(filename="DejaVuSans.ttf"))
+
+    # keyed by the font file on disk, so a replaced file gets a new entry
+    stat = os.stat(test_res[0])
+    if test_res != (os.path.realpath(test_res[0]), stat.st_size, stat.st_mtime_ns) or engine.font_key(fonts.FontFace(filename="txt.shx")) is not None:
+        raise AssertionError("Glyph cache font key test failed")
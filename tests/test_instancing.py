@@ -0,0 +1,34 @@
+import sys, pytest, ezdxf
+import xml.etree.ElementTree as etree
+sys.path.append("src")
+from process_dwg import RenderOptions, render_svg
+from test_streaming import make_dxf
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+@pytest.mark.parametrize(argnames="streaming", argvalues=[False, True])
+def test_instancing_render(tmp_path, streaming):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    expanded = etree.fromstring(render_svg(test_file).encode())
+    test_res = etree.fromstring(render_svg(test_file, options=RenderOptions(streaming=streaming, instancing=True)).encode())
+
+    # one symbol for the 20 VALVE inserts, placed on the same page as the expanded render
+    if (
+        len(test_res.findall(f"{SVG}defs/{SVG}symbol")) != 1
+        or len(test_res.findall(f".//{SVG}use")) != 20
+        or test_res.get("viewBox") != expanded.get("viewBox")
+    ):
+        raise AssertionError("Instancing render test failed")
+
+def test_instancing_rotated(tmp_path):
+    doc = ezdxf.new()
+    doc.blocks.new("HYDRANT").add_line((0, 0), (2, 0))
+    doc.modelspace().add_blockref("HYDRANT", (10, 10), dxfattribs={"rotation": 90, "xscale": 2, "yscale": 2})
+    doc.modelspace().add_line((0, 0), (20, 20))
+    doc.saveas(f"{tmp_path}/test.dxf")
+
+    expanded = etree.fromstring(render_svg(f"{tmp_path}/test.dxf").encode())
+    test_res = etree.fromstring(render_svg(f"{tmp_path}/test.dxf", options=RenderOptions(instancing=True)).encode())
+
+    if test_res.get("viewBox") != expanded.get("viewBox") or "rotate(-90)" not in test_res.find(f".//{SVG}use").get("transform"):
+        raise AssertionError("Instancing rotated test failed")
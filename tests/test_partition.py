@@ -0,0 +1,29 @@
+import sys, pytest
+sys.path.append("src")
+sys.path.append("tests")
+from process_dwg import RenderOptions, render_svg
+from partition import split_entities
+from test_streaming import make_dxf, make_dimension_dxf
+
+@pytest.mark.parametrize(argnames="chunks", argvalues=[1, 3, 50])
+def test_split_entities(tmp_path, chunks):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    test_res = split_entities(test_file, chunks)
+    data = open(test_file, "rb").read()
+
+    contiguous = all(a[1] == b[0] for a, b in zip(test_res, test_res[1:]))
+    on_entity = all(data[start:end].split(b"\n")[1].strip() not in (b"VERTEX", b"SEQEND") for start, end in test_res)
+    if not contiguous or not on_entity or len(test_res) > chunks:
+        raise AssertionError("Split entities test failed")
+
+def test_parallel_render(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+
+    if render_svg(test_file, options=RenderOptions(parallel=3)) != render_svg(test_file):
+        raise AssertionError("Parallel render test failed")
+
+def test_parallel_unsupported(tmp_path):
+    test_file = make_dimension_dxf(f"{tmp_path}/test.dxf")
+
+    if render_svg(test_file, options=RenderOptions(parallel=2)) != render_svg(test_file):
+        raise AssertionError("Parallel unsupported test failed")
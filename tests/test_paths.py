@@ -0,0 +1,85 @@
+import sys, pytest
+import numpy as np
+sys.path.append("src/modules/Inkscape/share/inkscape/extensions")
+inkex = pytest.importorskip("inkex")
+from inkex import Path, CubicSuperPath, CompactPath, Transform
+
+PATHS = [
+    "M 10 10 L 20 20 h 5 v 5 l 1 1 z m 3 3 l 2 2",
+    "m 1 2 3 4 5 6 c 1 1 2 2 3 3 s 4 4 5 5 q 1 2 3 4 t 5 6 t 1 1 Z",
+    "M0,0 C 1,2 3,4 5,6 S 7 8 9 10 T 1 1 L 3 3 z 4 4 5 5",
+    "M 0 0 A 20 10 30 1 0 20 20 a 5 5 0 0 1 10 0 Z",
+    "M 5 5 Q 10 0 15 5 T 25 5 T 35 5 H 0 V 0 Z M 40 40 C 40 50 50 50 50 40",
+    "M 0 0 A 0 5 0 0 1 10 10 L 1 2 3",
+    "m 10 10 h 10 v 10 h -10 z m 20 0 c 0 5 5 5 5 0 s 5 -5 5 0 z",
+    "1 2 M 1-2.5.5e1 3",
+    "",
+]
+
+def arrays(path) -> tuple:
+    return "".join(seg.letter for seg in path), [float(arg) for seg in path for arg in seg.args]
+
+@pytest.mark.parametrize(argnames="path_d", argvalues=PATHS)
+def test_parse(path_d):
+    path, test_res = Path(path_d), CompactPath.parse(path_d)
+
+    # same commands as Path, both ways
+    if str(test_res) != str(path) or str(test_res.to_path()) != str(path) or test_res != path.to_compact():
+        raise AssertionError("Compact path parse test failed")
+
+@pytest.mark.parametrize(argnames="path_d", argvalues=PATHS)
+def test_absolute(path_d):
+    path, test_res = Path(path_d), CompactPath.parse(path_d)
+    letters, args = arrays(path.to_non_shorthand())
+
+    if str(test_res.to_absolute()) != str(path.to_absolute()) or test_res.to_non_shorthand().letters != letters or test_res.to_non_shorthand().coords != pytest.approx(args):
+        raise AssertionError("Compact path absolute test failed")
+
+@pytest.mark.parametrize(argnames="transform", argvalues=["scale(2,3) rotate(30) translate(4,5)", "matrix(1,0.5,-0.3,2,1,1)", "scale(-1,1)"])
+@pytest.mark.parametrize(argnames="path_d", argvalues=PATHS[:7])
+def test_transform(path_d, transform):
+    letters, args = arrays(Path(path_d).transform(Transform(transform)))
+    test_res = CompactPath.parse(path_d).transform(transform)
+
+    if test_res.letters != letters or test_res.coords != pytest.approx(args, abs=1e-9):
+        raise AssertionError("Compact path transform test failed")
+
+@pytest.mark.parametrize(argnames="path_d", argvalues=PATHS)
+def test_bounding_box(path_d):
+    expected = Path(path_d).to_non_shorthand().bounding_box()
+    test_res = CompactPath.parse(path_d).bounding_box()
+
+    if (test_res is None) != (expected is None) or (expected and [*test_res.x, *test_res.y] != pytest.approx([*expected.x, *expected.y])):
+        raise AssertionError("Compact path bounding box test failed")
+
+@pytest.mark.parametrize(argnames="path_d", argvalues=PATHS[:7])
+def test_superpath(path_d):
+    expected = CubicSuperPath(Path(path_d).to_non_shorthand())
+    test_res = CompactPath.parse(path_d).to_superpath()
+
+    # same nodes & handles, and back to the curves of CubicSuperPath.to_path
+    if len(test_res) != len(expected) or any(np.array(sub).shape != np.array(ref).shape or not np.allclose(sub, ref) for sub, ref in zip(test_res, expected)):
+        raise AssertionError("Compact path superpath test failed")
+    if str(CompactPath.from_superpath(expected)) != str(expected.to_path(curves_only=True)):
+        raise AssertionError("Compact path superpath test failed")
+
+@pytest.mark.parametrize(argnames="path_d", argvalues=PATHS)
+def test_reverse(path_d):
+    path = CompactPath.parse(path_d)
+    test_res = path.reverse()
+
+    # drawn backwards from the last end point, and back to the same path
+    if len(path) and (test_res.end_points[0] != pytest.approx(path.end_points[-1]) or str(test_res.reverse()) != str(path.to_non_shorthand())):
+        raise AssertionError("Compact path reverse test failed")
+
+def test_reverse_open():
+    path_d = "M 1 2 L 3 4 C 5 6 7 8 9 10 Q 11 12 13 14 A 5 5 0 0 1 20 14"
+    test_res = CompactPath.parse(path_d).reverse()
+
+    if str(test_res) != str(Path(path_d).reverse()):
+        raise AssertionError("Compact path reverse open test failed")
+
+def test_invalid():
+    for codes, coords in [("MX", [1, 2]), ("ML", [1, 2, 3])]:
+        with pytest.raises(inkex.paths.InvalidPath):
+            CompactPath(codes, coords)
@@ -0,0 +1,39 @@
+import sys, io, pytest
+import numpy as np
+from PIL import Image
+sys.path.append("src")
+from png_encoder import PngOptions, PngWriter, GRAY, encode_png, recode_png
+
+def make_drawing(colors:int=2) -> np.ndarray:
+    # lines on a background, in up to 4 colors
+    shades = np.array([[0, 0, 0], [255, 255, 255], [128, 128, 128], [200, 30, 30]], dtype=np.uint8)
+    index = np.zeros((120, 333), dtype=np.uint8)
+    for i in range(1, colors):
+        index[i * 20:i * 20 + 3, :] = i
+        index[:, i * 50:i * 50 + 2] = i
+    return shades[index]
+
+@pytest.mark.parametrize(argnames="colors, filter, expected", argvalues=[
+    (2, "adaptive", "1"), (3, "paeth", "P"), (4, "sub", "P"), (4, "average", "P"), (2, "none", "1"), (3, "up", "P"),
+])
+def test_encode_png(colors, filter, expected):
+    pixels = make_drawing(colors)
+    test_res = Image.open(io.BytesIO(encode_png(pixels, PngOptions(filter=filter))))
+
+    if test_res.mode != expected or not (np.asarray(test_res.convert("RGB")) == pixels).all():
+        raise AssertionError("Encode PNG test failed")
+
+def test_recode_png(tmp_path):
+    Image.fromarray(make_drawing()).convert("RGBA").save(f"{tmp_path}/test.png")
+    rgba_size = len(open(f"{tmp_path}/test.png", "rb").read())
+    test_res = recode_png(f"{tmp_path}/test.png", PngOptions(mode="bilevel", optimize=True))
+
+    if test_res >= rgba_size or Image.open(f"{tmp_path}/test.png").mode != "1":
+        raise AssertionError("Recode PNG test failed")
+
+def test_png_writer_rows():
+    writer = PngWriter(io.BytesIO(), 10, 4, GRAY)
+    writer.write_rows(np.zeros((3, 10), dtype=np.uint8))
+
+    with pytest.raises(ValueError):
+        writer.close()
@@ -1,6 +1,7 @@
-import sys, pytest
+import sys, pytest, ezdxf
 sys.path.append("src")
-from process_dwg import list_files, extract_png
+from process_dwg import list_files, extract_png, make_tiers
+from report import RunReport
 
 TEST_DWG = "tests/data/CoL_WaterUtility_Sept25_2024.dwg"
 TEST_PNG = "tests/data/CoL_WaterUtility_Sept25_2024.png"
@@ -19,3 +20,45 @@ def test_process_dwg(test_case):
 
     if test_case not in test_res:
         raise AssertionError("Extract PNG test failed")
+
+def fake_inkscape(args, stage, timeout) -> int:
+    # writes an empty PNG beside the SVG
+    open(args[-1].replace(".svg", ".png"), "wb").close()
+    return 0
+
+def test_tiered_fallback(tmp_path, monkeypatch):
+    # damaged group code : ezdxf.readfile fails, recover mode loads the file
+    doc = ezdxf.new()
+    doc.modelspace().add_line((0, 0), (100, 50))
+    doc.saveas(f"{tmp_path}/test.dxf")
+    text = open(f"{tmp_path}/test.dxf").read()
+    with open(f"{tmp_path}/test.dxf", "wt") as fp:
+        fp.write(text.replace("LINE\n  5\n", "LINE\n  5x\n", 1))
+
+    monkeypatch.setattr("process_dwg.run_with_deadline", fake_inkscape)
+    report = RunReport()
+    test_res = extract_png(f"{tmp_path}/test.dxf", tiers=make_tiers(), report=report)
+
+    if not test_res or report.count("fast", "failed") != 1 or report.count("audited", "ok") != 1:
+        raise AssertionError("Tiered fallback test failed")
+
+def test_scratch_dir(tmp_path, monkeypatch):
+    doc = ezdxf.new()
+    doc.modelspace().add_line((0, 0), (100, 50))
+    doc.saveas(f"{tmp_path}/test.dxf")
+    (tmp_path / "scratch").mkdir()
+
+    monkeypatch.setattr("process_dwg.run_with_deadline", fake_inkscape)
+    test_res = extract_png(f"{tmp_path}/test.dxf", scratch_root=f"{tmp_path}/scratch")
+
+    if not test_res or sorted(p.name for p in tmp_path.iterdir()) != ["scratch", "test.dxf", "test.png"] or any((tmp_path / "scratch").iterdir()):
+        raise AssertionError("Scratch directory test failed")
+
+def test_lazy_imports():
+    import subprocess
+    code = "import sys; sys.path.append('src'); import process_dwg; print(*sorted({'numpy', 'ezdxf'} & set(sys.modules)))"
+    test_res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    # the CLI module loads numpy & ezdxf only when a conversion needs them
+    if test_res.returncode != 0 or test_res.stdout.strip():
+        raise AssertionError("Lazy imports test failed")
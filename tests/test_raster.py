@@ -0,0 +1,40 @@
+import sys, pytest
+import numpy as np
+from PIL import Image
+sys.path.append("src")
+from process_dwg import RenderOptions, extract_raster
+from png_encoder import PngOptions
+from raster import RasterOptions
+from test_streaming import make_dxf
+
+@pytest.mark.parametrize(argnames="mode, expected", argvalues=[("gray", "L"), ("bilevel", "1"), ("rgba", "RGBA")])
+def test_strips_match_single_strip(tmp_path, mode, expected):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    output_path = extract_raster(test_file, raster=RasterOptions(dpi=20, strip_height=100_000), encoding=PngOptions(mode=mode))
+    single = np.asarray(Image.open(output_path))
+    extract_raster(test_file, raster=RasterOptions(dpi=20, strip_height=7), encoding=PngOptions(mode=mode))
+    test_res = Image.open(output_path)
+
+    # anti-aliased edges may shift by a few levels between clips
+    difference = np.abs(np.asarray(test_res).astype(int) - single)
+    if test_res.mode != expected or difference.max() > 16 or single.min() == single.max():
+        raise AssertionError("Strip raster test failed")
+
+@pytest.mark.parametrize(argnames="mode, expected", argvalues=[("gray", 0), ("bilevel", 0), ("rgba", 6)])
+def test_strip_color_type(tmp_path, mode, expected):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    output_path = extract_raster(test_file, raster=RasterOptions(dpi=10, strip_height=16), encoding=PngOptions(mode=mode))
+    data = open(output_path, "rb").read()
+
+    # IHDR color type byte, 6 is RGB with an alpha channel
+    if data[25] != expected or (mode == "rgba" and Image.open(output_path).getchannel("A").getextrema()[0] == 255):
+        raise AssertionError("Strip color type test failed")
+
+def test_raster_size(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    test_res = extract_raster(test_file, options=RenderOptions(streaming=True), raster=RasterOptions(dpi=10, strip_height=16))
+
+    # page width is the drawing width at scale 4 plus 10mm margins, clamped to max_width
+    width, height = Image.open(test_res).size
+    if not test_res.endswith("test.png") or width <= 0 or height <= 0 or width > 1800 / 25.4 * 10 + 1:
+        raise AssertionError("Raster size test failed")
@@ -0,0 +1,28 @@
+import sys, pytest
+sys.path.append("src")
+from report import RunReport
+
+def make_report() -> RunReport:
+    report = RunReport()
+    for seconds in (1.0, 1.0, 1.0):
+        report.record("fast", "ok", seconds)
+    report.record("fast", "failed", 0.5)
+    report.record("audited", "ok", 3.0)
+    return report
+
+def test_report_counts():
+    report = make_report()
+
+    if report.count("fast") != 4 or report.count("fast", "ok") != 3 or report.total("audited") != 3.0:
+        raise AssertionError("Report counts test failed")
+
+def test_report_time_saved():
+    # 3 fast files save 3 x (3.0 - 1.0), less 0.5 spent on the failed attempt
+    if make_report().time_saved("fast", "audited") != 5.5:
+        raise AssertionError("Report time saved test failed")
+
+def test_report_save(tmp_path):
+    make_report().save(f"{tmp_path}/report.json")
+
+    if '"stage": "audited"' not in open(f"{tmp_path}/report.json").read():
+        raise AssertionError("Report save test failed")
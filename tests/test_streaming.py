@@ -0,0 +1,52 @@
+import sys, pytest, ezdxf
+sys.path.append("src")
+from process_dwg import RenderOptions, render_svg
+from streaming import load_skeleton, iter_modelspace
+
+def make_dxf(path:str) -> str:
+    doc = ezdxf.new()
+    doc.layers.add("PIPES", color=3)
+    block = doc.blocks.new("VALVE")
+    block.add_circle((0, 0), 1)
+    block.add_line((-1, 0), (1, 0))
+
+    msp = doc.modelspace()
+    for i in range(20):
+        msp.add_blockref("VALVE", (i * 3, 0))
+    msp.add_lwpolyline([(0, 0), (10, 5), (20, 0)], dxfattribs={"layer": "PIPES"})
+    msp.add_polyline2d([(0, 10), (10, 15), (20, 10)])
+    msp.add_text("HYDRANT", dxfattribs={"height": 2}).set_placement((5, 5))
+    doc.saveas(path)
+    return path
+
+def make_dimension_dxf(path:str) -> str:
+    # ARC_DIMENSION is not one of the iterdxf entity types
+    doc = ezdxf.new(setup=True)
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (10, 0))
+    msp.add_circle((5, 5), 3)
+    msp.add_arc_dim_3p((0, 0), (10, 0), (5, 5), (5, 8)).render()
+    doc.saveas(path)
+    return path
+
+def test_iter_modelspace(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+    doc, offset = load_skeleton(test_file)
+    test_res = [e.dxftype() for e in iter_modelspace(test_file, doc, offset)]
+
+    if len(doc.modelspace()) != 0 or test_res != [*["INSERT"] * 20, "LWPOLYLINE", "POLYLINE", "TEXT"]:
+        raise AssertionError("Iterate modelspace test failed")
+
+def test_streaming_render(tmp_path):
+    test_file = make_dxf(f"{tmp_path}/test.dxf")
+
+    if render_svg(test_file, options=RenderOptions(streaming=True)) != render_svg(test_file):
+        raise AssertionError("Streaming render test failed")
+
+def test_streaming_unsupported(tmp_path):
+    test_file = make_dimension_dxf(f"{tmp_path}/test.dxf")
+    doc, offset = load_skeleton(test_file)
+    test_res = [e.dxftype() for e in iter_modelspace(test_file, doc, offset)]
+
+    if test_res != ["LINE", "CIRCLE", "ARC_DIMENSION"] or render_svg(test_file, options=RenderOptions(streaming=True)) != render_svg(test_file):
+        raise AssertionError("Streaming unsupported test failed")
@@ -0,0 +1,84 @@
+import io, os, struct, sys, pytest, ezdxf
+from PIL import Image
+sys.path.append("src")
+from process_dwg import extract_thumbnail
+from thumbnail import DWG_PREVIEW_SENTINEL, read_dwg_preview, read_dxf_preview
+
+def make_image(fmt:str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "white").save(buffer, format=fmt)
+    return buffer.getvalue()
+
+def make_dxf(path:str, preview:bool) -> str:
+    doc = ezdxf.new()
+    doc.modelspace().add_line((0, 0), (100, 50))
+    doc.saveas(path)
+
+    if preview:
+        # ezdxf does not write THUMBNAILIMAGE, insert the section before EOF
+        dib = make_image("bmp")[14:].hex().upper()
+        chunks = "".join(f"310\n{dib[i:i + 254]}\n" for i in range(0, len(dib), 254))
+        section = f"  0\nSECTION\n  2\nTHUMBNAILIMAGE\n 90\n{len(dib) // 2}\n{chunks}  0\nENDSEC\n"
+        text = open(path).read()
+        with open(path, "wt") as fp:
+            fp.write(text.replace("  0\nEOF", section + "  0\nEOF"))
+
+    return path
+
+def make_dwg(path:str) -> str:
+    png = make_image("png")
+    address = 0x20
+    start = address + 16 + 4 + 1 + 9
+    with open(path, "wb") as fp:
+        fp.write(b"AC1032".ljust(0x0D, b"\x00") + struct.pack("<I", address))
+        fp.write(b"\x00" * (address - fp.tell()))
+        fp.write(DWG_PREVIEW_SENTINEL + struct.pack("<IBBII", len(png) + 10, 1, 6, start, len(png)))
+        fp.write(png)
+    return path
+
+@pytest.mark.parametrize(argnames="preview", argvalues=[True, False])
+def test_read_dxf_preview(tmp_path, preview):
+    test_res = read_dxf_preview(make_dxf(f"{tmp_path}/test.dxf", preview))
+
+    if preview and (test_res is None or Image.open(io.BytesIO(test_res)).size != (64, 48)):
+        raise AssertionError("DXF preview test failed")
+    if not preview and test_res is not None:
+        raise AssertionError("DXF missing preview test failed")
+
+def test_read_dwg_preview(tmp_path):
+    test_res = read_dwg_preview(make_dwg(f"{tmp_path}/test.dwg"))
+
+    if test_res is None or Image.open(io.BytesIO(test_res)).format != "PNG":
+        raise AssertionError("DWG preview test failed")
+
+@pytest.mark.parametrize(argnames="preview", argvalues=[True, False])
+def test_extract_thumbnail(tmp_path, preview):
+    extract_thumbnail(make_dxf(f"{tmp_path}/test.dxf", preview), size=32)
+
+    if not os.path.exists(f"{tmp_path}/test_thumb.png"):
+        raise AssertionError("Extract thumbnail test failed")
+
+class DxfWriter:
+    """Stands in for ODA, writes a DXF beside the DWG it is given"""
+    def __init__(self):
+        self.inputs = []
+
+    def convert(self, input_file:str) -> str:
+        self.inputs.append(input_file)
+        return make_dxf(f"{os.path.splitext(input_file)[0]}.dxf", preview=False)
+
+def test_extract_thumbnail_scratch(tmp_path):
+    test_file = f"{tmp_path}/source/test.dwg"
+    os.makedirs(os.path.dirname(test_file))
+    with open(test_file, "wb") as fp:
+        fp.write(b"AC1032".ljust(0x80, b"\x00"))  # no preview image
+    converter = DxfWriter()
+    test_res = extract_thumbnail(test_file, size=32, converter=converter, scratch_root=str(tmp_path))
+
+    # ODA runs in a job directory, the source directory only gains the thumbnail
+    if not test_res or os.path.dirname(converter.inputs[0]) == os.path.dirname(test_file) or sorted(os.listdir(os.path.dirname(test_file))) != ["test.dwg", "test_thumb.png"]:
+        raise AssertionError("Extract thumbnail scratch test failed")
+
+def test_extract_thumbnail_missing(tmp_path):
+    if extract_thumbnail(f"{tmp_path}/missing.dwg", size=32) is not False:
+        raise AssertionError("Extract missing thumbnail test failed")